@@ -4,7 +4,6 @@ from pydantic import BaseModel, Field, HttpUrl
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from pathlib import Path
-import uuid
 import shutil
 
 from ..core.auth import User, optional_user
@@ -14,6 +13,8 @@ from ..db.session import get_db
 from ..db.repo import JobRepository
 from ..db.models import Job, JobMode, JobStatus
 from ..pipeline.orchestrator import submit_job
+from ..pipeline.executors import run_blocking_io
+from ..pipeline.materialize import store_by_content_hash
 from ..integrations.mm_llm_client import MMHLLMClient
 from ..core.logging import logger
 import json
@@ -174,23 +175,21 @@ async def upload_video(
                 f"不支持的文件格式: {file_ext}。支持的格式: {', '.join(allowed_extensions)}"
             )
         
-        # 生成唯一文件名
-        unique_id = uuid.uuid4().hex[:12]
-        safe_filename = f"{unique_id}_{file.filename}"
-        
-        # 创建上传目录
+        # 按内容哈希保存（相同视频只保存一份，后续Job直接引用该文件）
         upload_dir = settings.data_dir / "uploads"
-        upload_dir.mkdir(parents=True, exist_ok=True)
-        
-        # 保存文件
-        file_path = upload_dir / safe_filename
-        
-        with file_path.open("wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        file_path, sha256, is_new = await run_blocking_io(
+            store_by_content_hash,
+            file.file,
+            upload_dir,
+            file_ext
+        )
         
         file_size = file_path.stat().st_size
         
-        logger.info(f"视频上传成功: {file_path}, 大小: {file_size} bytes")
+        logger.info(
+            f"视频上传成功: {file_path}, 大小: {file_size} bytes"
+            f"{'' if is_new else '（内容已存在，复用）'}"
+        )
         
         response = UploadResponse(
             filePath=str(file_path),
@@ -255,7 +254,7 @@ async def create_analysis(
         
         # 提取帧（快速模式：每2秒一帧，最多5帧）
         try:
-            frames_result = extract_frames(
+            frames_result = await extract_frames(
                 video_path,
                 frames_dir,
                 fps=0.5,  # 每2秒一帧
@@ -568,8 +567,7 @@ async def _generate_analysis_with_llm(segments: List[dict], job_id: str) -> dict
 
     try:
         # 调用LLM API
-        messages = [{"role": "user", "content": prompt}]
-        response_text = await llm_client._call_api(messages, image_urls=[])
+        response_text = await llm_client._call_api([], prompt)
         
         # 解析JSON响应
         llm_result = llm_client._extract_json_from_text(response_text)
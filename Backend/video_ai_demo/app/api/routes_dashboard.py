@@ -4,13 +4,14 @@ from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import datetime, timedelta
 from collections import defaultdict
-import json
 
 from ..core.auth import User, get_current_user, optional_user
+from ..core.cache import dashboard_cache
 from ..core.response import success_response, error_response, ErrorCode
 from ..db.session import get_db
-from ..db.repo import JobRepository
+from ..db.repo import JobRepository, JobCounterRepository
 from ..db.models import JobStatus
+from ..core.errors import ValidationError
 from ..core.logging import logger
 
 
@@ -50,6 +51,7 @@ class ProjectsResponse(BaseModel):
     total: int
     page: int
     limit: int
+    nextCursor: Optional[str] = Field(None, description="下一页游标，没有下一页时为空")
 
 
 class ScheduleDay(BaseModel):
@@ -78,6 +80,10 @@ async def get_stats(current_user: Optional[User] = Depends(optional_user)):
     
     返回用户的各项统计指标
     """
+    cached = dashboard_cache.get("stats")
+    if cached is not None:
+        return success_response(data=cached)
+    
     try:
         with get_db() as db:
             job_repo = JobRepository(db)
@@ -86,21 +92,10 @@ async def get_stats(current_user: Optional[User] = Depends(optional_user)):
             total_jobs = job_repo.count_by_status()
             completed_count = total_jobs.get(JobStatus.SUCCEEDED, 0)
             
-            # 计算总时长（从已完成的任务中统计）
-            total_duration = 0
-            jobs = job_repo.list_by_status(JobStatus.SUCCEEDED, limit=1000)
-            
-            for job in jobs:
-                if job.result_json:
-                    try:
-                        result = json.loads(job.result_json)
-                        target = result.get("target", {})
-                        segments = target.get("segments", [])
-                        if segments:
-                            duration_sec = segments[-1].get("end_ms", 0) / 1000
-                            total_duration += duration_sec
-                    except:
-                        pass
+            # 汇总已完成任务的摘要列（总时长、特征数、平均分）
+            totals = job_repo.summary_totals(JobStatus.SUCCEEDED)
+            total_duration = totals["total_duration_ms"] / 1000
+            avg_hook_score = totals["avg_hook_score"]
             
             # 构建统计数据
             stats = StatsResponse(
@@ -114,7 +109,7 @@ async def get_stats(current_user: Optional[User] = Depends(optional_user)):
                     ),
                     StatItem(
                         label="爆款基因库",
-                        value=str(completed_count * 15),  # 假设每个视频提取15个基因
+                        value=str(totals["total_features"]),
                         icon="Zap",
                         color="text-yellow-400",
                         bg="bg-yellow-400/10"
@@ -128,7 +123,7 @@ async def get_stats(current_user: Optional[User] = Depends(optional_user)):
                     ),
                     StatItem(
                         label="平均分析分",
-                        value="88.5",
+                        value=f"{avg_hook_score:.1f}" if avg_hook_score is not None else "88.5",
                         icon="TrendingUp",
                         color="text-purple-400",
                         bg="bg-purple-400/10"
@@ -136,6 +131,7 @@ async def get_stats(current_user: Optional[User] = Depends(optional_user)):
                 ]
             )
             
+            dashboard_cache.set("stats", stats.dict())
             return success_response(data=stats.dict())
     
     except Exception as e:
@@ -150,6 +146,7 @@ async def get_stats(current_user: Optional[User] = Depends(optional_user)):
 async def get_projects(
     page: int = Query(1, ge=1, description="页码"),
     limit: int = Query(10, ge=1, le=100, description="每页数量"),
+    cursor: Optional[str] = Query(None, description="翻页游标（上一页返回的nextCursor），优先于page"),
     status: Optional[str] = Query(None, description="筛选状态"),
     sortBy: str = Query("timestamp", description="排序方式"),
     current_user: Optional[User] = Depends(optional_user)
@@ -162,29 +159,22 @@ async def get_projects(
     try:
         with get_db() as db:
             job_repo = JobRepository(db)
+            job_status = JobStatus(status) if status in {item.value for item in JobStatus} else None
+            
+            # 获取任务列表：有游标时按游标翻页，否则按页码
+            next_cursor = None
+            if cursor or page == 1:
+                jobs, next_cursor = job_repo.list_page(limit=limit, cursor=cursor, status=job_status)
+            else:
+                jobs = job_repo.list_history(limit=limit, offset=(page - 1) * limit, status=job_status)
             
-            # 获取任务列表
-            offset = (page - 1) * limit
-            jobs = job_repo.list_history(limit=limit, offset=offset)
-            total = job_repo.count_all()
+            status_counts = JobCounterRepository(db).count_by_status()
+            total = status_counts[job_status] if job_status else sum(status_counts.values())
             
             # 转换为项目摘要
             projects = []
             for job in jobs:
-                # 解析结果
-                segment_count = 0
-                duration_sec = 0
-                
-                if job.result_json:
-                    try:
-                        result = json.loads(job.result_json)
-                        target = result.get("target", {})
-                        segments = target.get("segments", [])
-                        segment_count = len(segments)
-                        if segments:
-                            duration_sec = segments[-1].get("end_ms", 0) / 1000
-                    except:
-                        pass
+                segment_count = job.segment_count or 0
                 
                 # 计算时间描述
                 time_diff = datetime.now() - job.created_at
@@ -225,11 +215,14 @@ async def get_projects(
                 projects=projects,
                 total=total,
                 page=page,
-                limit=limit
+                limit=limit,
+                nextCursor=next_cursor
             )
             
             return success_response(data=response.dict())
     
+    except ValidationError as e:
+        return error_response(ErrorCode.INVALID_REQUEST, e.message)
     except Exception as e:
         logger.error(f"获取项目列表失败: {str(e)}")
         return error_response(
@@ -245,26 +238,26 @@ async def get_schedule(current_user: Optional[User] = Depends(optional_user)):
     
     返回用户的任务日程（基于最近7天的真实数据）
     """
+    cached = dashboard_cache.get("schedule")
+    if cached is not None:
+        return success_response(data=cached)
+    
     try:
         with get_db() as db:
-            job_repo = JobRepository(db)
+            counter_repo = JobCounterRepository(db)
             
-            # 获取过去7天的所有任务
-            now = datetime.now()
-            seven_days_ago = now - timedelta(days=7)
+            # 最近7天（含今天，按UTC日期）
+            today = datetime.utcnow().date()
+            seven_days_ago = today - timedelta(days=6)
             
             # 统计每天的任务数量
             day_counts = defaultdict(int)
             day_names = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
             
-            # 获取所有任务
-            all_jobs = job_repo.list_history(limit=1000)
-            
-            # 统计过去7天每天的任务数
-            for job in all_jobs:
-                if job.created_at and job.created_at >= seven_days_ago:
-                    day_of_week = job.created_at.weekday()  # 0=Monday, 6=Sunday
-                    day_counts[day_of_week] += 1
+            # 按天汇总（计数汇总表，最多7行）
+            for day, count in counter_repo.count_by_day(seven_days_ago).items():
+                day_of_week = day.weekday()  # 0=Monday, 6=Sunday
+                day_counts[day_of_week] += count
             
             # 找出最大值用于归一化
             max_count = max(day_counts.values()) if day_counts else 1
@@ -278,7 +271,7 @@ async def get_schedule(current_user: Optional[User] = Depends(optional_user)):
                 schedule_data.append(ScheduleDay(day=day_name, intensity=intensity))
             
             # 统计不同状态的任务数量
-            status_counts = job_repo.count_by_status()
+            status_counts = counter_repo.count_by_status()
             queued_count = status_counts.get(JobStatus.QUEUED, 0)
             running_count = status_counts.get(JobStatus.RUNNING, 0)
             succeeded_count = status_counts.get(JobStatus.SUCCEEDED, 0)
@@ -317,6 +310,7 @@ async def get_schedule(current_user: Optional[User] = Depends(optional_user)):
                 tasks=tasks
             )
             
+            dashboard_cache.set("schedule", schedule.dict())
             return success_response(data=schedule.dict())
     
     except Exception as e:
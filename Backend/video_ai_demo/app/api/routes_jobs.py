@@ -1,17 +1,20 @@
 """Job相关API路由"""
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any, List
+from sqlalchemy.orm import Session
+from typing import Optional, Dict, Any, List, Literal, Tuple
 from datetime import datetime
 import uuid
 import json
 import asyncio
 
 from ..db.session import get_db
-from ..db.repo import JobRepository
+from ..db.repo import JobRepository, JobSegmentRepository
 from ..db.models import Job, JobMode, JobStatus
-from ..pipeline.orchestrator import submit_job
+from ..pipeline.orchestrator import submit_job, job_queue
+from ..pipeline.events import job_events
+from ..core.errors import QueueFullError, ValidationError
 from ..core.logging import logger
 
 
@@ -53,6 +56,32 @@ class FrameExtractOptions(BaseModel):
     """抽帧选项"""
     fps: float = Field(default=2.0, ge=0.1, le=10.0)
     max_frames: int = Field(default=240, ge=10, le=1000)
+    mode: Optional[Literal["fixed", "adaptive"]] = Field(
+        default=None,
+        description="抽帧模式：fixed 按fps均匀抽帧 / adaptive 按画面变化分配预算，未指定时使用服务端默认"
+    )
+
+
+class SceneDetectionOptions(BaseModel):
+    """场景检测选项（未指定的项使用服务端默认）"""
+    use_cv: Optional[bool] = Field(default=None, description="是否先用CV检测场景")
+    engine: Optional[Literal["content", "fast", "ffmpeg", "flow"]] = Field(
+        default=None, description="场景检测引擎：content / fast / ffmpeg / flow"
+    )
+    single_pass: Optional[bool] = Field(default=None, description="content引擎下场景检测与抽帧共用一次解码")
+    threshold: Optional[float] = Field(default=None, gt=0, description="content/fast/ffmpeg引擎的帧差阈值")
+    sample_rate: Optional[int] = Field(default=None, ge=1, le=30, description="fast/ffmpeg/flow引擎每N帧检测一次")
+    decode_width: Optional[int] = Field(
+        default=None, ge=0, le=3840, description="fast/ffmpeg/flow引擎检测用的画面宽度，flow下0表示原始分辨率"
+    )
+    hist_threshold: Optional[float] = Field(default=None, ge=0, le=1, description="fast引擎HS直方图距离阈值")
+    motion_ratio: Optional[float] = Field(default=None, ge=1, description="fast引擎跳帧时帧差相对中位数的倍数")
+    ffmpeg_threshold: Optional[float] = Field(default=None, ge=0, le=1, description="ffmpeg引擎 select=scene 分数阈值")
+    flow_method: Optional[Literal["farneback", "dis_ultrafast", "dis_fast"]] = Field(
+        default=None, description="flow引擎的光流算法"
+    )
+    flow_threshold: Optional[float] = Field(default=None, gt=0, description="flow引擎的平均光流幅度阈值（像素）")
+    grid_step: Optional[int] = Field(default=None, ge=1, le=32, description="flow引擎光流幅度统计的取点间隔")
 
 
 class AnalysisOptions(BaseModel):
@@ -60,6 +89,10 @@ class AnalysisOptions(BaseModel):
     enabled_modules: List[str] = Field(
         default=["camera_motion", "lighting", "color_grading"]
     )
+    module_sources: Dict[str, Literal["llm", "local", "hybrid"]] = Field(
+        default_factory=dict,
+        description="各模块的分析来源：llm / local / hybrid，未指定的模块使用服务端默认"
+    )
 
 
 class CompareOptions(BaseModel):
@@ -72,11 +105,22 @@ class LLMOptions(BaseModel):
     """LLM选项"""
     provider: str = "sophnet"
     model: Optional[str] = None
+    max_concurrency: Optional[int] = Field(default=None, ge=1, le=16, description="场景特征分析的最大并发数")
+    contact_sheet: Optional[bool] = Field(default=None, description="每个片段的采样帧拼成一张联系表发送")
+    batch_segments: Optional[int] = Field(default=None, ge=1, le=16, description="一次请求最多打包的短片段数")
+    batch_max_segment_ms: Optional[float] = Field(default=None, gt=0, description="不超过该时长（毫秒）的片段才参与打包")
+    local_camera_motion_confidence: Optional[float] = Field(
+        default=None, ge=0, le=1, description="camera_motion为hybrid时采用本地运镜结果的最低置信度"
+    )
+    local_color_confidence: Optional[float] = Field(
+        default=None, ge=0, le=1, description="color_grading/lighting为hybrid时采用本地调色、影调结果的最低置信度"
+    )
 
 
 class JobOptions(BaseModel):
     """Job选项"""
     frame_extract: FrameExtractOptions = Field(default_factory=FrameExtractOptions)
+    scene_detection: SceneDetectionOptions = Field(default_factory=SceneDetectionOptions)
     analysis: AnalysisOptions = Field(default_factory=AnalysisOptions)
     compare: Optional[CompareOptions] = None
     llm: LLMOptions = Field(default_factory=LLMOptions)
@@ -88,6 +132,7 @@ class CreateJobRequest(BaseModel):
     target_video: VideoInput
     user_video: Optional[VideoInput] = None
     options: JobOptions = Field(default_factory=JobOptions)
+    priority: int = Field(default=0, ge=-10, le=10, description="队列优先级，越大越先执行")
 
 
 class CreateJobResponse(BaseModel):
@@ -152,6 +197,17 @@ async def create_job(request: CreateJobRequest):
     if request.mode == "compare" and not request.user_video:
         raise HTTPException(status_code=400, detail="compare模式需要提供user_video")
     
+    # 背压：队列已满时拒绝新Job
+    try:
+        job_queue.check_capacity()
+    except QueueFullError as e:
+        logger.warning(f"拒绝创建Job: {e.message}")
+        raise HTTPException(
+            status_code=429,
+            detail=e.message,
+            headers={"Retry-After": str(e.details["retry_after"])}
+        )
+    
     # 生成Job ID
     job_id = f"job_{uuid.uuid4().hex[:12]}"
     
@@ -174,16 +230,24 @@ async def create_job(request: CreateJobRequest):
         "user_video": request.user_video.dict() if request.user_video else None,
         "options": {
             "frame_extract": request.options.frame_extract.dict(),
+            "scene_detection": request.options.scene_detection.dict(exclude_none=True),
             "llm": {
                 "provider": request.options.llm.provider,
                 "model": request.options.llm.model,
-                "enabled_modules": request.options.analysis.enabled_modules
+                "max_concurrency": request.options.llm.max_concurrency,
+                "contact_sheet": request.options.llm.contact_sheet,
+                "batch_segments": request.options.llm.batch_segments,
+                "batch_max_segment_ms": request.options.llm.batch_max_segment_ms,
+                "local_camera_motion_confidence": request.options.llm.local_camera_motion_confidence,
+                "local_color_confidence": request.options.llm.local_color_confidence,
+                "enabled_modules": request.options.analysis.enabled_modules,
+                "module_sources": request.options.analysis.module_sources
             }
         }
     }
     
-    # 提交到运行器（异步执行）
-    await submit_job(job_id, job_config)
+    # 提交到队列（由worker池异步执行）
+    await submit_job(job_id, job_config, request.priority)
     
     return CreateJobResponse(
         job_id=job_id,
@@ -254,12 +318,9 @@ async def get_job(job_id: str):
             except json.JSONDecodeError:
                 logger.error(f"Job {job_id} 结果JSON解析失败")
         
-        # 部分结果（用于流式显示）
-        if job.status == JobStatus.RUNNING and job.partial_result_json:
-            try:
-                response.partial_result = json.loads(job.partial_result_json)
-            except json.JSONDecodeError:
-                logger.error(f"Job {job_id} 部分结果JSON解析失败")
+        # 部分结果（用于流式显示）：概要信息 + 片段表
+        if job.status == JobStatus.RUNNING:
+            response.partial_result = _build_partial_result(db, job)
         
         # 错误
         if job.status == JobStatus.FAILED:
@@ -279,37 +340,28 @@ async def get_job(job_id: str):
 
 
 @router.get("/history", response_model=List[HistoryItem])
-async def get_history(limit: int = 50):
+async def get_history(response: Response, limit: int = 50, cursor: Optional[str] = None):
     """
     获取历史记录列表
     
     Args:
         limit: 返回数量限制，默认50
+        cursor: 翻页游标（上一页响应头 X-Next-Cursor 的值），为空时从最新开始
     
     Returns:
-        历史记录列表
+        历史记录列表；还有下一页时响应头带 X-Next-Cursor
     """
     try:
         with get_db() as db:
             job_repo = JobRepository(db)
-            jobs = job_repo.list_history(limit=limit)
+            jobs, next_cursor = job_repo.list_page(limit=limit, cursor=cursor)
+            if next_cursor:
+                response.headers["X-Next-Cursor"] = next_cursor
             
             history_items = []
             for job in jobs:
-                # 解析结果获取统计信息
-                segment_count = None
-                duration_sec = None
-                
-                if job.result_json:
-                    try:
-                        result = json.loads(job.result_json)
-                        target = result.get("target", {})
-                        segments = target.get("segments", [])
-                        segment_count = len(segments)
-                        if segments:
-                            duration_sec = segments[-1].get("end_ms", 0) / 1000
-                    except:
-                        pass
+                # 统计信息直接读取摘要列
+                duration_sec = job.duration_ms / 1000 if job.duration_ms is not None else None
                 
                 # 解析学习要点
                 learning_points = []
@@ -324,7 +376,7 @@ async def get_history(limit: int = 50):
                     title=job.title,
                     status=job.status.value,
                     learning_points=learning_points,
-                    segment_count=segment_count,
+                    segment_count=job.segment_count,
                     duration_sec=duration_sec,
                     thumbnail_url=job.thumbnail_url,
                     created_at=job.created_at
@@ -332,6 +384,8 @@ async def get_history(limit: int = 50):
             
             return history_items
     
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=e.message)
     except Exception as e:
         logger.error(f"获取历史记录失败: {str(e)}")
         raise HTTPException(status_code=500, detail=f"获取历史记录失败: {str(e)}")
@@ -371,7 +425,7 @@ async def delete_job(job_id: str):
                     logger.warning(f"删除 Job {job_id} 文件失败: {str(e)}")
             
             # 从数据库中删除 Job（级联删除相关的 assets 和 artifacts）
-            db.delete(job)
+            job_repo.delete(job_id)
             db.commit()
             
             logger.info(f"Job {job_id} 已成功删除")
@@ -389,11 +443,98 @@ async def delete_job(job_id: str):
         raise HTTPException(status_code=500, detail=f"删除失败: {str(e)}")
 
 
+SSE_KEEPALIVE_SECONDS = 15.0  # 无事件时的心跳间隔（同时兜底检查Job状态）
+
+
+def _sse(data: Dict[str, Any], event: Optional[str] = None) -> str:
+    """格式化SSE消息"""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+def _build_partial_result(db: Session, job: Job) -> Optional[Dict[str, Any]]:
+    """由部分结果概要和片段表组装部分结果"""
+    partial_result = None
+    if job.partial_result_json:
+        try:
+            partial_result = json.loads(job.partial_result_json)
+        except json.JSONDecodeError:
+            logger.error(f"Job {job.id} 部分结果JSON解析失败")
+    
+    segments = JobSegmentRepository(db).list_segments(job.id)
+    if segments:
+        partial_result = partial_result or {"mode": job.mode.value}
+        target = partial_result.setdefault("target", {})
+        target["segments"] = segments
+        target["analyzing"] = any(seg.get("analyzing") for seg in segments)
+    
+    return partial_result
+
+
+def _job_state_events(db: Session, job: Job) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    从数据库记录构建当前状态事件（订阅开始时的快照，以及心跳时的兜底检查）
+    
+    Returns:
+        (事件列表, 终态status或None)
+    """
+    events = []
+    
+    if job.status == JobStatus.RUNNING:
+        events.append({
+            "type": "progress",
+            "status": job.status.value,
+            "progress": {
+                "stage": job.progress_stage,
+                "percent": job.progress_percent or 0,
+                "message": job.progress_message or ""
+            }
+        })
+    
+    segments = JobSegmentRepository(db).list_segments(job.id)
+    if segments:
+        events.append({
+            "type": "segments",
+            "status": job.status.value,
+            "segments": segments,
+            "total": len(segments)
+        })
+    
+    if job.status == JobStatus.SUCCEEDED:
+        if job.result_json:
+            try:
+                events.append({
+                    "type": "complete",
+                    "status": "succeeded",
+                    "result": json.loads(job.result_json)
+                })
+            except json.JSONDecodeError:
+                pass
+        return events, "succeeded"
+    
+    if job.status == JobStatus.FAILED:
+        events.append({
+            "type": "error",
+            "status": "failed",
+            "error": {
+                "message": job.error_message or "任务失败",
+                "details": json.loads(job.error_details) if job.error_details else None
+            }
+        })
+        return events, "failed"
+    
+    return events, None
+
+
 @router.get("/jobs/{job_id}/stream")
 async def stream_job_progress(job_id: str):
     """
     SSE 流式推送任务进度和片段数据
     
+    订阅进程内事件总线：先推送一次当前快照（type=segments 为全量片段），
+    之后实时推送进度与增量片段（type=segment_update 只含变化的片段及其index），
+    直到任务完成或失败。
+    
     Args:
         job_id: Job ID
     
@@ -403,118 +544,74 @@ async def stream_job_progress(job_id: str):
     async def event_generator():
         """生成 SSE 事件"""
         try:
-            # 检查任务是否存在
-            with get_db() as db:
-                job_repo = JobRepository(db)
-                job = job_repo.get(job_id)
-                
-                if not job:
-                    yield f"event: error\ndata: {json.dumps({'error': 'Job不存在'})}\n\n"
-                    return
-            
-            logger.info(f"开始流式推送任务 {job_id} 的进度")
-            
-            last_partial_result = None
-            last_status = None
-            check_count = 0
-            max_checks = 300  # 最多检查5分钟（每秒一次）
-            
-            while check_count < max_checks:
+            # 先订阅再读库，避免漏掉两者之间发布的事件
+            with job_events.subscribe(job_id) as queue:
                 with get_db() as db:
                     job_repo = JobRepository(db)
                     job = job_repo.get(job_id)
                     
                     if not job:
-                        yield f"event: error\ndata: {json.dumps({'error': 'Job已删除'})}\n\n"
+                        yield _sse({'error': 'Job不存在'}, event="error")
                         return
                     
-                    current_status = job.status.value
+                    initial_events, finished = _job_state_events(db, job)
+                
+                # Pipeline已发布过事件时以内存快照为准（比数据库更新）
+                bus_snapshot = job_events.snapshot(job_id)
+                for data in (bus_snapshot if bus_snapshot and not finished else initial_events):
+                    yield _sse(data)
+                
+                if finished:
+                    yield _sse({'status': finished}, event="done")
+                    return
+                
+                logger.info(f"开始流式推送任务 {job_id} 的进度")
+                
+                while True:
+                    try:
+                        data = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                    except asyncio.TimeoutError:
+                        # 心跳，并兜底检查Job是否已删除或已结束
+                        with get_db() as db:
+                            job = JobRepository(db).get(job_id)
+                            if not job:
+                                yield _sse({'error': 'Job已删除'}, event="error")
+                                return
+                            finished = None
+                            if job.status in (JobStatus.SUCCEEDED, JobStatus.FAILED):
+                                state_events, finished = _job_state_events(db, job)
+                        
+                        if finished:
+                            for data in state_events:
+                                if data["type"] in ("complete", "error"):
+                                    yield _sse(data)
+                            yield _sse({'status': finished}, event="done")
+                            return
+                        
+                        yield ": keepalive\n\n"
+                        continue
                     
-                    # 发送进度更新
-                    if job.status == JobStatus.RUNNING:
-                        progress_data = {
-                            "type": "progress",
-                            "status": current_status,
-                            "progress": {
-                                "stage": job.progress_stage,
-                                "percent": job.progress_percent or 0,
-                                "message": job.progress_message or ""
-                            }
-                        }
-                        yield f"data: {json.dumps(progress_data)}\n\n"
+                    if data["type"] == "resync":
+                        # 消费过慢被丢弃了积压事件，重新推送全量快照
+                        for snapshot_data in job_events.snapshot(job_id):
+                            yield _sse(snapshot_data)
+                        continue
                     
-                    # 发送部分结果（片段数据）
-                    if job.partial_result_json and job.partial_result_json != last_partial_result:
-                        try:
-                            partial_result = json.loads(job.partial_result_json)
-                            
-                            # 提取片段数据
-                            segments = None
-                            if "target" in partial_result:
-                                segments = partial_result["target"].get("segments", [])
-                            
-                            if segments:
-                                segment_data = {
-                                    "type": "segments",
-                                    "status": current_status,
-                                    "segments": segments,
-                                    "total": len(segments)
-                                }
-                                yield f"data: {json.dumps(segment_data)}\n\n"
-                                
-                                last_partial_result = job.partial_result_json
-                                logger.info(f"推送 {len(segments)} 个片段到前端")
-                        
-                        except json.JSONDecodeError as e:
-                            logger.error(f"解析部分结果失败: {str(e)}")
+                    yield _sse(data)
                     
-                    # 任务完成
-                    if job.status == JobStatus.SUCCEEDED:
-                        # 发送最终结果
-                        if job.result_json:
-                            try:
-                                result = json.loads(job.result_json)
-                                complete_data = {
-                                    "type": "complete",
-                                    "status": "succeeded",
-                                    "result": result
-                                }
-                                yield f"data: {json.dumps(complete_data)}\n\n"
-                                logger.info(f"任务 {job_id} 完成，推送最终结果")
-                            except json.JSONDecodeError:
-                                pass
-                        
-                        # 发送完成信号
-                        yield f"event: done\ndata: {json.dumps({'status': 'succeeded'})}\n\n"
+                    if data["type"] == "complete":
+                        logger.info(f"任务 {job_id} 完成，推送最终结果")
+                        yield _sse({'status': 'succeeded'}, event="done")
                         return
                     
-                    # 任务失败
-                    elif job.status == JobStatus.FAILED:
-                        error_data = {
-                            "type": "error",
-                            "status": "failed",
-                            "error": {
-                                "message": job.error_message or "任务失败",
-                                "details": json.loads(job.error_details) if job.error_details else None
-                            }
-                        }
-                        yield f"data: {json.dumps(error_data)}\n\n"
-                        yield f"event: done\ndata: {json.dumps({'status': 'failed'})}\n\n"
+                    if data["type"] == "error":
                         logger.error(f"任务 {job_id} 失败")
+                        yield _sse({'status': 'failed'}, event="done")
                         return
-                    
-                    last_status = current_status
-                
-                # 等待1秒后继续检查
-                await asyncio.sleep(1)
-                check_count += 1
-            
-            # 超时
-            yield f"event: error\ndata: {json.dumps({'error': '任务超时'})}\n\n"
-            
+        
         except Exception as e:
             logger.error(f"流式推送异常: {str(e)}", exc_info=True)
-            yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+            yield _sse({'error': str(e)}, event="error")
     
     return StreamingResponse(
         event_generator(),
@@ -525,4 +622,3 @@ async def stream_job_progress(job_id: str):
             "X-Accel-Buffering": "no"
         }
     )
-
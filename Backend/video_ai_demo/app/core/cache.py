@@ -0,0 +1,52 @@
+"""进程内短时缓存"""
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .config import settings
+
+
+class TTLCache:
+    """
+    带过期时间的进程内缓存
+    
+    用于仪表板等读多写少、允许短暂延迟的统计结果；数据变化时调用 clear() 立即失效。
+    """
+    
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._items: Dict[str, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._items[key]
+                return None
+            return value
+    
+    def set(self, key: str, value: Any):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._items[key] = (time.monotonic() + self.ttl, value)
+    
+    def get_or_set(self, key: str, factory: Callable[[], Any]) -> Any:
+        """命中则返回缓存值，否则调用 factory 计算并缓存"""
+        value = self.get(key)
+        if value is None:
+            value = factory()
+            self.set(key, value)
+        return value
+    
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+# 仪表板统计缓存（Job创建/状态变化/删除时失效）
+dashboard_cache = TTLCache(settings.dashboard_cache_ttl)
@@ -1,7 +1,7 @@
 """核心配置模块"""
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 import os
 
 
@@ -12,6 +12,43 @@ class Settings(BaseSettings):
     mm_llm_base_url: str = "https://www.sophnet.com/api/open-apis/v1"
     mm_llm_api_key: str = ""
     mm_llm_model: str = "Qwen2.5-VL-7B-Instruct"
+    llm_segment_concurrency: int = 4  # 单个Job内场景特征分析的最大并发LLM调用数
+    
+    # LLM HTTP连接池
+    llm_http2: bool = True
+    llm_http_max_connections: int = 20
+    llm_http_max_keepalive: int = 10
+    llm_http_keepalive_expiry: float = 30.0  # 空闲连接保活时间（秒）
+    llm_http_timeout: float = 120.0
+    
+    # LLM响应缓存（data_dir/llm_cache.db）
+    llm_cache_enabled: bool = True
+    llm_cache_max_bytes: int = 256 * 1024 * 1024
+    llm_cache_ttl_seconds: float = 7 * 24 * 3600
+    
+    # LLM图片载荷（发送前缩放/重新编码）
+    llm_image_max_edge: int = 1024  # 最长边像素，0表示不缩放
+    llm_image_quality: int = 80
+    llm_image_format: str = "jpeg"  # jpeg / webp
+    llm_image_cache_size: int = 512  # 已编码data URL的LRU容量
+    llm_frame_dedup_distance: int = 6  # 帧dHash汉明距离不超过该值视为重复画面，只发送一帧
+    
+    # 场景特征分析的请求合并（可被Job的 options.llm 覆盖）
+    llm_contact_sheet: bool = False  # 每个片段的采样帧拼成一张带时间戳的联系表
+    llm_contact_sheet_cell_width: int = 384
+    llm_batch_segments: int = 1  # 一次请求最多打包的短片段数，1表示每个片段单独请求
+    llm_batch_max_segment_ms: float = 4000.0  # 不超过该时长的片段才参与打包
+    
+    # 各特征模块的分析来源（可被Job的 options.llm.module_sources 覆盖）：
+    # llm 只问LLM；local 只用本地分析；hybrid 本地结果置信度足够时不再询问LLM
+    # 默认全部由LLM分析，本地分析需Job或部署配置显式开启
+    module_sources: Dict[str, str] = {
+        "camera_motion": "llm",
+        "lighting": "llm",
+        "color_grading": "llm"
+    }
+    local_camera_motion_confidence: float = 0.8
+    local_color_confidence: float = 0.75
     
     # 图生视频配置
     img2video_base_url: Optional[str] = None
@@ -22,10 +59,71 @@ class Settings(BaseSettings):
     data_dir: Path = Path("./data")
     sqlite_path: str = "./data/demo.db"
     
+    # SQLite性能配置（sqlite_profile=default 时使用SQLite默认设置）
+    sqlite_profile: str = "performance"  # performance / default
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_cache_size_kb: int = 64 * 1024  # 每个连接的页缓存
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_pool_size: int = 8
+    sqlite_max_overflow: int = 8
+    sqlite_pool_timeout: float = 30.0
+    progress_flush_interval: float = 0.5  # 进度写库合并间隔（秒），0表示每次直接写
+    dashboard_cache_ttl: float = 5.0  # 仪表板统计缓存时长（秒），Job状态变化时立即失效
+    
     # FFmpeg
     ffmpeg_bin: str = "ffmpeg"
     ffprobe_bin: str = "ffprobe"
     
+    # 视频处理
+    single_decode_pass: bool = True  # Learn模式下场景检测与抽帧共用一次解码
+    
+    # 场景检测引擎（可被 options.scene_detection.engine 覆盖）：content / fast / ffmpeg / flow
+    scene_engine: str = "content"
+    fast_scene_sample_rate: int = 2  # fast引擎每N帧检测一次
+    fast_scene_decode_width: int = 320  # fast/ffmpeg引擎检测用的画面宽度
+    fast_scene_hist_threshold: float = 0.5  # HS直方图L1距离（0~1）超过该值也视为切点
+    fast_scene_motion_ratio: float = 1.4  # 跳帧时帧差还需达到前几次帧差中位数的该倍数
+    ffmpeg_scene_threshold: float = 0.3  # ffmpeg select=scene 分数阈值（0~1）
+    optical_flow_method: str = "farneback"  # flow引擎光流算法：farneback / dis_ultrafast / dis_fast
+    optical_flow_decode_width: int = 320  # 计算光流的画面宽度，0表示原始分辨率
+    optical_flow_sample_rate: int = 2  # 每N帧先做一次跨帧光流，超过阈值再逐帧细查
+    optical_flow_grid_step: int = 4  # 光流幅度统计的取点间隔
+    scene_parallel_chunks: int = 0  # content引擎长视频分段并行检测的段数，0表示与cpu_pool_workers相同，1表示不分段
+    scene_chunk_min_seconds: float = 60.0  # 每段最短时长（秒），短视频少分段或不分段
+    scene_chunk_overlap_frames: int = 8  # 相邻分段的重叠帧数
+    cpu_pool_workers: int = 2  # 解码/场景检测进程池大小，0表示在线程中执行
+    ffmpeg_max_processes: int = 4  # 同时运行的ffmpeg/ffprobe进程数
+    ffmpeg_timeout: float = 600.0  # 单个ffmpeg/ffprobe命令超时（秒）
+    materialize_methods: str = "reflink,hardlink,symlink,copy"  # 输入视频/关键帧落地方式的尝试顺序
+    asset_store_enabled: bool = True  # 按视频内容哈希复用探测信息、抽帧与场景检测结果（data_dir/assets）
+    asset_store_max_bytes: int = 20 * 1024 * 1024 * 1024  # 派生产物总量上限，超过时按最近使用时间淘汰
+    asset_store_max_age_seconds: float = 30 * 24 * 3600  # 超过该时长未使用的产物被淘汰，0表示不按时间淘汰
+    
+    # 抽帧采样：fixed 按固定fps；adaptive 按场景边界与画面变化分配 max_frames 预算
+    frame_sampling_mode: str = "fixed"
+    adaptive_oversample: int = 3  # 自适应模式下候选帧密度为 fps 的倍数
+    adaptive_static_fps: float = 0.5  # 静止镜头的采样密度（帧/秒）
+    adaptive_motion_step: float = 0.05  # 画面累计变化（0~1的平均像素差）每达到该值多采一帧
+    
+    # URL视频下载（缓存目录 data_dir/download_cache）
+    download_cache_enabled: bool = True
+    download_cache_fresh_seconds: float = 600.0  # 该时长内直接使用缓存，超过后用ETag/Last-Modified重新验证
+    download_cache_max_bytes: int = 10 * 1024 * 1024 * 1024
+    download_chunk_size: int = 1024 * 1024  # 攒满该大小再写盘
+    download_parallel_segments: int = 4  # 支持Range的大文件分段并行下载的段数，1表示不分段
+    download_parallel_min_bytes: int = 32 * 1024 * 1024
+    download_max_bytes: int = 2 * 1024 * 1024 * 1024
+    download_timeout: float = 600.0  # 单个视频下载总时长上限（秒）
+    download_max_retries: int = 3  # 连接中断后续传重试次数
+    
+    # Job队列
+    job_worker_concurrency: int = 2  # 同时执行的Job数
+    job_queue_max_depth: int = 50  # 排队Job上限，超出返回429
+    job_queue_ordering: str = "priority"  # priority（优先级+FIFO）/ fifo
+    job_queue_retry_after: int = 30  # 429响应的Retry-After（秒）
+    job_queue_max_attempts: int = 3  # 重启恢复时超过该领取次数的Job直接置为失败
+    job_queue_poll_interval: float = 5.0  # worker空闲时轮询数据库的间隔（秒）
+    
     # 服务配置
     api_host: str = "0.0.0.0"
     api_port: int = 8000
@@ -15,6 +15,11 @@ class JobNotFoundError(AppError):
     pass
 
 
+class QueueFullError(AppError):
+    """Job队列已满"""
+    pass
+
+
 class JobExecutionError(AppError):
     """Job执行错误"""
     pass
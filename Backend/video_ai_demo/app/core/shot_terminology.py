@@ -117,6 +117,107 @@ CAMERA_MOVEMENTS = {
     }
 }
 
+# 色调 (Color Tone)
+COLOR_TONES = {
+    "warm_tone": {
+        "name": "暖色调",
+        "name_en": "Warm Tone",
+        "abbr": "WARM",
+        "description": "画面偏橙黄，色温低，温暖、怀旧"
+    },
+    "neutral_tone": {
+        "name": "中性色调",
+        "name_en": "Neutral Tone",
+        "abbr": "NEU",
+        "description": "白平衡准确，色彩还原自然"
+    },
+    "cool_tone": {
+        "name": "冷色调",
+        "name_en": "Cool Tone",
+        "abbr": "COOL",
+        "description": "画面偏青蓝，色温高，冷静、疏离"
+    }
+}
+
+# 饱和度 (Saturation)
+SATURATION_LEVELS = {
+    "monochrome": {
+        "name": "黑白",
+        "name_en": "Monochrome",
+        "abbr": "MONO",
+        "description": "几乎没有色彩，只有明暗层次"
+    },
+    "low_saturation": {
+        "name": "低饱和度",
+        "name_en": "Desaturated",
+        "abbr": "LSAT",
+        "description": "色彩淡雅克制，偏灰"
+    },
+    "natural_saturation": {
+        "name": "自然饱和度",
+        "name_en": "Natural Saturation",
+        "abbr": "NSAT",
+        "description": "色彩浓度接近肉眼所见"
+    },
+    "high_saturation": {
+        "name": "高饱和度",
+        "name_en": "High Saturation",
+        "abbr": "HSAT",
+        "description": "色彩浓郁鲜艳"
+    }
+}
+
+# 对比度风格 (Contrast)
+CONTRAST_STYLES = {
+    "low_contrast": {
+        "name": "低对比度",
+        "name_en": "Low Contrast / Flat",
+        "abbr": "LCON",
+        "description": "暗部提亮、高光压低，画面柔和发灰"
+    },
+    "normal_contrast": {
+        "name": "常规对比度",
+        "name_en": "Normal Contrast",
+        "abbr": "NCON",
+        "description": "明暗层次均衡"
+    },
+    "high_contrast": {
+        "name": "高对比度",
+        "name_en": "High Contrast",
+        "abbr": "HCON",
+        "description": "暗部深沉、高光明亮，明暗反差强烈"
+    }
+}
+
+# 影调 (Lighting Key)
+LIGHTING_KEYS = {
+    "low_key": {
+        "name": "低调照明",
+        "name_en": "Low Key",
+        "abbr": "LK",
+        "description": "画面以暗部为主，阴影浓重，气氛压抑神秘"
+    },
+    "mid_key": {
+        "name": "中间调照明",
+        "name_en": "Mid Key",
+        "abbr": "MK",
+        "description": "亮度分布均衡，以中间调为主"
+    },
+    "high_key": {
+        "name": "高调照明",
+        "name_en": "High Key",
+        "abbr": "HK",
+        "description": "画面明亮，阴影很少，气氛轻松明快"
+    }
+}
+
+# 调色术语
+COLOR_GRADING_TERMS = {
+    **COLOR_TONES,
+    **SATURATION_LEVELS,
+    **CONTRAST_STYLES
+}
+
 # 组合术语
 ALL_SHOT_TYPES = {
     **SHOT_SIZES,
@@ -125,8 +226,8 @@ ALL_SHOT_TYPES = {
 }
 
 # 用于LLM提示词的格式化输出
-def get_shot_terminology_prompt():
-    """生成用于LLM的标准术语提示"""
+def get_shot_terminology_prompt(include_movements: bool = True):
+    """生成用于LLM的标准术语提示（运镜方式已在本地确定时可省略运镜部分）"""
     
     prompt = """请使用以下标准电影术语：
 
@@ -141,6 +242,9 @@ def get_shot_terminology_prompt():
     for key, info in CAMERA_ANGLES.items():
         prompt += f"- {info['name']} ({info['name_en']}): {info['description']}\n"
     
+    if not include_movements:
+        return prompt
+    
     prompt += """
 **运镜方式 (Camera Movement)**：
 """
@@ -180,7 +284,11 @@ def validate_shot_type(shot_type: str, category: str = None) -> bool:
 SHOT_TERMINOLOGY_JSON = {
     "shot_sizes": SHOT_SIZES,
     "camera_angles": CAMERA_ANGLES,
-    "camera_movements": CAMERA_MOVEMENTS
+    "camera_movements": CAMERA_MOVEMENTS,
+    "color_tones": COLOR_TONES,
+    "saturation_levels": SATURATION_LEVELS,
+    "contrast_styles": CONTRAST_STYLES,
+    "lighting_keys": LIGHTING_KEYS
 }
 
 
@@ -1,5 +1,5 @@
 """数据库模型"""
-from sqlalchemy import Column, String, Integer, Float, Text, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, Integer, Float, Boolean, Text, Date, DateTime, ForeignKey, UniqueConstraint, Index, Enum as SQLEnum
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -26,10 +26,15 @@ class JobMode(str, enum.Enum):
 class Job(Base):
     """Job表"""
     __tablename__ = "jobs"
+    __table_args__ = (
+        # 列表按 (created_at, id) 倒序做游标分页，可按状态过滤
+        Index("ix_jobs_created_at_id", "created_at", "id"),
+        Index("ix_jobs_status_created_at_id", "status", "created_at", "id"),
+    )
     
     id = Column(String, primary_key=True)
     mode = Column(SQLEnum(JobMode), nullable=False)
-    status = Column(SQLEnum(JobStatus), default=JobStatus.QUEUED, nullable=False)
+    status = Column(SQLEnum(JobStatus), default=JobStatus.QUEUED, nullable=False, index=True)
     
     # 进度
     progress_stage = Column(String)  # 当前阶段
@@ -47,6 +52,15 @@ class Job(Base):
     learning_points_json = Column(Text)  # 学习要点JSON数组
     thumbnail_url = Column(String)  # 缩略图URL（可选）
     
+    # 结果摘要（完成时从result计算一次，列表/仪表板直接读取，无需解析result_json）
+    duration_ms = Column(Float)  # 视频时长（最后一个片段的end_ms）
+    segment_count = Column(Integer)  # 片段数
+    camera_motion_count = Column(Integer)  # 各类特征数量
+    lighting_count = Column(Integer)
+    color_grading_count = Column(Integer)
+    hook_score = Column(Integer)  # 格式化分析报告中的hookScore
+    detection_method = Column(String)  # cv / llm
+    
     # 时间戳
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -56,6 +70,52 @@ class Job(Base):
     # 关联
     assets = relationship("Asset", back_populates="job", cascade="all, delete-orphan")
     artifacts = relationship("Artifact", back_populates="job", cascade="all, delete-orphan")
+    segments = relationship("JobSegment", back_populates="job", cascade="all, delete-orphan")
+
+
+class JobSegment(Base):
+    """Job片段表（每个片段一行，分析完成时单独更新）"""
+    __tablename__ = "job_segments"
+    __table_args__ = (
+        UniqueConstraint("job_id", "asset_role", "seq", name="uq_job_segments_position"),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(String, ForeignKey("jobs.id"), nullable=False, index=True)
+    asset_role = Column(String, default="target", nullable=False)
+    seq = Column(Integer, nullable=False)  # 片段在视频中的顺序
+    segment_id = Column(String)
+    
+    analyzing = Column(Boolean, default=True, nullable=False)  # 是否仍在分析中
+    data_json = Column(Text, nullable=False)  # 片段JSON（含features）
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # 关联
+    job = relationship("Job", back_populates="segments")
+
+
+class JobQueueItem(Base):
+    """Job队列表（持久化待执行/执行中的Job，重启后可恢复）"""
+    __tablename__ = "job_queue"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)  # 入队顺序
+    job_id = Column(String, ForeignKey("jobs.id"), nullable=False, unique=True)
+    priority = Column(Integer, default=0, nullable=False)  # 越大越先执行
+    config_json = Column(Text, nullable=False)  # Job配置JSON
+    attempts = Column(Integer, default=0, nullable=False)  # 已被领取次数
+    
+    enqueued_at = Column(DateTime, default=datetime.utcnow)
+    claimed_at = Column(DateTime)  # 被worker领取的时间，为空表示排队中
+
+
+class JobDailyCount(Base):
+    """Job计数汇总表（按创建日期+状态，随Job创建/状态变化/删除增量维护）"""
+    __tablename__ = "job_daily_counts"
+    
+    day = Column(Date, primary_key=True)  # Job创建日期（UTC）
+    status = Column(SQLEnum(JobStatus), primary_key=True)
+    count = Column(Integer, default=0, nullable=False)
 
 
 class AssetRole(str, enum.Enum):
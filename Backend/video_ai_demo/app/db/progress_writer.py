@@ -0,0 +1,104 @@
+"""进度写入合并器：高频进度更新按Job合并，定时批量落库"""
+import asyncio
+from datetime import datetime
+from typing import Callable, ContextManager, Dict, Optional, Tuple
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from .models import Job
+from .session import get_db
+
+
+ProgressState = Tuple[str, float, Optional[str]]
+
+
+class ProgressWriter:
+    """
+    进度写入合并器
+    
+    同一Job在一个刷新间隔内的多次进度更新只保留最后一次，到期后所有Job的进度
+    在一个事务里批量UPDATE。实时推送走事件总线，不依赖这里的落库时机。
+    不在事件循环中调用时（脚本等）直接写库。
+    """
+    
+    def __init__(
+        self,
+        flush_interval: Optional[float] = None,
+        session_scope: Optional[Callable[[], ContextManager[Session]]] = None
+    ):
+        self.flush_interval = (
+            settings.progress_flush_interval if flush_interval is None else flush_interval
+        )
+        self.session_scope = session_scope
+        self.updates = 0  # 收到的进度更新数
+        self.flushes = 0  # 实际落库的事务数
+        self._pending: Dict[str, ProgressState] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def submit(self, job_id: str, stage: str, percent: float, message: Optional[str] = None):
+        """提交一次进度更新"""
+        self.updates += 1
+        
+        if self.flush_interval <= 0:
+            self._write({job_id: (stage, percent, message)})
+            return
+        
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write({job_id: (stage, percent, message)})
+            return
+        
+        self._pending[job_id] = (stage, percent, message)
+        if self._timer is None or self._timer_loop is not loop:
+            self._timer = loop.call_later(self.flush_interval, self.flush)
+            self._timer_loop = loop
+    
+    def discard(self, job_id: str):
+        """丢弃Job尚未落库的进度（Job结束时调用，避免旧进度覆盖最终状态）"""
+        self._pending.pop(job_id, None)
+    
+    def flush(self):
+        """立即写入所有待落库的进度"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        
+        if not self._pending:
+            return
+        
+        pending, self._pending = self._pending, {}
+        self._write(pending)
+    
+    def _write(self, pending: Dict[str, ProgressState]):
+        # Core executemany：已删除的Job匹配0行，不影响其他Job
+        statement = (
+            update(Job.__table__)
+            .where(Job.__table__.c.id == bindparam("job_id"))
+            .values(
+                progress_stage=bindparam("stage"),
+                progress_percent=bindparam("percent"),
+                progress_message=bindparam("message"),
+                updated_at=bindparam("now")
+            )
+        )
+        now = datetime.utcnow()
+        with (self.session_scope or get_db)() as db:
+            db.execute(statement, [
+                {
+                    "job_id": job_id,
+                    "stage": stage,
+                    "percent": percent,
+                    "message": message,
+                    "now": now
+                }
+                for job_id, (stage, percent, message) in pending.items()
+            ])
+        self.flushes += 1
+
+
+# 进程级进度写入器
+progress_writer = ProgressWriter()
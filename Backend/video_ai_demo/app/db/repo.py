@@ -1,11 +1,76 @@
 """数据仓储层"""
-from sqlalchemy.orm import Session
-from typing import Optional, List
-from datetime import datetime
+from sqlalchemy import event, func, tuple_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, load_only
+from typing import Optional, List, Tuple, Dict, Any
+from datetime import date, datetime
+import base64
+import binascii
 import json
 
-from .models import Job, JobStatus, Asset, Artifact, VirtualMotionJob
-from ..core.errors import JobNotFoundError
+from .models import Job, JobStatus, JobSegment, JobQueueItem, JobDailyCount, Asset, Artifact, VirtualMotionJob
+from ..core.cache import dashboard_cache
+from ..core.errors import JobNotFoundError, ValidationError
+
+
+# 结果摘要中单独计数的特征类别（对应 Job.<category>_count 列）
+FEATURE_CATEGORIES = ("camera_motion", "lighting", "color_grading")
+
+
+def compute_result_summary(
+    result: Optional[dict],
+    formatted_analysis: Optional[dict] = None
+) -> dict:
+    """
+    从Job结果计算摘要列
+    
+    Returns:
+        可直接赋值给Job的字段字典（duration_ms, segment_count, *_count, hook_score, detection_method）
+    """
+    target = (result or {}).get("target", {})
+    segments = target.get("segments", []) or []
+    
+    counts = {category: 0 for category in FEATURE_CATEGORIES}
+    for segment in segments:
+        for feature in segment.get("features", []) or []:
+            category = feature.get("category")
+            if category in counts:
+                counts[category] += 1
+    
+    hook_score = (formatted_analysis or {}).get("hookScore")
+    
+    summary = {
+        "duration_ms": segments[-1].get("end_ms", 0) if segments else None,
+        "segment_count": len(segments),
+        "hook_score": int(hook_score) if isinstance(hook_score, (int, float)) else None,
+        "detection_method": target.get("detection_method")
+    }
+    for category, count in counts.items():
+        summary[f"{category}_count"] = count
+    return summary
+
+
+# 列表查询只加载的列（不加载 result_json / partial_result_json 等大字段）
+JOB_LIST_COLUMNS = (
+    Job.id, Job.mode, Job.status, Job.title, Job.learning_points_json, Job.thumbnail_url,
+    Job.duration_ms, Job.segment_count, Job.hook_score, Job.created_at
+)
+
+
+def encode_cursor(job: Job) -> str:
+    """由列表最后一个Job生成翻页游标（对调用方不透明）"""
+    raw = json.dumps([job.created_at.isoformat(), job.id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """解析翻页游标，返回 (created_at, id)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, job_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), str(job_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise ValidationError("无效的翻页游标", {"cursor": cursor})
 
 
 class JobRepository:
@@ -18,6 +83,7 @@ class JobRepository:
         """创建Job"""
         self.db.add(job)
         self.db.flush()
+        JobCounterRepository(self.db).add(job.created_at, job.status, 1)
         return job
     
     def get(self, job_id: str) -> Optional[Job]:
@@ -40,6 +106,10 @@ class JobRepository:
     ) -> Job:
         """更新Job状态"""
         job = self.get_or_raise(job_id)
+        if job.status != status:
+            counters = JobCounterRepository(self.db)
+            counters.add(job.created_at, job.status, -1)
+            counters.add(job.created_at, status, 1)
         job.status = status
         job.updated_at = datetime.utcnow()
         
@@ -109,17 +179,86 @@ class JobRepository:
         self.db.flush()
         return job
     
-    def list_history(self, limit: int = 50, offset: int = 0) -> List[Job]:
-        """获取历史记录列表"""
-        return self.db.query(Job).order_by(Job.created_at.desc()).offset(offset).limit(limit).all()
+    def save_result_summary(
+        self,
+        job_id: str,
+        result: Optional[dict],
+        formatted_analysis: Optional[dict] = None
+    ) -> Job:
+        """计算并保存结果摘要列"""
+        job = self.get_or_raise(job_id)
+        for field, value in compute_result_summary(result, formatted_analysis).items():
+            setattr(job, field, value)
+        self.db.flush()
+        return job
+    
+    def summary_totals(self, status: JobStatus = JobStatus.SUCCEEDED) -> dict:
+        """按摘要列汇总（总时长、特征总数、平均hook分）"""
+        total_duration_ms, total_features, avg_hook_score = self.db.query(
+            func.coalesce(func.sum(Job.duration_ms), 0),
+            func.coalesce(
+                func.sum(
+                    func.coalesce(Job.camera_motion_count, 0)
+                    + func.coalesce(Job.lighting_count, 0)
+                    + func.coalesce(Job.color_grading_count, 0)
+                ),
+                0
+            ),
+            func.avg(Job.hook_score)
+        ).filter(Job.status == status).one()
+        
+        return {
+            "total_duration_ms": float(total_duration_ms),
+            "total_features": int(total_features),
+            "avg_hook_score": float(avg_hook_score) if avg_hook_score is not None else None
+        }
+    
+    def list_history(
+        self,
+        limit: int = 50,
+        offset: int = 0,
+        status: Optional[JobStatus] = None
+    ) -> List[Job]:
+        """获取历史记录列表（只加载摘要列）"""
+        query = self.db.query(Job).options(load_only(*JOB_LIST_COLUMNS))
+        if status is not None:
+            query = query.filter(Job.status == status)
+        return (
+            query
+            .order_by(Job.created_at.desc(), Job.id.desc())
+            .offset(offset)
+            .limit(limit)
+            .all()
+        )
+    
+    def list_page(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        status: Optional[JobStatus] = None
+    ) -> Tuple[List[Job], Optional[str]]:
+        """
+        按 (created_at, id) 倒序游标分页（只加载摘要列）
+        
+        Returns:
+            (本页Job列表, 下一页游标)，没有下一页时游标为None
+        """
+        query = self.db.query(Job).options(load_only(*JOB_LIST_COLUMNS))
+        if status is not None:
+            query = query.filter(Job.status == status)
+        if cursor:
+            created_at, job_id = decode_cursor(cursor)
+            query = query.filter(tuple_(Job.created_at, Job.id) < (created_at, job_id))
+        
+        jobs = query.order_by(Job.created_at.desc(), Job.id.desc()).limit(limit + 1).all()
+        if len(jobs) > limit:
+            jobs = jobs[:limit]
+            return jobs, encode_cursor(jobs[-1])
+        return jobs, None
     
     def count_by_status(self) -> dict:
-        """按状态统计Job数量"""
-        result = {}
-        for status in JobStatus:
-            count = self.db.query(Job).filter(Job.status == status).count()
-            result[status] = count
-        return result
+        """按状态统计Job数量（读计数汇总表）"""
+        return JobCounterRepository(self.db).count_by_status()
     
     def list_by_status(self, status: JobStatus, limit: int = 100) -> List[Job]:
         """按状态列出Job"""
@@ -134,11 +273,226 @@ class JobRepository:
         job = self.get(job_id)
         if not job:
             return False
+        JobCounterRepository(self.db).add(job.created_at, job.status, -1)
+        # 队列项没有外键约束，需一并删除，否则worker会领取到不存在的Job
+        self.db.query(JobQueueItem).filter(JobQueueItem.job_id == job_id).delete()
         self.db.delete(job)
         self.db.flush()
         return True
 
 
+# Session.info 中的标记：本事务改动了Job计数
+_DASHBOARD_DIRTY = "dashboard_cache_dirty"
+
+
+def _invalidate_dashboard_on_commit(db: Session):
+    """提交后再清仪表板缓存（提交前清的话，并发请求会把旧计数重新缓存一个TTL）"""
+    db.info[_DASHBOARD_DIRTY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _clear_dashboard_cache(db: Session):
+    if db.info.pop(_DASHBOARD_DIRTY, False):
+        dashboard_cache.clear()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_dashboard_dirty(db: Session):
+    db.info.pop(_DASHBOARD_DIRTY, None)
+
+
+class JobCounterRepository:
+    """
+    Job计数汇总仓储
+    
+    job_daily_counts 按（创建日期, 状态）保存Job数量，与Job的写入在同一事务中增减，
+    仪表板的状态统计和按天统计只需扫描这张小表。
+    """
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def add(self, created_at: Optional[datetime], status: JobStatus, delta: int):
+        """增减某天某状态的计数"""
+        day = (created_at or datetime.utcnow()).date()
+        statement = sqlite_insert(JobDailyCount).values(day=day, status=status, count=delta)
+        self.db.execute(statement.on_conflict_do_update(
+            index_elements=[JobDailyCount.day, JobDailyCount.status],
+            set_={"count": JobDailyCount.count + delta}
+        ))
+        _invalidate_dashboard_on_commit(self.db)
+    
+    def count_by_status(self) -> Dict[JobStatus, int]:
+        """按状态统计Job数量"""
+        result = {status: 0 for status in JobStatus}
+        rows = self.db.query(
+            JobDailyCount.status,
+            func.sum(JobDailyCount.count)
+        ).group_by(JobDailyCount.status).all()
+        for status, count in rows:
+            result[status] = int(count or 0)
+        return result
+    
+    def count_by_day(self, since: date) -> Dict[date, int]:
+        """统计 since（含）之后每天创建的Job数量"""
+        rows = self.db.query(
+            JobDailyCount.day,
+            func.sum(JobDailyCount.count)
+        ).filter(JobDailyCount.day >= since).group_by(JobDailyCount.day).all()
+        return {day: int(count or 0) for day, count in rows}
+    
+    def is_empty(self) -> bool:
+        return self.db.query(JobDailyCount).first() is None
+    
+    def rebuild(self) -> int:
+        """从jobs表重新计算全部计数（首次启用或数据修复时），返回Job总数"""
+        rows = self.db.query(
+            func.date(Job.created_at),
+            Job.status,
+            func.count(Job.id)
+        ).group_by(func.date(Job.created_at), Job.status).all()
+        
+        counts: Dict[Tuple[date, JobStatus], int] = {}
+        today = datetime.utcnow().date()
+        for day, status, count in rows:
+            key = (date.fromisoformat(day) if day else today, status)
+            counts[key] = counts.get(key, 0) + count
+        
+        self.db.query(JobDailyCount).delete()
+        self.db.add_all([
+            JobDailyCount(day=day, status=status, count=count)
+            for (day, status), count in counts.items()
+        ])
+        self.db.flush()
+        _invalidate_dashboard_on_commit(self.db)
+        return sum(counts.values())
+
+
+class JobSegmentRepository:
+    """Job片段仓储"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def replace_all(
+        self,
+        job_id: str,
+        segments: List[Dict[str, Any]],
+        asset_role: str = "target"
+    ):
+        """写入全部片段（场景切分完成时调用，覆盖已有片段）"""
+        self.db.query(JobSegment).filter(
+            JobSegment.job_id == job_id,
+            JobSegment.asset_role == asset_role
+        ).delete()
+        
+        self.db.add_all([
+            JobSegment(
+                job_id=job_id,
+                asset_role=asset_role,
+                seq=seq,
+                segment_id=segment.get("segment_id"),
+                analyzing=bool(segment.get("analyzing")),
+                data_json=json.dumps(segment, ensure_ascii=False)
+            )
+            for seq, segment in enumerate(segments)
+        ])
+        self.db.flush()
+    
+    def upsert(
+        self,
+        job_id: str,
+        seq: int,
+        segment: Dict[str, Any],
+        asset_role: str = "target"
+    ) -> JobSegment:
+        """更新单个片段（不存在则插入），只序列化这一个片段"""
+        row = self.db.query(JobSegment).filter(
+            JobSegment.job_id == job_id,
+            JobSegment.asset_role == asset_role,
+            JobSegment.seq == seq
+        ).first()
+        
+        if row is None:
+            row = JobSegment(job_id=job_id, asset_role=asset_role, seq=seq)
+            self.db.add(row)
+        
+        row.segment_id = segment.get("segment_id")
+        row.analyzing = bool(segment.get("analyzing"))
+        row.data_json = json.dumps(segment, ensure_ascii=False)
+        row.updated_at = datetime.utcnow()
+        self.db.flush()
+        return row
+    
+    def list_segments(self, job_id: str, asset_role: str = "target") -> List[Dict[str, Any]]:
+        """按顺序读取片段"""
+        rows = self.db.query(JobSegment.data_json).filter(
+            JobSegment.job_id == job_id,
+            JobSegment.asset_role == asset_role
+        ).order_by(JobSegment.seq.asc()).all()
+        return [json.loads(data_json) for (data_json,) in rows]
+
+
+class JobQueueRepository:
+    """Job队列仓储"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def enqueue(self, job_id: str, job_config: dict, priority: int = 0) -> JobQueueItem:
+        """Job入队"""
+        item = JobQueueItem(
+            job_id=job_id,
+            priority=priority,
+            config_json=json.dumps(job_config, ensure_ascii=False)
+        )
+        self.db.add(item)
+        self.db.flush()
+        return item
+    
+    def depth(self) -> int:
+        """排队中（未被领取）的Job数量"""
+        return self.db.query(JobQueueItem).filter(JobQueueItem.claimed_at.is_(None)).count()
+    
+    def claim_next(self, by_priority: bool = True) -> Optional[Tuple[str, dict]]:
+        """领取下一个排队中的Job，并将Job状态置为running（Job已被删除的队列项直接移除）"""
+        query = self.db.query(JobQueueItem).filter(JobQueueItem.claimed_at.is_(None))
+        if by_priority:
+            query = query.order_by(JobQueueItem.priority.desc(), JobQueueItem.id.asc())
+        else:
+            query = query.order_by(JobQueueItem.id.asc())
+        
+        job_repo = JobRepository(self.db)
+        while True:
+            item = query.first()
+            if not item:
+                return None
+            if job_repo.get(item.job_id) is not None:
+                break
+            self.db.delete(item)
+            self.db.flush()
+        
+        item.claimed_at = datetime.utcnow()
+        item.attempts += 1
+        job_repo.update_status(item.job_id, JobStatus.RUNNING)
+        self.db.flush()
+        return item.job_id, json.loads(item.config_json)
+    
+    def complete(self, job_id: str):
+        """Job执行结束，移出队列"""
+        self.db.query(JobQueueItem).filter(JobQueueItem.job_id == job_id).delete()
+        self.db.flush()
+    
+    def list_claimed(self) -> List[JobQueueItem]:
+        """列出已被领取（执行中）的队列项"""
+        return self.db.query(JobQueueItem).filter(JobQueueItem.claimed_at.isnot(None)).all()
+    
+    def release(self, item: JobQueueItem):
+        """将已领取的队列项放回队列"""
+        item.claimed_at = None
+        self.db.flush()
+
+
 class AssetRepository:
     """Asset仓储"""
     
@@ -157,6 +511,12 @@ class AssetRepository:
             Asset.job_id == job_id,
             Asset.role == role
         ).first()
+    
+    def upsert(self, asset: Asset) -> Asset:
+        """创建Asset，已存在同ID的Asset时（Job重跑）覆盖其字段"""
+        asset = self.db.merge(asset)
+        self.db.flush()
+        return asset
 
 
 class ArtifactRepository:
@@ -174,6 +534,15 @@ class ArtifactRepository:
     def list_by_job(self, job_id: str) -> List[Artifact]:
         """列出Job的所有Artifact"""
         return self.db.query(Artifact).filter(Artifact.job_id == job_id).all()
+    
+    def delete_by_job_and_role(self, job_id: str, asset_role: str) -> int:
+        """删除Job某个角色资源的全部Artifact"""
+        count = self.db.query(Artifact).filter(
+            Artifact.job_id == job_id,
+            Artifact.asset_role == asset_role
+        ).delete()
+        self.db.flush()
+        return count
 
 
 class VirtualMotionJobRepository:
@@ -1,5 +1,6 @@
 """数据库会话管理"""
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, Session
 from contextlib import contextmanager
 from typing import Generator
@@ -7,12 +8,54 @@ from ..core.config import settings
 from .models import Base
 
 
+def _apply_performance_pragmas(dbapi_connection, connection_record):
+    """每个新连接设置性能相关PRAGMA"""
+    cursor = dbapi_connection.cursor()
+    # WAL：读写互不阻塞（SSE读取与进度写入并发）
+    cursor.execute("PRAGMA journal_mode=WAL")
+    # WAL模式下NORMAL仍保证一致性，只在checkpoint时fsync
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+    # 负数表示KiB
+    cursor.execute(f"PRAGMA cache_size=-{int(settings.sqlite_cache_size_kb)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def create_db_engine(sqlite_path: str, profile: str = None) -> Engine:
+    """
+    创建SQLite引擎
+    
+    profile=performance 时启用WAL等PRAGMA并按配置设置连接池大小；
+    profile=default 时保持SQLite/SQLAlchemy默认行为。
+    """
+    profile = (profile or settings.sqlite_profile).lower()
+    
+    if profile != "performance":
+        return create_engine(
+            f"sqlite:///{sqlite_path}",
+            connect_args={"check_same_thread": False},
+            echo=False
+        )
+    
+    db_engine = create_engine(
+        f"sqlite:///{sqlite_path}",
+        connect_args={
+            "check_same_thread": False,
+            "timeout": settings.sqlite_busy_timeout_ms / 1000
+        },
+        pool_size=settings.sqlite_pool_size,
+        max_overflow=settings.sqlite_max_overflow,
+        pool_timeout=settings.sqlite_pool_timeout,
+        echo=False
+    )
+    event.listen(db_engine, "connect", _apply_performance_pragmas)
+    return db_engine
+
+
 # 创建引擎
-engine = create_engine(
-    f"sqlite:///{settings.sqlite_path}",
-    connect_args={"check_same_thread": False},
-    echo=False
-)
+engine = create_db_engine(settings.sqlite_path)
 
 # 会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -21,6 +64,13 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 def init_db():
     """初始化数据库"""
     Base.metadata.create_all(bind=engine)
+    
+    # 计数汇总表为空时（新建表或旧库升级）从jobs表回填
+    from .repo import JobCounterRepository
+    with get_db() as db:
+        counters = JobCounterRepository(db)
+        if counters.is_empty():
+            counters.rebuild()
 
 
 @contextmanager
@@ -35,4 +85,3 @@ def get_db() -> Generator[Session, None, None]:
         raise
     finally:
         db.close()
-
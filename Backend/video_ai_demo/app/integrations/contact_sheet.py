@@ -0,0 +1,125 @@
+"""联系表：把片段的多帧拼成一张带时间戳标注的拼图，一个片段只发一张图"""
+import hashlib
+import math
+import os
+import uuid
+from pathlib import Path
+from typing import Optional, Sequence
+
+from ..core.config import settings
+from ..core.errors import LLMAPIError
+
+
+BANNER_HEIGHT = 32
+GAP = 4
+BACKGROUND = (24, 24, 24)
+
+
+def format_timestamp(ts_ms: float) -> str:
+    """毫秒转 mm:ss.mmm"""
+    total_ms = int(round(ts_ms))
+    minutes, rest = divmod(total_ms, 60_000)
+    return f"{minutes:02d}:{rest // 1000:02d}.{rest % 1000:03d}"
+
+
+def sheet_path(
+    image_paths: Sequence[str],
+    timestamps_ms: Sequence[float],
+    title: str,
+    cell_width: int
+) -> Path:
+    """
+    联系表的存放路径：帧目录旁的 contact_sheets/，文件名由输入内容决定
+    
+    相同的帧和参数得到同一路径，重复分析（含LLM缓存命中）时不再重新拼图。
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{title}\0{cell_width}".encode("utf-8"))
+    for path, ts_ms in zip(image_paths, timestamps_ms):
+        stat = os.stat(path)
+        digest.update(f"\0{path}\0{stat.st_mtime_ns}\0{stat.st_size}\0{ts_ms}".encode("utf-8"))
+    sheets_dir = Path(image_paths[0]).resolve().parent.parent / "contact_sheets"
+    return sheets_dir / f"{digest.hexdigest()[:32]}.jpg"
+
+
+def build_contact_sheet(
+    image_paths: Sequence[str],
+    timestamps_ms: Sequence[float],
+    title: str = "",
+    cell_width: Optional[int] = None,
+    columns: Optional[int] = None
+) -> str:
+    """
+    按网格拼接帧，左上角标注序号和时间戳，顶部标注标题（如片段ID与时间范围）
+    
+    Args:
+        image_paths: 按时间排序的帧路径
+        timestamps_ms: 与帧对应的时间戳
+        title: 顶部标题，为空时不画标题栏
+        cell_width: 单元格宽度，默认取 settings.llm_contact_sheet_cell_width
+        columns: 列数，默认接近正方形排布
+    
+    Returns:
+        联系表图片路径
+    """
+    import cv2
+    import numpy as np
+    
+    if not image_paths:
+        raise LLMAPIError("联系表没有可用的帧")
+    cell_width = cell_width or settings.llm_contact_sheet_cell_width
+    
+    output_path = sheet_path(image_paths, timestamps_ms, title, cell_width)
+    if output_path.exists():
+        return str(output_path)
+    
+    images = []
+    for path, ts_ms in zip(image_paths, timestamps_ms):
+        image = cv2.imread(str(path), cv2.IMREAD_COLOR)
+        if image is not None:
+            images.append((image, ts_ms))
+    if not images:
+        raise LLMAPIError(f"联系表的帧均无法读取: {image_paths[0]}")
+    
+    first_height, first_width = images[0][0].shape[:2]
+    cell_height = max(1, round(cell_width * first_height / first_width))
+    columns = columns or math.ceil(math.sqrt(len(images)))
+    rows = math.ceil(len(images) / columns)
+    banner = BANNER_HEIGHT if title else 0
+    
+    sheet = np.full(
+        (banner + rows * cell_height + (rows + 1) * GAP, columns * cell_width + (columns + 1) * GAP, 3),
+        BACKGROUND,
+        dtype=np.uint8
+    )
+    if title:
+        cv2.putText(sheet, title, (GAP + 4, banner - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.6,
+                    (255, 255, 255), 1, cv2.LINE_AA)
+    
+    for i, (image, ts_ms) in enumerate(images):
+        row, col = divmod(i, columns)
+        # 等比缩放后居中放入单元格
+        height, width = image.shape[:2]
+        scale = min(cell_width / width, cell_height / height)
+        resized = cv2.resize(
+            image,
+            (max(1, round(width * scale)), max(1, round(height * scale))),
+            interpolation=cv2.INTER_AREA
+        )
+        top = banner + GAP + row * (cell_height + GAP) + (cell_height - resized.shape[0]) // 2
+        left = GAP + col * (cell_width + GAP) + (cell_width - resized.shape[1]) // 2
+        sheet[top:top + resized.shape[0], left:left + resized.shape[1]] = resized
+        
+        label = f"#{i + 1} {format_timestamp(ts_ms)}"
+        (text_width, text_height), baseline = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)
+        cv2.rectangle(sheet, (left, top), (left + text_width + 8, top + text_height + baseline + 6),
+                      (0, 0, 0), -1)
+        cv2.putText(sheet, label, (left + 4, top + text_height + 3), cv2.FONT_HERSHEY_SIMPLEX, 0.5,
+                    (255, 255, 255), 1, cv2.LINE_AA)
+    
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_name(f".{uuid.uuid4().hex}.jpg")
+    if not cv2.imwrite(str(tmp_path), sheet, [cv2.IMWRITE_JPEG_QUALITY, 90]):
+        raise LLMAPIError(f"联系表写入失败: {output_path}")
+    os.replace(tmp_path, output_path)
+    return str(output_path)
@@ -0,0 +1,385 @@
+"""URL视频下载：断点续传、分段并行、大小/时间限制，按URL缓存并用ETag/Last-Modified重新验证"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from ..core.config import settings
+from ..core.errors import VideoProcessingError
+from ..core.logging import logger
+
+
+class _Incomplete(Exception):
+    """连接中断或长度不符，可从已下载位置续传"""
+
+
+class _RangeIgnored(Exception):
+    """服务器未按Range返回（资源已变化或不支持分段），需从头下载"""
+
+
+class VideoDownloader:
+    """
+    URL视频下载器
+    
+    缓存目录中每个URL对应三个文件（key = sha256(url)）：
+        <key>.bin   完整内容
+        <key>.part  下载中的内容（中断后据此续传）
+        <key>.json  元数据（ETag/Last-Modified、大小、分段进度）
+    
+    缓存在 fresh_seconds 内直接使用；过期后发条件请求，304则继续使用，
+    不重新传输内容。大文件且服务器支持Range时分段并行下载。
+    写盘在线程中进行，不阻塞事件循环。
+    """
+    
+    def __init__(
+        self,
+        cache_dir: Path,
+        chunk_size: Optional[int] = None,
+        parallel_segments: Optional[int] = None,
+        parallel_min_bytes: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        fresh_seconds: Optional[float] = None,
+        cache_max_bytes: Optional[int] = None
+    ):
+        def pick(value, default):
+            return default if value is None else value
+        
+        self.cache_dir = Path(cache_dir)
+        self.chunk_size = pick(chunk_size, settings.download_chunk_size)
+        self.parallel_segments = pick(parallel_segments, settings.download_parallel_segments)
+        self.parallel_min_bytes = pick(parallel_min_bytes, settings.download_parallel_min_bytes)
+        self.max_bytes = pick(max_bytes, settings.download_max_bytes)
+        self.timeout = pick(timeout, settings.download_timeout)
+        self.max_retries = pick(max_retries, settings.download_max_retries)
+        self.fresh_seconds = pick(fresh_seconds, settings.download_cache_fresh_seconds)
+        self.cache_max_bytes = pick(cache_max_bytes, settings.download_cache_max_bytes)
+        
+        self.stats = {"hits": 0, "revalidated": 0, "downloads": 0, "resumes": 0}
+        self._locks: Dict[str, asyncio.Lock] = {}
+    
+    # ===== 对外接口 =====
+    
+    async def fetch(self, url: str) -> Path:
+        """
+        获取URL内容，返回缓存中的完整文件路径
+        
+        同一URL的并发请求只下载一次。
+        """
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        
+        async with lock:
+            try:
+                return await asyncio.wait_for(self._fetch(url, key), timeout=self.timeout)
+            except asyncio.TimeoutError:
+                raise VideoProcessingError(f"视频下载超时（{self.timeout:.0f}秒）: {url}")
+    
+    # ===== 流程 =====
+    
+    def _paths(self, key: str):
+        return (
+            self.cache_dir / f"{key}.bin",
+            self.cache_dir / f"{key}.part",
+            self.cache_dir / f"{key}.json"
+        )
+    
+    async def _fetch(self, url: str, key: str) -> Path:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        data_path, part_path, meta_path = self._paths(key)
+        meta = _load_meta(meta_path)
+        if meta.get("url") != url:
+            meta = {}
+        
+        async with httpx.AsyncClient(
+            follow_redirects=True,
+            timeout=httpx.Timeout(30.0, read=60.0)
+        ) as client:
+            if data_path.exists() and meta.get("complete"):
+                if time.time() - meta.get("fetched_at", 0) < self.fresh_seconds:
+                    self.stats["hits"] += 1
+                    os.utime(data_path)
+                    logger.info(f"视频下载命中缓存: {url}")
+                    return data_path
+                
+                if await self._revalidate(client, url, meta):
+                    self.stats["revalidated"] += 1
+                    meta["fetched_at"] = time.time()
+                    _save_meta(meta_path, meta)
+                    os.utime(data_path)
+                    logger.info(f"视频缓存仍有效（304）: {url}")
+                    return data_path
+                
+                logger.info(f"视频已变化，重新下载: {url}")
+                meta = {}
+            
+            if not meta or meta.get("complete"):
+                meta = {"url": url}
+                if part_path.exists():
+                    part_path.unlink()
+            elif part_path.exists():
+                logger.info(f"续传未完成的下载: {url}")
+            
+            self.stats["downloads"] += 1
+            await self._download(client, url, part_path, meta, meta_path)
+        
+        os.replace(part_path, data_path)
+        meta.pop("segments", None)
+        meta.update(complete=True, fetched_at=time.time(), size=data_path.stat().st_size)
+        _save_meta(meta_path, meta)
+        logger.info(f"视频下载完成: {url}（{meta['size']} bytes）")
+        
+        await asyncio.to_thread(self._prune, data_path)
+        return data_path
+    
+    async def _revalidate(self, client: httpx.AsyncClient, url: str, meta: Dict[str, Any]) -> bool:
+        """条件请求，返回缓存是否仍然有效（只读响应头，不读取内容）"""
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        if not headers:
+            return False
+        
+        try:
+            async with client.stream("GET", url, headers=headers) as response:
+                return response.status_code == 304
+        except httpx.HTTPError as e:
+            # 源站不可达时继续使用缓存
+            logger.warning(f"视频缓存重新验证失败，使用缓存: {str(e)}")
+            return True
+    
+    async def _download(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        part_path: Path,
+        meta: Dict[str, Any],
+        meta_path: Path
+    ):
+        """下载到 part_path，连接中断时按已下载位置续传"""
+        failures = 0
+        while True:
+            try:
+                if meta.get("segments"):
+                    await self._download_segments(client, url, part_path, meta)
+                else:
+                    await self._download_sequential(client, url, part_path, meta, meta_path)
+                return
+            except (_Incomplete, httpx.TransportError) as e:
+                failures += 1
+                _save_meta(meta_path, meta)
+                if failures > self.max_retries:
+                    raise VideoProcessingError(f"下载中断且重试{self.max_retries}次仍失败: {str(e) or type(e).__name__}")
+                logger.warning(f"下载中断，{failures}/{self.max_retries} 次重试: {str(e) or type(e).__name__}")
+                await asyncio.sleep(min(0.5 * 2 ** (failures - 1), 5.0))
+            except _RangeIgnored as e:
+                failures += 1
+                if failures > self.max_retries:
+                    raise VideoProcessingError(f"视频下载失败: {str(e)}")
+                logger.warning(f"{str(e)}，从头下载")
+                meta.clear()
+                meta["url"] = url
+                if part_path.exists():
+                    part_path.unlink()
+    
+    def _range_headers(self, meta: Dict[str, Any], start: int, end: Optional[int] = None) -> Dict[str, str]:
+        headers = {"Range": f"bytes={start}-{'' if end is None else end}"}
+        validator = meta.get("etag") or meta.get("last_modified")
+        if validator:
+            headers["If-Range"] = validator
+        return headers
+    
+    async def _download_sequential(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        part_path: Path,
+        meta: Dict[str, Any],
+        meta_path: Path
+    ):
+        offset = part_path.stat().st_size if part_path.exists() else 0
+        headers = self._range_headers(meta, offset) if offset else {}
+        parallel = False
+        
+        async with client.stream("GET", url, headers=headers) as response:
+            if offset:
+                if response.status_code != 206 or not _content_range_starts_at(response, offset):
+                    raise _RangeIgnored("服务器未按Range续传")
+                self.stats["resumes"] += 1
+            else:
+                response.raise_for_status()
+                self._record_response(meta, response)
+                parallel = self._should_parallelize(meta)
+                if parallel:
+                    meta["segments"] = self._plan_segments(meta["size"])
+                _save_meta(meta_path, meta)
+            
+            if not parallel:
+                f = await asyncio.to_thread(open, part_path, "ab" if offset else "wb")
+                try:
+                    written = await self._copy_body(response, offset, f.write)
+                finally:
+                    await asyncio.to_thread(f.close)
+        
+        if parallel:
+            # 大文件改为分段并行下载（放弃首个响应的内容）
+            await self._download_segments(client, url, part_path, meta)
+            return
+        
+        if meta.get("size") is not None and written != meta["size"]:
+            raise _Incomplete(f"已下载{written}/{meta['size']}字节")
+    
+    async def _download_segments(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        part_path: Path,
+        meta: Dict[str, Any]
+    ):
+        """按 meta["segments"]（[起始, 结束(含), 已完成字节]）并行下载各段"""
+        if not part_path.exists():
+            for segment in meta["segments"]:
+                segment[2] = 0
+        if not part_path.exists() or part_path.stat().st_size != meta["size"]:
+            with open(part_path, "ab") as f:
+                f.truncate(meta["size"])
+        
+        fd = os.open(part_path, os.O_WRONLY)
+        
+        async def fetch_segment(segment: List[int]):
+            start, end, done = segment
+            if start + done > end:
+                return
+            headers = self._range_headers(meta, start + done, end)
+            async with client.stream("GET", url, headers=headers) as response:
+                if response.status_code != 206 or not _content_range_starts_at(response, start + done):
+                    raise _RangeIgnored("服务器未按Range返回分段")
+                
+                def write_at(data: bytes):
+                    os.pwrite(fd, data, segment[0] + segment[2])
+                    segment[2] += len(data)
+                
+                await self._copy_body(response, start + done, write_at)
+            
+            if start + segment[2] <= end:
+                raise _Incomplete(f"分段 {start}-{end} 未下载完整")
+        
+        tasks = [asyncio.create_task(fetch_segment(segment)) for segment in meta["segments"]]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            os.close(fd)
+    
+    async def _copy_body(self, response: httpx.Response, written: int, write) -> int:
+        """按 chunk_size 攒批写盘（线程中执行），返回写入后的总字节数"""
+        buffer = bytearray()
+        try:
+            async for chunk in response.aiter_bytes():
+                buffer += chunk
+                if written + len(buffer) > self.max_bytes:
+                    raise VideoProcessingError(f"视频超过大小上限（{self.max_bytes} bytes）")
+                if len(buffer) >= self.chunk_size:
+                    data = bytes(buffer)
+                    buffer.clear()
+                    await asyncio.to_thread(write, data)
+                    written += len(data)
+        finally:
+            # 中断时把已收到的数据也写入，续传从这里开始
+            if buffer:
+                write(bytes(buffer))
+                written += len(buffer)
+        return written
+    
+    # ===== 辅助 =====
+    
+    def _record_response(self, meta: Dict[str, Any], response: httpx.Response):
+        size = response.headers.get("content-length")
+        if response.headers.get("content-encoding"):
+            size = None  # 压缩传输时长度与内容不一致
+        meta.update(
+            etag=response.headers.get("etag"),
+            last_modified=response.headers.get("last-modified"),
+            size=int(size) if size is not None else None,
+            accept_ranges=response.headers.get("accept-ranges", "").lower() == "bytes"
+        )
+        if meta["size"] is not None and meta["size"] > self.max_bytes:
+            raise VideoProcessingError(f"视频超过大小上限（{meta['size']} > {self.max_bytes} bytes）")
+    
+    def _should_parallelize(self, meta: Dict[str, Any]) -> bool:
+        return (
+            self.parallel_segments > 1
+            and meta.get("accept_ranges")
+            and meta.get("size") is not None
+            and meta["size"] >= self.parallel_min_bytes
+        )
+    
+    def _plan_segments(self, size: int) -> List[List[int]]:
+        step = -(-size // self.parallel_segments)
+        return [
+            [start, min(start + step, size) - 1, 0]
+            for start in range(0, size, step)
+        ]
+    
+    def _prune(self, keep: Path):
+        """缓存总量超过上限时按最近使用时间淘汰"""
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob("*.bin"):
+            stat = path.stat()
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        
+        for _, size, path in sorted(entries):
+            if total <= self.cache_max_bytes:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            path.with_suffix(".json").unlink(missing_ok=True)
+            total -= size
+            logger.info(f"淘汰下载缓存: {path.name}")
+
+
+def _content_range_starts_at(response: httpx.Response, offset: int) -> bool:
+    content_range = response.headers.get("content-range", "")
+    try:
+        return int(content_range.split(" ")[1].split("-")[0]) == offset
+    except (IndexError, ValueError):
+        return False
+
+
+def _load_meta(meta_path: Path) -> Dict[str, Any]:
+    try:
+        return json.loads(meta_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_meta(meta_path: Path, meta: Dict[str, Any]):
+    tmp_path = meta_path.with_suffix(".json.tmp")
+    tmp_path.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp_path, meta_path)
+
+
+_downloader: Optional[VideoDownloader] = None
+
+
+def get_downloader() -> VideoDownloader:
+    """进程级下载器（缓存目录 data_dir/download_cache）"""
+    global _downloader
+    if _downloader is None:
+        _downloader = VideoDownloader(settings.data_dir / "download_cache")
+    return _downloader
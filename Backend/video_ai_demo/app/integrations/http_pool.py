@@ -0,0 +1,66 @@
+"""共享HTTP连接池（进程级，由FastAPI lifespan管理生命周期）"""
+import importlib.util
+from typing import Optional
+
+import httpx
+
+from ..core.config import settings
+from ..core.logging import logger
+
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _http2_available() -> bool:
+    """HTTP/2 依赖 h2 包（httpx[http2]），未安装时退回 HTTP/1.1"""
+    return importlib.util.find_spec("h2") is not None
+
+
+def _build_client() -> httpx.AsyncClient:
+    """按配置创建连接池客户端"""
+    http2 = settings.llm_http2
+    if http2 and not _http2_available():
+        logger.warning("未安装h2，LLM连接池退回HTTP/1.1（pip install 'httpx[http2]'）")
+        http2 = False
+    
+    limits = httpx.Limits(
+        max_connections=settings.llm_http_max_connections,
+        max_keepalive_connections=settings.llm_http_max_keepalive,
+        keepalive_expiry=settings.llm_http_keepalive_expiry
+    )
+    
+    logger.info(
+        f"创建LLM连接池: http2={http2}, "
+        f"max_connections={settings.llm_http_max_connections}, "
+        f"max_keepalive={settings.llm_http_max_keepalive}"
+    )
+    
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=limits,
+        timeout=httpx.Timeout(settings.llm_http_timeout)
+    )
+
+
+def init_http_client() -> httpx.AsyncClient:
+    """启动时创建共享客户端"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """获取共享客户端（脚本等未经过lifespan的场景下按需创建）"""
+    if _client is None or _client.is_closed:
+        return init_http_client()
+    return _client
+
+
+async def close_http_client():
+    """关闭时释放连接池"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        logger.info("LLM连接池已关闭")
@@ -0,0 +1,112 @@
+"""LLM图片载荷准备：缩放、重新编码并缓存data URL"""
+import asyncio
+import base64
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple
+
+from ..core.config import settings
+from ..core.errors import LLMAPIError
+from ..core.logging import logger
+
+
+_MIME_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.gif': 'image/gif',
+    '.webp': 'image/webp'
+}
+
+
+class ImageProfile(NamedTuple):
+    """图片编码参数（同时作为缓存key的一部分）"""
+    max_edge: int
+    quality: int
+    format: str  # jpeg / webp
+    
+    def signature(self) -> str:
+        return f"{self.format}:{self.max_edge}:{self.quality}"
+
+
+def default_profile() -> ImageProfile:
+    """从配置读取默认编码参数"""
+    return ImageProfile(
+        max_edge=settings.llm_image_max_edge,
+        quality=settings.llm_image_quality,
+        format=settings.llm_image_format.lower()
+    )
+
+
+def _raw_data_url(path: Path) -> str:
+    """原图直接转base64（无法解码时的降级方案）"""
+    mime_type = _MIME_TYPES.get(path.suffix.lower(), 'image/jpeg')
+    base64_image = base64.b64encode(path.read_bytes()).decode('utf-8')
+    return f"data:{mime_type};base64,{base64_image}"
+
+
+@lru_cache(maxsize=settings.llm_image_cache_size)
+def _encode_data_url(
+    path_str: str,
+    mtime_ns: int,
+    file_size: int,
+    profile: ImageProfile
+) -> str:
+    """按 (路径, mtime, 大小, 编码参数) 记忆编码结果"""
+    import cv2
+    
+    path = Path(path_str)
+    image = cv2.imread(path_str, cv2.IMREAD_COLOR)
+    if image is None:
+        logger.warning(f"图片解码失败，按原图发送: {path_str}")
+        return _raw_data_url(path)
+    
+    # 等比缩小到最长边不超过 max_edge
+    height, width = image.shape[:2]
+    longest = max(height, width)
+    if profile.max_edge > 0 and longest > profile.max_edge:
+        scale = profile.max_edge / longest
+        image = cv2.resize(
+            image,
+            (max(1, round(width * scale)), max(1, round(height * scale))),
+            interpolation=cv2.INTER_AREA
+        )
+    
+    if profile.format == "webp":
+        ext, mime_type = ".webp", "image/webp"
+        params = [cv2.IMWRITE_WEBP_QUALITY, profile.quality]
+    else:
+        ext, mime_type = ".jpg", "image/jpeg"
+        params = [cv2.IMWRITE_JPEG_QUALITY, profile.quality]
+    
+    ok, buffer = cv2.imencode(ext, image, params)
+    if not ok:
+        logger.warning(f"图片编码失败，按原图发送: {path_str}")
+        return _raw_data_url(path)
+    
+    # 重新编码反而更大时（如已经很小的图）保留原图
+    if len(buffer) >= file_size:
+        return _raw_data_url(path)
+    
+    base64_image = base64.b64encode(buffer.tobytes()).decode('utf-8')
+    return f"data:{mime_type};base64,{base64_image}"
+
+
+def prepare_image_url(image_path: str, profile: ImageProfile = None) -> str:
+    """准备图片data URL（缩放+编码，结果按文件版本缓存）"""
+    path = Path(image_path)
+    if not path.exists():
+        raise LLMAPIError(f"图片不存在: {image_path}")
+    
+    stat = path.stat()
+    return _encode_data_url(
+        str(path),
+        stat.st_mtime_ns,
+        stat.st_size,
+        profile or default_profile()
+    )
+
+
+async def prepare_image_url_async(image_path: str, profile: ImageProfile = None) -> str:
+    """在线程池中准备图片，避免解码/编码阻塞事件循环"""
+    return await asyncio.to_thread(prepare_image_url, image_path, profile)
@@ -0,0 +1,192 @@
+"""多模态LLM响应缓存（内容寻址，SQLite落盘）"""
+import hashlib
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from ..core.config import settings
+from ..core.logging import logger
+
+
+@lru_cache(maxsize=4096)
+def _file_digest(path: str, mtime_ns: int, size: int) -> str:
+    """图片内容哈希（按 路径+mtime+大小 记忆，同一帧不重复读盘）"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def image_content_hash(image_path: str) -> str:
+    """计算图片文件的内容哈希"""
+    stat = Path(image_path).stat()
+    return _file_digest(str(image_path), stat.st_mtime_ns, stat.st_size)
+
+
+class LLMResponseCache:
+    """
+    LLM响应缓存
+    
+    key = sha256(model + prompt + 各帧内容哈希)，同一视频被重复提交时
+    所有LLM调用都可直接命中。按总字节数做LRU淘汰，并带TTL过期。
+    """
+    
+    def __init__(
+        self,
+        db_path: Path,
+        max_bytes: int,
+        ttl_seconds: float
+    ):
+        self.db_path = Path(db_path)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_responses (
+                    key TEXT PRIMARY KEY,
+                    model TEXT,
+                    response TEXT NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_responses_last_access "
+                "ON llm_responses (last_access)"
+            )
+    
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(str(self.db_path), timeout=5.0)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def make_key(
+        model: str,
+        prompt: str,
+        image_paths: List[str],
+        variant: str = ""
+    ) -> str:
+        """根据模型、提示词、图片内容（及图片编码参数）生成缓存key"""
+        digest = hashlib.sha256()
+        digest.update(model.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(variant.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(prompt.encode("utf-8"))
+        for image_path in image_paths:
+            digest.update(b"\0")
+            digest.update(image_content_hash(image_path).encode("ascii"))
+        return digest.hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        """读取缓存，未命中或已过期返回None"""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT response, created_at FROM llm_responses WHERE key = ?",
+                (key,)
+            ).fetchone()
+            
+            if row is None:
+                self.misses += 1
+                return None
+            
+            response, created_at = row
+            if now - created_at > self.ttl_seconds:
+                conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            
+            conn.execute(
+                "UPDATE llm_responses SET last_access = ? WHERE key = ?",
+                (now, key)
+            )
+            self.hits += 1
+            return response
+    
+    def set(self, key: str, model: str, response: str):
+        """写入缓存，并按总大小淘汰最久未访问的条目"""
+        now = time.time()
+        size_bytes = len(response.encode("utf-8"))
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_responses "
+                "(key, model, response, size_bytes, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, size_bytes, now, now)
+            )
+            self._evict(conn, now)
+    
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        """删除过期条目，再按LRU淘汰到 max_bytes 以内"""
+        expired = conn.execute(
+            "DELETE FROM llm_responses WHERE created_at < ?",
+            (now - self.ttl_seconds,)
+        ).rowcount
+        self.evictions += max(expired, 0)
+        
+        total = conn.execute(
+            "SELECT COALESCE(SUM(size_bytes), 0) FROM llm_responses"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        
+        victims = []
+        for key, size_bytes in conn.execute(
+            "SELECT key, size_bytes FROM llm_responses ORDER BY last_access ASC"
+        ):
+            if total <= self.max_bytes:
+                break
+            victims.append((key,))
+            total -= size_bytes
+        
+        conn.executemany("DELETE FROM llm_responses WHERE key = ?", victims)
+        self.evictions += len(victims)
+        logger.info(f"LLM缓存淘汰{len(victims)}条记录")
+    
+    def stats(self) -> Dict[str, float]:
+        """命中统计"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+_cache: Optional[LLMResponseCache] = None
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """获取进程级缓存实例（未启用时返回None）"""
+    global _cache
+    if not settings.llm_cache_enabled:
+        return None
+    if _cache is None:
+        _cache = LLMResponseCache(
+            settings.data_dir / "llm_cache.db",
+            max_bytes=settings.llm_cache_max_bytes,
+            ttl_seconds=settings.llm_cache_ttl_seconds
+        )
+    return _cache
@@ -1,21 +1,80 @@
 """多模态大模型客户端适配层"""
+import asyncio
 import httpx
 import json
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Callable, NamedTuple, Optional, TypeVar
 from pathlib import Path
-import base64
+import sqlite3
 
 from ..core.config import settings
 from ..core.errors import LLMAPIError, ValidationError
 from ..core.json_schema import validate_decompose_result
 from ..core.logging import logger
+from .contact_sheet import build_contact_sheet, format_timestamp
+from .http_pool import get_http_client
+from .llm_cache import LLMResponseCache, get_llm_cache
+from .image_prep import ImageProfile, default_profile, prepare_image_url, prepare_image_url_async
+from ..pipeline.executors import run_blocking_io
+from ..pipeline.frame_hash import select_diverse
+from ..pipeline.frame_index import FrameIndex
+
+
+T = TypeVar("T")
 
 
 class FrameInput:
-    """帧输入"""
-    def __init__(self, ts_ms: float, image_path: str):
+    """帧输入（dhash 为帧索引中缓存的感知哈希，缺失时采样时再计算）"""
+    def __init__(self, ts_ms: float, image_path: str, dhash: Optional[str] = None):
         self.ts_ms = ts_ms
         self.image_path = image_path
+        self.dhash = dhash
+
+
+class SegmentBatching(NamedTuple):
+    """场景特征分析的请求合并方式（Job的 options.llm 可覆盖全局配置）"""
+    contact_sheet: bool
+    batch_segments: int
+    max_segment_ms: float
+    
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "SegmentBatching":
+        config = config or {}
+        contact_sheet = config.get("contact_sheet")
+        return cls(
+            contact_sheet=bool(settings.llm_contact_sheet if contact_sheet is None else contact_sheet),
+            batch_segments=max(1, int(config.get("batch_segments") or settings.llm_batch_segments)),
+            max_segment_ms=float(
+                config.get("batch_max_segment_ms") or settings.llm_batch_max_segment_ms
+            )
+        )
+    
+    @property
+    def enabled(self) -> bool:
+        return self.contact_sheet or self.batch_segments > 1
+    
+    def plan(self, segments: List[Dict[str, Any]]) -> List[List[int]]:
+        """
+        按顺序把相邻的短片段打包，每包最多 batch_segments 个；长片段单独一包
+        
+        Returns:
+            每个请求包含的片段下标
+        """
+        batches: List[List[int]] = []
+        current: List[int] = []
+        for idx, seg in enumerate(segments):
+            if self.batch_segments > 1 and seg["end_ms"] - seg["start_ms"] <= self.max_segment_ms:
+                current.append(idx)
+                if len(current) == self.batch_segments:
+                    batches.append(current)
+                    current = []
+                continue
+            if current:
+                batches.append(current)
+                current = []
+            batches.append([idx])
+        if current:
+            batches.append(current)
+        return batches
 
 
 class MMHLLMClient:
@@ -25,11 +84,20 @@ class MMHLLMClient:
         self,
         base_url: Optional[str] = None,
         api_key: Optional[str] = None,
-        model: Optional[str] = None
+        model: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        cache: Optional[LLMResponseCache] = None,
+        image_profile: Optional[ImageProfile] = None
     ):
         self.base_url = base_url or settings.mm_llm_base_url
         self.api_key = api_key or settings.mm_llm_api_key
         self.model = model or settings.mm_llm_model
+        # 默认复用进程级连接池（keep-alive / HTTP2），避免每次请求重新建连
+        self.http_client = http_client or get_http_client()
+        # 响应缓存：相同模型+提示词+图片内容直接复用历史回复
+        self.cache = cache if cache is not None else get_llm_cache()
+        # 图片缩放/编码参数
+        self.image_profile = image_profile or default_profile()
         
         if not self.api_key:
             raise LLMAPIError("未配置MM_LLM_API_KEY")
@@ -76,18 +144,18 @@ class MMHLLMClient:
         
         prompt = self._build_shot_boundary_prompt(frames, sampled_frames)
         
-        response = await self._call_api(sampled_frames, prompt)
+        def parse(response: str) -> Any:
+            try:
+                # 尝试解析JSON
+                segments = json.loads(response)
+                if isinstance(segments, dict) and "segments" in segments:
+                    segments = segments["segments"]
+                return segments
+            except json.JSONDecodeError:
+                # 尝试从文本中提取JSON
+                return self._extract_json_from_text(response)
         
-        try:
-            # 尝试解析JSON
-            segments = json.loads(response)
-            if isinstance(segments, dict) and "segments" in segments:
-                segments = segments["segments"]
-            return segments
-        except json.JSONDecodeError:
-            # 尝试从文本中提取JSON
-            segments = self._extract_json_from_text(response)
-            return segments
+        return await self._call_api(sampled_frames, prompt, parse=parse)
     
     async def _analyze_segments(
         self,
@@ -98,6 +166,13 @@ class MMHLLMClient:
         """第二步：分析每个镜头的特征"""
         
         segments_with_features = []
+        frame_index = FrameIndex.of(frames)
+        
+        batching = SegmentBatching.from_config(prompt_config)
+        if batching.enabled:
+            return await self._analyze_segments_batched(
+                frame_index, segments_raw, prompt_config, batching
+            )
         
         for i, seg in enumerate(segments_raw):
             segment_id = seg.get("segment_id", f"seg_{i:03d}")
@@ -105,10 +180,7 @@ class MMHLLMClient:
             end_ms = seg.get("end_ms", frames[-1].ts_ms if frames else 0)
             
             # 获取该段的帧
-            segment_frames = [
-                f for f in frames
-                if start_ms <= f.ts_ms <= end_ms
-            ]
+            segment_frames = frame_index.range(start_ms, end_ms)
             
             if not segment_frames:
                 continue
@@ -132,6 +204,132 @@ class MMHLLMClient:
         
         return {"segments": segments_with_features}
     
+    async def _analyze_segments_batched(
+        self,
+        frame_index: FrameIndex,
+        segments_raw: List[Dict[str, Any]],
+        prompt_config: Optional[Dict[str, Any]],
+        batching: SegmentBatching
+    ) -> Dict[str, Any]:
+        """第二步（合并请求）：短片段打包成一次请求，按 segment_id 拆回各片段"""
+        enabled_modules = (prompt_config or {}).get("enabled_modules", [
+            "camera_motion", "lighting", "color_grading"
+        ])
+        
+        segments = []
+        frame_groups = []
+        for i, seg in enumerate(segments_raw):
+            start_ms = seg.get("start_ms", 0)
+            end_ms = seg.get("end_ms", frame_index[-1].ts_ms if len(frame_index) else 0)
+            segment_frames = frame_index.range(start_ms, end_ms)
+            if not segment_frames:
+                continue
+            segments.append({
+                "segment_id": seg.get("segment_id", f"seg_{i:03d}"),
+                "start_ms": start_ms,
+                "end_ms": end_ms
+            })
+            frame_groups.append(self._sample_frames(segment_frames, max_frames=5))
+        
+        features_by_id: Dict[str, List[Dict[str, Any]]] = {}
+        for batch in batching.plan(segments):
+            features_by_id.update(await self.analyze_segment_batch(
+                [segments[i] for i in batch],
+                [frame_groups[i] for i in batch],
+                enabled_modules,
+                batching.contact_sheet
+            ))
+        
+        return {"segments": [
+            {
+                **seg,
+                "duration_ms": seg["end_ms"] - seg["start_ms"],
+                "features": features_by_id.get(seg["segment_id"], [])
+            }
+            for seg in segments
+        ]}
+    
+    async def analyze_segment_batch(
+        self,
+        segments: List[Dict[str, Any]],
+        frame_groups: List[List[FrameInput]],
+        enabled_modules: List[str],
+        contact_sheet: bool = False,
+        local_motions: Optional[Dict[str, Dict[str, Any]]] = None,
+        local_modules: Optional[Dict[str, List[str]]] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        一次请求分析多个片段的特征
+        
+        contact_sheet 为真时每个片段的帧拼成一张联系表，否则按片段顺序依次附上各帧。
+        
+        Args:
+            segments: [{"segment_id", "start_ms", "end_ms"}]
+            frame_groups: 与 segments 对应的采样帧
+            local_motions: {segment_id: 本地已确定的运镜特征}，这些片段不再询问运镜方式
+            local_modules: {segment_id: 已完全由本地确定的模块}，这些片段不再询问这些模块
+        
+        Returns:
+            {segment_id: 规范化后的特征}，回复中缺失的片段不出现在结果中
+        """
+        if contact_sheet:
+            images = []
+            for seg, frames in zip(segments, frame_groups):
+                title = (
+                    f"{seg['segment_id']}  {format_timestamp(seg['start_ms'])}"
+                    f" - {format_timestamp(seg['end_ms'])}"
+                )
+                sheet = await asyncio.to_thread(
+                    build_contact_sheet,
+                    [frame.image_path for frame in frames],
+                    [frame.ts_ms for frame in frames],
+                    title
+                )
+                images.append(FrameInput(ts_ms=seg["start_ms"], image_path=sheet))
+            image_counts = [1] * len(segments)
+        else:
+            images = [frame for frames in frame_groups for frame in frames]
+            image_counts = [len(frames) for frames in frame_groups]
+        
+        prompt = self._build_batch_feature_prompt(
+            segments, image_counts, enabled_modules, contact_sheet, local_motions, local_modules
+        )
+        def parse(response: str) -> Dict[str, List[Dict[str, Any]]]:
+            try:
+                parsed = json.loads(response)
+            except json.JSONDecodeError:
+                parsed = self._extract_json_from_text(response)
+            return self._split_batch_features(parsed, segments)
+        
+        return await self._call_api(images, prompt, parse=parse)
+    
+    def _split_batch_features(
+        self,
+        parsed: Any,
+        segments: List[Dict[str, Any]]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """把合并请求的回复按 segment_id 拆回各片段并规范化"""
+        if isinstance(parsed, dict):
+            parsed = parsed.get("segments", [])
+        if not isinstance(parsed, list):
+            logger.warning(f"合并请求的回复不是片段列表: {type(parsed)}")
+            return {}
+        
+        by_id = {seg["segment_id"]: seg for seg in segments}
+        features_by_id = {}
+        for item in parsed:
+            if not isinstance(item, dict) or item.get("segment_id") not in by_id:
+                continue
+            seg = by_id[item["segment_id"]]
+            features_by_id[seg["segment_id"]] = self._normalize_features(
+                item.get("features", []), seg["start_ms"], seg["end_ms"]
+            )
+        
+        missing = set(by_id) - set(features_by_id)
+        if missing:
+            logger.warning(f"合并请求的回复缺少片段: {', '.join(sorted(missing))}")
+        return features_by_id
+    
     async def _analyze_segment_features(
         self,
         frames: List[FrameInput],
@@ -156,17 +354,17 @@ class MMHLLMClient:
             enabled_modules
         )
         
-        response = await self._call_api(sampled, prompt)
-        
-        try:
-            features = json.loads(response)
-            if isinstance(features, dict) and "features" in features:
-                features = features["features"]
+        def parse(response: str) -> List[Dict[str, Any]]:
+            try:
+                features = json.loads(response)
+                if isinstance(features, dict) and "features" in features:
+                    features = features["features"]
+            except json.JSONDecodeError:
+                features = self._extract_json_from_text(response)
             # 规范化features，补充缺失字段
             return self._normalize_features(features, start_ms, end_ms)
-        except json.JSONDecodeError:
-            features = self._extract_json_from_text(response)
-            return self._normalize_features(features, start_ms, end_ms)
+        
+        return await self._call_api(sampled, prompt, parse=parse)
     
     def _normalize_features(
         self,
@@ -224,108 +422,141 @@ class MMHLLMClient:
     async def _call_api(
         self,
         frames: List[FrameInput],
-        prompt: str
-    ) -> str:
-        """调用多模态API"""
+        prompt: str,
+        timeout: float = 120.0,
+        parse: Optional[Callable[[str], T]] = None
+    ) -> T:
+        """
+        调用多模态API（优先读取响应缓存）
+        
+        给出 parse 时返回解析后的结果，且只有解析成功、结果非空的回复才写入缓存，
+        避免截断或格式错误的回复在TTL内被反复重放；解析失败的缓存条目视为未命中。
+        """
+        parse = parse or (lambda reply: reply)
+        
+        cache_key = None
+        if self.cache is not None:
+            try:
+                cache_key = await run_blocking_io(
+                    self.cache.make_key,
+                    self.model,
+                    prompt,
+                    [frame.image_path for frame in frames],
+                    variant=self.image_profile.signature()
+                )
+                cached = await run_blocking_io(self.cache.get, cache_key)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"读取LLM缓存失败: {str(e)}")
+                cache_key = cached = None
+            if cached is not None:
+                try:
+                    result = parse(cached)
+                except LLMAPIError:
+                    result = None
+                if result:
+                    logger.info(f"LLM缓存命中: {cache_key[:12]}")
+                    return result
         
         # 构建消息内容
         content = [{"type": "text", "text": prompt}]
         
-        # 添加图片
-        for frame in frames:
-            image_url = self._prepare_image_url(frame.image_path)
+        # 添加图片（缩放/编码在线程池中并行完成）
+        image_urls = await asyncio.gather(*[
+            prepare_image_url_async(frame.image_path, self.image_profile)
+            for frame in frames
+        ])
+        for image_url in image_urls:
             content.append({
                 "type": "image_url",
                 "image_url": {"url": image_url}
             })
         
-        # 构建请求
+        messages = [
+            {
+                "role": "user",
+                "content": content
+            }
+        ]
+        
+        try:
+            reply = await self._post_chat_completion(messages, timeout=timeout)
+        except httpx.HTTPError as e:
+            raise LLMAPIError(f"API调用失败: {str(e)}")
+        
+        result = parse(reply)
+        
+        if cache_key and result:
+            try:
+                await run_blocking_io(self.cache.set, cache_key, self.model, reply)
+            except sqlite3.Error as e:
+                logger.warning(f"写入LLM缓存失败: {str(e)}")
+        
+        return result
+    
+    async def _post_chat_completion(
+        self,
+        messages: List[Dict[str, Any]],
+        timeout: float
+    ) -> str:
+        """通过共享连接池发送chat/completions请求，返回回复内容"""
+        
         payload = {
             "model": self.model,
-            "messages": [
-                {
-                    "role": "user",
-                    "content": content
-                }
-            ]
+            "messages": messages
         }
         
-        # 调用API
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
         
-        try:
-            async with httpx.AsyncClient(timeout=120.0) as client:
-                response = await client.post(
-                    f"{self.base_url}/chat/completions",
-                    headers=headers,
-                    json=payload
-                )
-                response.raise_for_status()
-                
-                result = response.json()
-                
-                # 提取回复内容
-                if "choices" in result and len(result["choices"]) > 0:
-                    message = result["choices"][0].get("message", {})
-                    return message.get("content", "")
-                
-                raise LLMAPIError("API响应格式异常", {"response": result})
+        response = await self.http_client.post(
+            f"{self.base_url}/chat/completions",
+            headers=headers,
+            json=payload,
+            timeout=timeout
+        )
+        response.raise_for_status()
         
-        except httpx.HTTPError as e:
-            raise LLMAPIError(f"API调用失败: {str(e)}")
+        result = response.json()
+        
+        # 提取回复内容
+        if "choices" in result and len(result["choices"]) > 0:
+            message = result["choices"][0].get("message", {})
+            return message.get("content", "")
+        
+        raise LLMAPIError("API响应格式异常", {"response": result})
     
     def _prepare_image_url(self, image_path: str) -> str:
-        """准备图片URL（转base64或使用文件路径）"""
-        path = Path(image_path)
-        if not path.exists():
-            raise LLMAPIError(f"图片不存在: {image_path}")
-        
-        # 读取图片并转base64
-        with open(path, "rb") as f:
-            image_data = f.read()
-            base64_image = base64.b64encode(image_data).decode('utf-8')
-            
-            # 检测图片格式
-            suffix = path.suffix.lower()
-            mime_type = {
-                '.jpg': 'image/jpeg',
-                '.jpeg': 'image/jpeg',
-                '.png': 'image/png',
-                '.gif': 'image/gif',
-                '.webp': 'image/webp'
-            }.get(suffix, 'image/jpeg')
-            
-            return f"data:{mime_type};base64,{base64_image}"
+        """准备图片URL（缩放后转base64，结果按文件版本缓存）"""
+        return prepare_image_url(image_path, self.image_profile)
     
     def _sample_frames(
         self,
         frames: List[FrameInput],
         max_frames: int
     ) -> List[FrameInput]:
-        """采样帧"""
-        if len(frames) <= max_frames:
-            return frames
-        
-        step = len(frames) / max_frames
-        indices = [int(i * step) for i in range(max_frames)]
-        return [frames[i] for i in indices]
+        """采样帧：按感知哈希去重，在预算内选出画面差异最大的帧"""
+        return select_diverse(frames, max_frames)
     
     def _build_shot_boundary_prompt(
         self,
         all_frames: List[FrameInput],
         sampled_frames: List[FrameInput]
     ) -> str:
-        """构建镜头边界识别提示词"""
+        """构建镜头边界识别提示词（关键帧按画面差异采样，时间不均匀，需逐帧给出时间戳）"""
         
         duration_ms = all_frames[-1].ts_ms if all_frames else 0
+        frame_times = "\n".join(
+            f"第{i}张: {frame.ts_ms:.0f}ms" for i, frame in enumerate(sampled_frames, 1)
+        )
         
         return f"""请分析这段视频的镜头切分（Shot Segmentation）。
 
 视频总时长: {duration_ms}ms
-提供的关键帧: {len(sampled_frames)}帧
+提供的关键帧: {len(sampled_frames)}帧（按时间顺序，画面重复的帧已省略，两帧之间的画面与前一帧相近）
+各关键帧的时间戳:
+{frame_times}
 
 请识别视频中的镜头边界，输出JSON格式：
 
@@ -345,12 +576,12 @@ class MMHLLMClient:
 ```
 
 要求：
-1. 根据画面变化识别镜头切换点
+1. 根据画面变化识别镜头切换点，切换点落在前后两张关键帧的时间戳之间
 2. segment_id按顺序命名
 3. 时间范围连续不重叠
 4. 只输出JSON，不要其他文字
 """
-    
+
     def _build_feature_analysis_prompt(
         self,
         segment_id: str,
@@ -457,7 +688,123 @@ class MMHLLMClient:
 4. 只输出JSON数组，不要其他文字
 5. 如果某个特征不明显，可以不输出该项
 """
-    
+
+    def _build_batch_feature_prompt(
+        self,
+        segments: List[Dict[str, Any]],
+        image_counts: List[int],
+        enabled_modules: List[str],
+        contact_sheet: bool,
+        local_motions: Optional[Dict[str, Dict[str, Any]]] = None,
+        local_modules: Optional[Dict[str, List[str]]] = None
+    ) -> str:
+        """
+        构建多片段合并分析的提示词（按片段返回JSON）
+        
+        local_motions / local_modules 中的片段标注已在本地确定、不要输出的内容；
+        全部片段的运镜方式都已确定时去掉运镜术语和示例。
+        """
+        from ..core.shot_terminology import get_shot_terminology_prompt
+        
+        local_motions = local_motions or {}
+        local_modules = local_modules or {}
+        has_camera = "camera_motion" in enabled_modules
+        all_local = has_camera and all(seg["segment_id"] in local_motions for seg in segments)
+        
+        modules_desc = {
+            "camera_motion": "景别和拍摄角度" if all_local else "运镜方式、景别和拍摄角度",
+            "lighting": "光线布局（如主光位置、补光、轮廓光等）",
+            "color_grading": "调色风格（如色温、饱和度、对比度风格等）"
+        }
+        
+        enabled_desc = "\n".join([
+            f"- {modules_desc.get(m, m)}" for m in enabled_modules
+        ])
+        
+        if contact_sheet:
+            image_desc = "每个片段对应一张联系表：按网格排列该片段的采样帧，左上角标注序号和时间戳，顶部标注片段ID和时间范围。"
+        else:
+            image_desc = "图片按片段顺序排列，各片段的图片数见下表。"
+        
+        segment_lines = []
+        image_no = 1
+        has_notes = False
+        for seg, count in zip(segments, image_counts):
+            images = f"第{image_no}张" if count == 1 else f"第{image_no}-{image_no + count - 1}张"
+            notes = [f"{images}图片"]
+            motion = local_motions.get(seg["segment_id"])
+            if has_camera and motion is not None:
+                notes.append(f"运镜方式已确定为{motion['value']}，不要输出运镜方式")
+            notes += [
+                f"{module}已确定，不要输出{module}"
+                for module in local_modules.get(seg["segment_id"], []) if module in enabled_modules
+            ]
+            has_notes = has_notes or len(notes) > 1
+            segment_lines.append(
+                f"- {seg['segment_id']}: {seg['start_ms']}ms - {seg['end_ms']}ms（{'，'.join(notes)}）"
+            )
+            image_no += count
+        segment_desc = "\n".join(segment_lines)
+        
+        first = segments[0]
+        examples = {
+            "camera_motion": ("medium_shot", "中景 - 人物腰部以上") if all_local else ("push_in", "推镜头 - 缓慢向前推进"),
+            "lighting": ("natural", "自然光从侧面照射"),
+            "color_grading": ("warm_tone", "暖色调，高饱和度")
+        }
+        example_category = next((m for m in enabled_modules if m in examples), "camera_motion")
+        example_type, example_value = examples[example_category]
+        
+        terminology = ""
+        module_requirement = "每个片段都要分析所有启用的特征类别"
+        if has_notes:
+            module_requirement += "（片段列表中注明不要输出的除外）"
+        if has_camera:
+            terminology = get_shot_terminology_prompt(include_movements=not all_local) + "\n\n"
+            camera_items = "景别和拍摄角度" if all_local else "景别、运镜方式和拍摄角度"
+            module_requirement += f"，camera_motion 需包含{camera_items}"
+        
+        return f"""请分别分析以下{len(segments)}个视频片段的影视特征。
+
+{terminology}{image_desc}
+
+片段列表：
+{segment_desc}
+
+需要分析的特征：
+{enabled_desc}
+
+请输出JSON格式，每个片段一项，segment_id 与片段列表一致：
+
+```json
+{{
+  "segments": [
+    {{
+      "segment_id": "{first['segment_id']}",
+      "features": [
+        {{
+          "category": "{example_category}",
+          "type": "{example_type}",
+          "value": "{example_value}",
+          "confidence": 0.85,
+          "evidence": {{
+            "time_ranges_ms": [[{first['start_ms']}, {first['end_ms']}]]
+          }}
+        }}
+      ]
+    }}
+  ]
+}}
+```
+
+要求：
+1. 每个片段都必须输出，且只根据该片段自己的图片分析
+2. {module_requirement}
+3. 每个feature的type使用英文key，value使用标准中文术语
+4. confidence为0-1的数值，time_ranges_ms 落在该片段的时间范围内
+5. 只输出JSON，不要其他文字
+"""
+
     def _extract_json_from_text(self, text: str) -> Any:
         """从文本中提取JSON"""
         # 尝试找到```json或```之间的内容
@@ -510,47 +857,18 @@ class MMHLLMClient:
         # 构建总结提示词
         prompt = self._build_summary_prompt(segments, duration_ms)
         
+        def parse(content: str) -> Dict[str, Any]:
+            summary = self._extract_json_from_text(content)
+            # 校验格式
+            if isinstance(summary, dict) and "title" in summary and "learning_points" in summary:
+                return summary
+            raise LLMAPIError("总结结果格式不正确")
+        
         # 调用 LLM（不传图片，只基于特征数据）
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(
-                    f"{self.base_url}/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": self.model,
-                        "messages": [
-                            {
-                                "role": "user",
-                                "content": prompt
-                            }
-                        ]
-                    }
-                )
-                response.raise_for_status()
-                
-                result = response.json()
-                
-                if "choices" in result and len(result["choices"]) > 0:
-                    message = result["choices"][0].get("message", {})
-                    content = message.get("content", "")
-                    
-                    # 解析JSON
-                    summary = self._extract_json_from_text(content)
-                    
-                    # 校验格式
-                    if isinstance(summary, dict) and "title" in summary and "learning_points" in summary:
-                        logger.info(f"总结完成: {summary['title']}")
-                        return summary
-                    else:
-                        raise LLMAPIError("总结结果格式不正确")
-                
-                raise LLMAPIError("API响应格式异常")
-        
-        except httpx.HTTPError as e:
-            logger.error(f"总结视频失败: {str(e)}")
+            summary = await self._call_api([], prompt, timeout=60.0, parse=parse)
+        except LLMAPIError as e:
+            logger.error(f"总结视频失败: {e.message}")
             # 返回默认值
             return {
                 "title": f"视频分析 - {len(segments)}个镜头",
@@ -559,6 +877,9 @@ class MMHLLMClient:
                     "注意观察不同镜头的运镜、光线和调色变化"
                 ]
             }
+        
+        logger.info(f"总结完成: {summary['title']}")
+        return summary
     
     def _build_summary_prompt(
         self,
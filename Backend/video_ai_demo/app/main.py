@@ -17,6 +17,11 @@ from .api import (
     routes_user
 )
 from .db.session import init_db
+from .db.progress_writer import progress_writer
+from .integrations.http_pool import init_http_client, close_http_client
+from .integrations.llm_cache import get_llm_cache
+from .pipeline.orchestrator import job_queue
+from .pipeline.executors import init_process_pool, shutdown_process_pool
 from .core.config import settings
 from .core.logging import logger
 
@@ -27,11 +32,18 @@ async def lifespan(app: FastAPI):
     # 启动时
     logger.info("初始化数据库...")
     init_db()
+    init_http_client()
+    init_process_pool()
+    await job_queue.start()
     logger.info("应用启动完成")
     
     yield
     
     # 关闭时
+    await job_queue.stop()
+    progress_writer.flush()
+    shutdown_process_pool()
+    await close_http_client()
     logger.info("应用关闭")
 
 
@@ -52,6 +64,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 跨域时前端需要读取 /history 的翻页游标
+    expose_headers=["X-Next-Cursor"],
 )
 
 # 注册路由
@@ -110,7 +124,12 @@ else:
 @app.get("/health")
 async def health_check():
     """健康检查"""
-    return {"status": "healthy"}
+    llm_cache = get_llm_cache()
+    return {
+        "status": "healthy",
+        "job_queue": job_queue.stats(),
+        "llm_cache": llm_cache.stats() if llm_cache else None
+    }
 
 
 if __name__ == "__main__":
@@ -0,0 +1,183 @@
+"""自适应抽帧：按场景边界和逐帧变化分数分配抽帧预算，切点附近与运动段密集、静止镜头稀疏"""
+import math
+import os
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+from ..core.logging import logger
+
+
+SAMPLING_MODES = ("fixed", "adaptive")
+
+# 变化分数在该尺寸的灰度缩略图上计算
+SCORE_SIZE = (64, 36)
+
+
+def resolve_mode(mode: Optional[str]) -> str:
+    """抽帧模式，未指定时取 settings.frame_sampling_mode"""
+    mode = (mode or settings.frame_sampling_mode).lower()
+    if mode not in SAMPLING_MODES:
+        logger.warning(f"未知的抽帧模式 {mode}，使用 fixed")
+        return "fixed"
+    return mode
+
+
+def thumbnail(frame: np.ndarray) -> np.ndarray:
+    """计算变化分数用的小尺寸灰度图"""
+    import cv2
+    
+    gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    return cv2.resize(gray, SCORE_SIZE, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+
+def change_score(prev: Optional[np.ndarray], cur: np.ndarray) -> float:
+    """两张缩略图的平均像素差（0~1），没有前一帧时为0"""
+    if prev is None:
+        return 0.0
+    return float(np.abs(cur - prev).mean()) / 255.0
+
+
+def score_image_files(paths: Iterable[str]) -> List[float]:
+    """对已写盘的候选帧逐帧计算变化分数（按1/4尺寸解码JPEG）"""
+    import cv2
+    
+    scores = []
+    prev = None
+    for path in paths:
+        image = cv2.imread(str(path), cv2.IMREAD_REDUCED_GRAYSCALE_4)
+        if image is None:
+            scores.append(0.0)
+            continue
+        thumb = thumbnail(image)
+        scores.append(change_score(prev, thumb))
+        prev = thumb
+    return scores
+
+
+def select_adaptive_frames(
+    timestamps_ms: Sequence[float],
+    scores: Sequence[float],
+    segments: Optional[Sequence[Tuple[float, float]]],
+    max_frames: int,
+    static_fps: Optional[float] = None,
+    motion_step: Optional[float] = None
+) -> List[int]:
+    """
+    从候选帧中选出不超过 max_frames 帧
+    
+    每个候选帧有一个"需要的帧数"：覆盖时长 × static_fps + 变化分数 / motion_step，
+    每个场景首帧额外 +1、切点前最后一帧额外 +0.5（跨切点的画面差不计入运动）。
+    各场景先保底1帧，剩余预算按需求量分配；场景分到2帧以上时首帧必取，其余帧在
+    需求量的累积分布上等分选取，因此运动段和切点附近取得密、静止镜头取得疏；
+    需求总量不足预算时不会用满。
+    场景内没有候选帧时取离场景中点最近的候选帧。场景数超过预算时均匀挑选场景。
+    
+    Args:
+        timestamps_ms: 候选帧时间戳（升序）
+        scores: 候选帧相对前一候选帧的变化分数（0~1）
+        segments: 场景 [(start_ms, end_ms)]，为空时整段视频视为一个场景
+    
+    Returns:
+        选中的候选帧下标（升序）
+    """
+    ts = np.asarray(timestamps_ms, dtype=np.float64)
+    n = len(ts)
+    if n == 0 or max_frames <= 0:
+        return []
+    
+    static_fps = settings.adaptive_static_fps if static_fps is None else static_fps
+    motion_step = settings.adaptive_motion_step if motion_step is None else motion_step
+    motion = np.asarray(scores, dtype=np.float64).copy()
+    
+    if not segments:
+        segments = [(float(ts[0]), float(ts[-1]) + 1.0)]
+    
+    # 每个场景的候选帧区间 [lo, hi)
+    slices = []
+    for i, (start_ms, end_ms) in enumerate(segments):
+        last = i == len(segments) - 1
+        lo = int(np.searchsorted(ts, start_ms, side="left"))
+        hi = int(np.searchsorted(ts, end_ms, side="right" if last else "left"))
+        if lo >= hi:
+            nearest = int(np.argmin(np.abs(ts - (start_ms + end_ms) / 2)))
+            lo, hi = nearest, nearest + 1
+        slices.append((lo, hi))
+    
+    # 每个候选帧代表的时长（秒）
+    gaps = np.diff(ts)
+    tail = float(np.median(gaps)) if len(gaps) else 1000.0
+    duration_s = np.append(gaps, tail) / 1000.0
+    
+    demand = duration_s * static_fps
+    for i, (lo, hi) in enumerate(slices):
+        motion[lo] = 0.0
+        demand[lo] += 1.0
+        if i < len(slices) - 1 and hi - 1 > lo:
+            demand[hi - 1] += 0.5
+    demand += motion / motion_step
+    
+    if len(slices) > max_frames:
+        picks = np.linspace(0, len(slices) - 1, max_frames).round().astype(int)
+        slices = [slices[i] for i in sorted(set(picks))]
+    
+    seg_demand = np.array([demand[lo:hi].sum() for lo, hi in slices])
+    seg_sizes = np.array([hi - lo for lo, hi in slices])
+    target = min(max_frames, max(len(slices), math.ceil(seg_demand.sum())))
+    
+    # 保底每场景1帧，剩余预算按需求量最大余数分配（不超过场景内候选帧数）
+    counts = np.ones(len(slices), dtype=int)
+    extra = target - len(slices)
+    if extra > 0 and seg_demand.sum() > 0:
+        share = seg_demand / seg_demand.sum() * extra
+        counts += np.floor(share).astype(int)
+        remaining = extra - int(np.floor(share).sum())
+        for i in np.argsort(-(share - np.floor(share)), kind="stable")[:remaining]:
+            counts[i] += 1
+    counts = np.minimum(counts, seg_sizes)
+    
+    selected: Set[int] = set()
+    for (lo, hi), k in zip(slices, counts):
+        if k >= 2:
+            # 场景首帧（切点处）必取，其余帧在场景内按需求量分布
+            selected.add(lo)
+            lo, k = lo + 1, k - 1
+        selected.update(_quantile_picks(demand, lo, hi, k))
+    
+    return sorted(selected)
+
+
+def _quantile_picks(demand: np.ndarray, lo: int, hi: int, k: int) -> List[int]:
+    """在 demand[lo:hi] 的累积分布上等分取 k 个下标"""
+    cumulative = np.cumsum(demand[lo:hi])
+    if cumulative[-1] <= 0:
+        picks = np.linspace(0, hi - lo - 1, k).round().astype(int)
+    else:
+        targets = (np.arange(k) + 0.5) * cumulative[-1] / k
+        picks = np.minimum(np.searchsorted(cumulative, targets, side="left"), hi - lo - 1)
+    return [int(lo + p) for p in picks]
+
+
+def prune_candidates(
+    candidates: List[Dict[str, Any]],
+    selected: Iterable[int],
+    keep_paths: Iterable[str] = ()
+) -> List[Dict[str, Any]]:
+    """
+    只保留选中的候选帧：删除其余帧文件（keep_paths 中的文件仍被引用，保留），
+    并按新顺序重新编号 frame_id
+    """
+    selected = set(selected)
+    keep_paths = set(keep_paths)
+    
+    frames = []
+    for i, frame in enumerate(candidates):
+        if i in selected:
+            frames.append({**frame, "frame_id": f"f_{len(frames):05d}"})
+        elif frame["path"] not in keep_paths:
+            try:
+                os.unlink(frame["path"])
+            except FileNotFoundError:
+                pass
+    return frames
@@ -0,0 +1,200 @@
+"""资源仓库：按视频内容哈希共享探测信息与派生产物（抽帧、场景检测、场景关键帧），跨Job复用"""
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import time
+import weakref
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ..core.config import settings
+from ..core.logging import logger
+from .frame_index import FrameIndex
+
+
+@lru_cache(maxsize=1024)
+def _file_sha256(path: str, dev: int, ino: int, mtime_ns: int, size: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(4 * 1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_sha256(path: str) -> str:
+    """
+    流式计算文件SHA-256
+    
+    按 inode+mtime+大小 记忆：硬链接到多个Job目录的同一上传文件只计算一次。
+    """
+    stat = os.stat(path)
+    return _file_sha256(str(path), stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+# 最近该时长内使用过的产物不淘汰：运行中的Job按路径引用抽帧等产物
+PRUNE_MIN_IDLE_SECONDS = 3600.0
+
+
+def _json_default(value: Any):
+    if isinstance(value, FrameIndex):
+        return list(value)
+    if isinstance(value, Path):
+        return str(value)
+    raise TypeError(f"无法序列化: {type(value).__name__}")
+
+
+class AssetStore:
+    """
+    资源仓库
+    
+    目录结构：
+        <root>/<sha256>/probe.json                    ffprobe元数据
+        <root>/<sha256>/<kind>-<options_key>/         派生产物
+        <root>/<sha256>/<kind>-<options_key>/manifest.json   产物结果（最后写入，存在即表示完整）
+    
+    派生产物只读，Job通过路径引用或硬链接使用，不复制。manifest.json 的修改时间记录最近
+    使用时间，生成新产物后按总量上限和最长闲置时间淘汰旧产物（与下载缓存相同的LRU策略）。
+    """
+    
+    def __init__(
+        self,
+        root: Path,
+        max_bytes: Optional[int] = None,
+        max_age_seconds: Optional[float] = None,
+        min_idle_seconds: float = PRUNE_MIN_IDLE_SECONDS
+    ):
+        self.root = Path(root)
+        self.max_bytes = settings.asset_store_max_bytes if max_bytes is None else max_bytes
+        self.max_age_seconds = (
+            settings.asset_store_max_age_seconds if max_age_seconds is None else max_age_seconds
+        )
+        self.min_idle_seconds = min_idle_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # 没有协程持有或等待时锁自动回收
+        self._locks: "weakref.WeakValueDictionary[Path, asyncio.Lock]" = weakref.WeakValueDictionary()
+    
+    def _asset_dir(self, content_hash: str) -> Path:
+        return self.root / content_hash
+    
+    # ===== 探测信息 =====
+    
+    def load_probe(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        probe_path = self._asset_dir(content_hash) / "probe.json"
+        try:
+            return json.loads(probe_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+    
+    def save_probe(self, content_hash: str, metadata: Dict[str, Any]):
+        _write_json(self._asset_dir(content_hash) / "probe.json", metadata)
+    
+    # ===== 派生产物 =====
+    
+    @staticmethod
+    def options_key(kind: str, options: Dict[str, Any]) -> str:
+        raw = json.dumps({"kind": kind, **options}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+    
+    async def derive(
+        self,
+        content_hash: str,
+        kind: str,
+        options: Dict[str, Any],
+        produce: Callable[[Path], Awaitable[Any]]
+    ) -> Tuple[Any, Path, bool]:
+        """
+        获取派生产物，不存在时调用 produce(产物目录) 生成
+        
+        同一产物的并发请求只生成一次。
+        
+        Returns:
+            (结果, 产物目录, 是否复用)
+        """
+        product_dir = self._asset_dir(content_hash) / f"{kind}-{self.options_key(kind, options)}"
+        manifest_path = product_dir / "manifest.json"
+        lock = self._locks.get(product_dir)
+        if lock is None:
+            lock = self._locks[product_dir] = asyncio.Lock()
+        
+        async with lock:
+            try:
+                manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+                os.utime(manifest_path)
+                self.hits += 1
+                logger.info(f"复用资源产物: {content_hash[:12]} {kind} {options}")
+                return manifest["result"], product_dir, True
+            except (OSError, ValueError, KeyError):
+                pass
+            
+            self.misses += 1
+            if product_dir.exists():
+                # 上次生成中断留下的不完整产物
+                shutil.rmtree(product_dir)
+            product_dir.mkdir(parents=True)
+            
+            try:
+                result = await produce(product_dir)
+            except BaseException:
+                shutil.rmtree(product_dir, ignore_errors=True)
+                raise
+            
+            _write_json(manifest_path, {
+                "kind": kind,
+                "options": options,
+                "result": result,
+                "size": _dir_size(product_dir)
+            })
+            await asyncio.to_thread(self._prune, product_dir)
+            return result, product_dir, False
+    
+    def _prune(self, keep: Path):
+        """产物总量超过上限或闲置过久时按最近使用时间淘汰（正在生成或最近使用的不淘汰）"""
+        now = time.time()
+        entries: List[Tuple[float, int, Path]] = []
+        total = 0
+        for manifest_path in self.root.glob("*/*/manifest.json"):
+            try:
+                used_at = manifest_path.stat().st_mtime
+                size = json.loads(manifest_path.read_text(encoding="utf-8")).get("size")
+            except (OSError, ValueError):
+                continue
+            product_dir = manifest_path.parent
+            if size is None:
+                size = _dir_size(product_dir)
+            entries.append((used_at, size, product_dir))
+            total += size
+        
+        for used_at, size, product_dir in sorted(entries):
+            expired = self.max_age_seconds > 0 and now - used_at > self.max_age_seconds
+            if total <= self.max_bytes and not expired:
+                break
+            if (
+                product_dir == keep
+                or product_dir in self._locks
+                or now - used_at < self.min_idle_seconds
+            ):
+                continue
+            shutil.rmtree(product_dir, ignore_errors=True)
+            total -= size
+            self.evictions += 1
+            logger.info(f"淘汰资源产物: {product_dir.parent.name[:12]} {product_dir.name}")
+
+
+def _dir_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+def _write_json(path: Path, data: Any):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text(json.dumps(data, ensure_ascii=False, default=_json_default), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+# 进程级资源仓库（data_dir/assets）
+asset_store = AssetStore(settings.data_dir / "assets")
@@ -0,0 +1,180 @@
+"""本地运镜识别：在已抽取的帧上计算全局光流，按平移、缩放和幅度判断摇镜头/推拉镜头/固定镜头"""
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from ..core.shot_terminology import CAMERA_MOVEMENTS
+
+
+# 光流在该宽度的灰度图上计算
+ANALYSIS_WIDTH = 320
+# 拟合全局运动时的取点间隔与边缘留白比例（边缘有画面移入移出，光流不可靠）
+GRID_STEP = 8
+BORDER = 0.1
+# 一个场景最多取多少对相邻帧
+MAX_PAIRS = 12
+
+# 判定阈值（按每秒计）：平移为画面宽度的比例，缩放为尺度变化率
+STATIC_SPEED = 0.01
+STATIC_ZOOM = 0.01
+PAN_SPEED = 0.04
+ZOOM_RATE = 0.03
+
+
+class MotionSample(NamedTuple):
+    """相邻两帧之间的全局运动（已换算为每秒）"""
+    tx: float  # 画面内容水平位移（画面宽度/秒，正为向右）
+    ty: float  # 画面内容垂直位移（画面宽度/秒，正为向下）
+    zoom: float  # 尺度变化率（/秒，正为放大）
+    residual: float  # 拟合残差（画面宽度/秒），越大越不像单一的镜头运动
+
+
+def load_gray(path: str) -> Optional[np.ndarray]:
+    """按缩小尺寸解码帧并缩到 ANALYSIS_WIDTH 宽"""
+    import cv2
+    
+    image = cv2.imread(str(path), cv2.IMREAD_REDUCED_GRAYSCALE_2)
+    if image is None:
+        return None
+    if image.shape[1] > ANALYSIS_WIDTH:
+        height = max(1, round(image.shape[0] * ANALYSIS_WIDTH / image.shape[1]))
+        image = cv2.resize(image, (ANALYSIS_WIDTH, height), interpolation=cv2.INTER_AREA)
+    return image
+
+
+def estimate_motion(prev: np.ndarray, cur: np.ndarray, dt_s: float) -> MotionSample:
+    """
+    DIS光流 + 最小二乘拟合平移/缩放/旋转模型
+    
+    以画面中心为原点，u = tx + s·x - r·y，v = ty + s·y + r·x；s 即光流的散度/2，
+    对应推拉（缩放），(tx, ty) 对应摇移。
+    """
+    import cv2
+    
+    dis = cv2.DISOpticalFlow_create(cv2.DISOPTICAL_FLOW_PRESET_FAST)
+    flow = dis.calc(prev, cur, None)
+    
+    height, width = prev.shape
+    top, left = int(height * BORDER), int(width * BORDER)
+    ys, xs = np.mgrid[top:height - top:GRID_STEP, left:width - left:GRID_STEP]
+    u = flow[ys, xs, 0].ravel()
+    v = flow[ys, xs, 1].ravel()
+    x = (xs.ravel() - (width - 1) / 2).astype(np.float32)
+    y = (ys.ravel() - (height - 1) / 2).astype(np.float32)
+    
+    radius2 = float(np.sum(x * x + y * y)) or 1.0
+    tx, ty = float(u.mean()), float(v.mean())
+    du, dv = u - tx, v - ty
+    scale = float(np.sum(du * x + dv * y)) / radius2
+    rotation = float(np.sum(dv * x - du * y)) / radius2
+    residual = np.hypot(du - scale * x + rotation * y, dv - scale * y - rotation * x).mean()
+    
+    dt_s = max(dt_s, 1e-3)
+    return MotionSample(
+        tx=tx / width / dt_s,
+        ty=ty / width / dt_s,
+        zoom=scale / dt_s,
+        residual=float(residual) / width / dt_s
+    )
+
+
+def classify_sample(sample: MotionSample) -> str:
+    """单个运动样本的类别：static / pan / push_in / pull_out / unknown"""
+    speed = float(np.hypot(sample.tx, sample.ty))
+    if abs(sample.zoom) >= ZOOM_RATE and abs(sample.zoom) * 0.5 >= speed:
+        return "push_in" if sample.zoom > 0 else "pull_out"
+    if speed >= PAN_SPEED:
+        return "pan"
+    if speed < STATIC_SPEED and abs(sample.zoom) < STATIC_ZOOM:
+        return "static"
+    return "unknown"
+
+
+def _strength(label: str, sample: MotionSample) -> float:
+    """
+    样本离判定阈值有多远（0~1）
+    
+    摇移和推拉还要乘以全局运动的一致程度：拟合残差接近运动幅度时，画面中主要是
+    主体自身的运动或帧间内容无关，不像单一的镜头运动。
+    """
+    speed = float(np.hypot(sample.tx, sample.ty))
+    if label == "static":
+        return 1.0 - max(speed / STATIC_SPEED, abs(sample.zoom) / STATIC_ZOOM)
+    if label == "pan":
+        margin, motion = speed / PAN_SPEED - 1.0, speed
+    else:
+        # 缩放率乘以半幅画面宽度，折算成画面边缘的位移
+        margin, motion = abs(sample.zoom) / ZOOM_RATE - 1.0, abs(sample.zoom) * 0.5
+    return min(1.0, margin) * max(0.0, 1.0 - sample.residual / motion)
+
+
+def _pan_direction(sample: MotionSample) -> str:
+    """画面内容向左移动对应镜头向右摇"""
+    if abs(sample.tx) >= abs(sample.ty):
+        return "向右" if sample.tx < 0 else "向左"
+    return "向下" if sample.ty < 0 else "向上"
+
+
+def analyze_segment_motion(
+    frames: Sequence[Dict[str, Any]],
+    start_ms: float,
+    end_ms: float
+) -> Optional[Dict[str, Any]]:
+    """
+    对一个场景内按时间排序的帧估计运镜方式
+    
+    各相邻帧对分别拟合全局运动，取中位数判定类别；置信度由与之同类的帧对比例、
+    帧对数量和离阈值的距离决定。帧不足两张或无法判定时返回 None。
+    
+    Returns:
+        与 _normalize_features 输出同结构的 camera_motion 特征
+    """
+    # 结束时间处的帧属于下一个场景，跨切点的帧对不参与估计
+    frames = [f for f in frames if start_ms <= f["ts_ms"] < end_ms]
+    if len(frames) < 2:
+        return None
+    if len(frames) > MAX_PAIRS + 1:
+        picks = np.linspace(0, len(frames) - 1, MAX_PAIRS + 1).round().astype(int)
+        frames = [frames[i] for i in picks]
+    
+    samples: List[MotionSample] = []
+    prev = load_gray(frames[0]["path"])
+    for before, after in zip(frames, frames[1:]):
+        cur = load_gray(after["path"])
+        if prev is not None and cur is not None and prev.shape == cur.shape:
+            samples.append(estimate_motion(prev, cur, (after["ts_ms"] - before["ts_ms"]) / 1000))
+        prev = cur
+    if not samples:
+        return None
+    
+    median = MotionSample(*np.median(np.array(samples), axis=0))
+    label = classify_sample(median)
+    if label == "unknown":
+        return None
+    
+    # 只有一两对帧时同类比例没有说服力
+    agreement = sum(classify_sample(s) == label for s in samples) / (len(samples) + 1)
+    strength = max(0.0, _strength(label, median))
+    confidence = round(0.5 + 0.45 * agreement * (0.5 + 0.5 * strength), 2)
+    
+    name = CAMERA_MOVEMENTS[label]["name"]
+    value = f"{name} - {_pan_direction(median)}" if label == "pan" else name
+    return {
+        "category": "camera_motion",
+        "type": label,
+        "value": value,
+        "confidence": confidence,
+        "evidence": {"time_ranges_ms": [[start_ms, end_ms]]},
+        "detailed_description": {
+            "summary": f"本地光流分析：{CAMERA_MOVEMENTS[label]['description']}",
+            "technical_terms": [name, CAMERA_MOVEMENTS[label]["name_en"]],
+            "purpose": "",
+            "parameters": {
+                "source": "local_optical_flow",
+                "translation_per_s": [round(median.tx, 4), round(median.ty, 4)],
+                "zoom_per_s": round(median.zoom, 4),
+                "frame_pairs": len(samples)
+            },
+            "diagram": ""
+        }
+    }
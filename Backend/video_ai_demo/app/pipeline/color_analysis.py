@@ -0,0 +1,229 @@
+"""本地调色与影调分析：在缩小的帧上统计色温、饱和度、对比度和亮度分布，k-means提取主色板"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..core.shot_terminology import (
+    COLOR_TONES,
+    CONTRAST_STYLES,
+    LIGHTING_KEYS,
+    SATURATION_LEVELS,
+)
+
+
+# 统计在该宽度的帧上进行
+ANALYSIS_WIDTH = 160
+# 一个场景最多取多少帧
+MAX_FRAMES = 8
+# 主色板的颜色数与参与聚类的最多像素数
+PALETTE_SIZE = 5
+PALETTE_SAMPLES = 4000
+
+# 色温按倒数色温（mired，1e6/K）划分：D65约154
+WARM_MIRED = 200.0  # 低于5000K为暖
+COOL_MIRED = 125.0  # 高于8000K为冷
+# 饱和度中位数（HSV的S，0~1）
+MONOCHROME_SATURATION = 0.08
+LOW_SATURATION = 0.22
+HIGH_SATURATION = 0.5
+# 对比度：亮度第5与第95百分位之差（0~1）
+LOW_CONTRAST = 0.4
+HIGH_CONTRAST = 0.75
+# 影调：亮度中位数（0~1）
+LOW_KEY = 0.3
+HIGH_KEY = 0.65
+
+# sRGB（线性）到 CIE XYZ
+_RGB_TO_XYZ = np.array([
+    [0.4124, 0.3576, 0.1805],
+    [0.2126, 0.7152, 0.0722],
+    [0.0193, 0.1192, 0.9505],
+], dtype=np.float32)
+# 8位sRGB编码值到线性光的查找表
+_SRGB_TO_LINEAR = np.array([
+    c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4
+    for c in np.arange(256) / 255.0
+], dtype=np.float32)
+
+
+def load_small(path: str) -> Optional[np.ndarray]:
+    """按缩小尺寸解码帧（BGR）并缩到 ANALYSIS_WIDTH 宽"""
+    import cv2
+    
+    image = cv2.imread(str(path), cv2.IMREAD_REDUCED_COLOR_4)
+    if image is None:
+        return None
+    if image.shape[1] != ANALYSIS_WIDTH:
+        height = max(1, round(image.shape[0] * ANALYSIS_WIDTH / image.shape[1]))
+        image = cv2.resize(image, (ANALYSIS_WIDTH, height), interpolation=cv2.INTER_AREA)
+    return image
+
+
+def estimate_cct(pixels: np.ndarray) -> float:
+    """
+    灰度世界假设下估计画面整体色温（K）
+    
+    去掉过暗和过曝的像素后取线性RGB均值，换算到CIE xy色度，再用McCamy公式求相关色温。
+    pixels: (N, 3) uint8 BGR
+    """
+    linear = _SRGB_TO_LINEAR[pixels[:, ::-1]]
+    luma = linear @ _RGB_TO_XYZ[1]
+    usable = linear[(luma > 0.01) & (luma < 0.9)]
+    if len(usable) == 0:
+        usable = linear
+    X, Y, Z = _RGB_TO_XYZ @ usable.mean(axis=0)
+    total = float(X + Y + Z) or 1.0
+    x, y = X / total, Y / total
+    n = (x - 0.3320) / (0.1858 - y)
+    cct = 449 * n ** 3 + 3525 * n ** 2 + 6823.3 * n + 5520.33
+    return float(np.clip(cct, 1500.0, 20000.0))
+
+
+def dominant_palette(pixels: np.ndarray, k: int = PALETTE_SIZE) -> List[Dict[str, Any]]:
+    """Lab空间k-means聚类的主色，按占比降序：[{"hex", "ratio"}]"""
+    import cv2
+    
+    if len(pixels) > PALETTE_SAMPLES:
+        pixels = pixels[::len(pixels) // PALETTE_SAMPLES + 1]
+    k = min(k, len(pixels))
+    lab = cv2.cvtColor(pixels.reshape(-1, 1, 3), cv2.COLOR_BGR2LAB).reshape(-1, 3).astype(np.float32)
+    
+    cv2.setRNGSeed(0)
+    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 20, 1.0)
+    _, labels, centers = cv2.kmeans(lab, k, None, criteria, 1, cv2.KMEANS_PP_CENTERS)
+    
+    counts = np.bincount(labels.ravel(), minlength=k)
+    bgr = cv2.cvtColor(
+        np.clip(centers, 0, 255).astype(np.uint8).reshape(-1, 1, 3), cv2.COLOR_LAB2BGR
+    ).reshape(-1, 3)
+    order = np.argsort(-counts)
+    return [
+        {
+            "hex": "#{:02x}{:02x}{:02x}".format(*bgr[i][::-1]),
+            "ratio": round(float(counts[i]) / len(labels), 3)
+        }
+        for i in order if counts[i]
+    ]
+
+
+def _classify(value: float, bounds: Sequence[Tuple[float, str]], last: str, scale: float) -> Tuple[str, float]:
+    """
+    按升序边界分档，返回 (类别, 置信度)
+    
+    置信度由离最近边界的距离决定：正好落在边界上为0.55，距离达到 scale 时为0.95。
+    """
+    label = last
+    for bound, name in bounds:
+        if value < bound:
+            label = name
+            break
+    distance = min(abs(value - bound) for bound, _ in bounds)
+    return label, round(0.55 + 0.4 * min(1.0, distance / scale), 2)
+
+
+def _feature(
+    category: str,
+    label: str,
+    terms: Dict[str, Dict[str, str]],
+    confidence: float,
+    start_ms: float,
+    end_ms: float,
+    parameters: Dict[str, Any],
+    value: Optional[str] = None
+) -> Dict[str, Any]:
+    info = terms[label]
+    return {
+        "category": category,
+        "type": label,
+        "value": value or info["name"],
+        "confidence": confidence,
+        "evidence": {"time_ranges_ms": [[start_ms, end_ms]]},
+        "detailed_description": {
+            "summary": f"本地像素统计：{info['description']}",
+            "technical_terms": [info["name"], info["name_en"]],
+            "purpose": "",
+            "parameters": {"source": "local_pixel_stats", **parameters},
+            "diagram": ""
+        }
+    }
+
+
+def analyze_segment_color(
+    frames: Sequence[Dict[str, Any]],
+    start_ms: float,
+    end_ms: float
+) -> List[Dict[str, Any]]:
+    """
+    统计一个场景内各帧的像素分布，给出调色和影调特征
+    
+    所有帧缩小后拼成一个像素数组一次性统计：色温（McCamy）、HSV饱和度分布、
+    亮度分位数（对比度与影调），以及k-means主色板。没有可用的帧时返回空列表。
+    
+    Returns:
+        与 _normalize_features 输出同结构的特征：色调、饱和度、对比度三个
+        color_grading 特征和一个 lighting 影调特征
+    """
+    import cv2
+    
+    frames = [f for f in frames if start_ms <= f["ts_ms"] < end_ms]
+    if len(frames) > MAX_FRAMES:
+        picks = np.linspace(0, len(frames) - 1, MAX_FRAMES).round().astype(int)
+        frames = [frames[i] for i in picks]
+    images = [image for image in (load_small(f["path"]) for f in frames) if image is not None]
+    if not images:
+        return []
+    
+    pixels = np.concatenate([image.reshape(-1, 3) for image in images])
+    hsv = cv2.cvtColor(pixels.reshape(-1, 1, 3), cv2.COLOR_BGR2HSV).reshape(-1, 3)
+    luma = (pixels.astype(np.float32) @ np.array([0.0722, 0.7152, 0.2126], dtype=np.float32)) / 255.0
+    
+    # 过暗像素的饱和度没有意义
+    lit = hsv[:, 2] > 25
+    saturation = hsv[lit, 1] / 255.0 if lit.any() else np.zeros(1)
+    sat_p50, sat_p90 = (float(v) for v in np.percentile(saturation, [50, 90]))
+    luma_p5, luma_p50, luma_p95 = (float(v) for v in np.percentile(luma, [5, 50, 95]))
+    spread = luma_p95 - luma_p5
+    cct = estimate_cct(pixels)
+    mired = 1e6 / cct
+    palette = dominant_palette(pixels)
+    
+    saturation_label, saturation_conf = _classify(
+        sat_p50,
+        [(MONOCHROME_SATURATION, "monochrome"), (LOW_SATURATION, "low_saturation"),
+         (HIGH_SATURATION, "natural_saturation")],
+        "high_saturation", 0.1
+    )
+    # 色调按倒数色温升序：越小越冷
+    tone_label, tone_conf = _classify(
+        mired, [(COOL_MIRED, "cool_tone"), (WARM_MIRED, "neutral_tone")], "warm_tone", 40.0
+    )
+    if saturation_label == "monochrome":
+        # 几乎无色时色温估计不可靠
+        tone_conf = round(min(tone_conf, 0.6), 2)
+    contrast_label, contrast_conf = _classify(
+        spread, [(LOW_CONTRAST, "low_contrast"), (HIGH_CONTRAST, "normal_contrast")],
+        "high_contrast", 0.15
+    )
+    key_label, key_conf = _classify(
+        luma_p50, [(LOW_KEY, "low_key"), (HIGH_KEY, "mid_key")], "high_key", 0.15
+    )
+    
+    return [
+        _feature(
+            "color_grading", tone_label, COLOR_TONES, tone_conf, start_ms, end_ms,
+            {"cct_k": round(cct), "palette": palette},
+            value=f"{COLOR_TONES[tone_label]['name']} - 约{round(cct, -2):.0f}K"
+        ),
+        _feature(
+            "color_grading", saturation_label, SATURATION_LEVELS, saturation_conf, start_ms, end_ms,
+            {"saturation_p50": round(sat_p50, 3), "saturation_p90": round(sat_p90, 3)}
+        ),
+        _feature(
+            "color_grading", contrast_label, CONTRAST_STYLES, contrast_conf, start_ms, end_ms,
+            {"luma_p5": round(luma_p5, 3), "luma_p95": round(luma_p95, 3), "luma_std": round(float(luma.std()), 3)}
+        ),
+        _feature(
+            "lighting", key_label, LIGHTING_KEYS, key_conf, start_ms, end_ms,
+            {"luma_p50": round(luma_p50, 3)}
+        ),
+    ]
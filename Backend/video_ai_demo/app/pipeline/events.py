@@ -0,0 +1,140 @@
+"""进程内Job事件总线：Pipeline发布进度/片段变化，SSE订阅者实时接收"""
+import asyncio
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from ..core.logging import logger
+
+
+class _JobChannel:
+    """单个Job的事件通道：保存最新快照，并向所有订阅者扇出"""
+    
+    def __init__(self):
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.progress: Optional[Dict[str, Any]] = None
+        self.segments: List[Dict[str, Any]] = []
+
+
+class JobEventBus:
+    """
+    Job事件总线
+    
+    每个Job只有一个上游（Pipeline本身），无论多少浏览器在看，进度只写一次、
+    在内存里扇出。片段更新以增量（只含变化的片段）推送，新订阅者先收到快照。
+    事件均在事件循环线程内发布。
+    """
+    
+    def __init__(self, queue_size: int = 256):
+        self.queue_size = queue_size
+        self._channels: Dict[str, _JobChannel] = {}
+    
+    def _channel(self, job_id: str) -> _JobChannel:
+        channel = self._channels.get(job_id)
+        if channel is None:
+            channel = self._channels[job_id] = _JobChannel()
+        return channel
+    
+    def _broadcast(self, channel: _JobChannel, event: Dict[str, Any]):
+        for queue in channel.subscribers:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # 订阅者消费过慢：丢弃积压事件，改为让其重新拉取快照
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"type": "resync"})
+    
+    def publish_progress(self, job_id: str, stage: str, percent: float, message: Optional[str]):
+        """发布进度"""
+        channel = self._channel(job_id)
+        channel.progress = {
+            "stage": stage,
+            "percent": percent or 0,
+            "message": message or ""
+        }
+        self._broadcast(channel, {
+            "type": "progress",
+            "status": "running",
+            "progress": channel.progress
+        })
+    
+    def publish_segments(self, job_id: str, segments: List[Dict[str, Any]]):
+        """发布全量片段（场景切分完成时）"""
+        channel = self._channel(job_id)
+        channel.segments = list(segments)
+        self._broadcast(channel, {
+            "type": "segments",
+            "status": "running",
+            "segments": channel.segments,
+            "total": len(channel.segments)
+        })
+    
+    def publish_segment(self, job_id: str, index: int, segment: Dict[str, Any], total: int):
+        """发布单个片段的更新（增量，只含该片段及其位置）"""
+        channel = self._channel(job_id)
+        if len(channel.segments) != total:
+            channel.segments = (channel.segments + [None] * total)[:total]
+        channel.segments[index] = segment
+        
+        self._broadcast(channel, {
+            "type": "segment_update",
+            "status": "running",
+            "segments": [{**segment, "index": index}],
+            "total": total
+        })
+    
+    def publish_terminal(self, job_id: str, event: Dict[str, Any]):
+        """发布终态事件（complete/error），并释放该Job的通道"""
+        channel = self._channels.pop(job_id, None)
+        if channel is not None:
+            self._broadcast(channel, event)
+    
+    def snapshot(self, job_id: str) -> List[Dict[str, Any]]:
+        """当前快照（进度 + 全量片段），供新订阅者或重新同步使用"""
+        channel = self._channels.get(job_id)
+        if channel is None:
+            return []
+        
+        events = []
+        if channel.progress is not None:
+            events.append({
+                "type": "progress",
+                "status": "running",
+                "progress": channel.progress
+            })
+        if channel.segments:
+            events.append({
+                "type": "segments",
+                "status": "running",
+                "segments": [seg for seg in channel.segments if seg is not None],
+                "total": len(channel.segments)
+            })
+        return events
+    
+    @contextmanager
+    def subscribe(self, job_id: str) -> Iterator[asyncio.Queue]:
+        """订阅Job事件，退出时自动取消订阅"""
+        channel = self._channel(job_id)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        channel.subscribers.add(queue)
+        logger.debug(f"Job {job_id} 新增订阅者，当前{len(channel.subscribers)}个")
+        try:
+            yield queue
+        finally:
+            channel.subscribers.discard(queue)
+            # 无人订阅且Job尚未发布过数据时释放通道（已发布终态的通道此前已移除）
+            if (
+                not channel.subscribers
+                and channel.progress is None
+                and not channel.segments
+                and self._channels.get(job_id) is channel
+            ):
+                del self._channels[job_id]
+    
+    def subscriber_count(self, job_id: str) -> int:
+        channel = self._channels.get(job_id)
+        return len(channel.subscribers) if channel else 0
+
+
+# 进程级事件总线
+job_events = JobEventBus()
@@ -0,0 +1,119 @@
+"""Pipeline阻塞任务执行器：CPU密集的解码放进程池，ffmpeg/ffprobe走异步子进程"""
+import asyncio
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, List, Optional, Tuple, TypeVar
+
+from ..core.config import settings
+from ..core.errors import VideoProcessingError
+from ..core.logging import logger
+
+
+T = TypeVar("T")
+
+_pool: Optional[ProcessPoolExecutor] = None
+_subprocess_limit: Optional[asyncio.Semaphore] = None
+_subprocess_limit_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def init_process_pool() -> Optional[ProcessPoolExecutor]:
+    """启动时创建解码进程池（cpu_pool_workers<=0 时不使用进程池）"""
+    global _pool
+    if settings.cpu_pool_workers <= 0:
+        return None
+    if _pool is None:
+        # spawn：避免fork继承事件循环线程和已打开的数据库连接
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.cpu_pool_workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        logger.info(f"创建解码进程池: workers={settings.cpu_pool_workers}")
+    return _pool
+
+
+def shutdown_process_pool():
+    """关闭时释放进程池"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+        logger.info("解码进程池已关闭")
+
+
+async def run_cpu_bound(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    在进程池中执行CPU密集任务（视频解码、场景检测）
+    
+    func 及参数需可pickle（模块级函数）。未启用进程池时退回线程执行。
+    """
+    global _pool
+    call = functools.partial(func, *args, **kwargs)
+    
+    pool = init_process_pool()
+    if pool is None:
+        return await asyncio.to_thread(call)
+    
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(pool, call)
+    except BrokenProcessPool as e:
+        # 子进程异常退出（如OOM被杀），丢弃进程池，下次调用时重建
+        logger.error(f"解码进程池已损坏，将重建: {str(e)}")
+        _pool = None
+        raise VideoProcessingError(f"视频处理进程异常退出: {func.__name__}")
+
+
+async def run_blocking_io(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """在线程中执行阻塞IO（文件复制等）"""
+    return await asyncio.to_thread(func, *args, **kwargs)
+
+
+def _get_subprocess_limit() -> asyncio.Semaphore:
+    """ffmpeg/ffprobe并发上限（按事件循环创建）"""
+    global _subprocess_limit, _subprocess_limit_loop
+    loop = asyncio.get_running_loop()
+    if _subprocess_limit is None or _subprocess_limit_loop is not loop:
+        _subprocess_limit = asyncio.Semaphore(max(1, settings.ffmpeg_max_processes))
+        _subprocess_limit_loop = loop
+    return _subprocess_limit
+
+
+async def run_subprocess(
+    cmd: List[str],
+    timeout: Optional[float] = None
+) -> Tuple[int, str, str]:
+    """
+    异步执行外部命令
+    
+    Returns:
+        (returncode, stdout, stderr)
+    """
+    async with _get_subprocess_limit():
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+        except FileNotFoundError:
+            raise VideoProcessingError(f"命令不存在: {cmd[0]}")
+        
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                process.communicate(),
+                timeout=timeout or settings.ffmpeg_timeout
+            )
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            process.kill()
+            await process.wait()
+            if isinstance(e, asyncio.TimeoutError):
+                raise VideoProcessingError(f"命令执行超时: {cmd[0]}")
+            raise
+        
+        return (
+            process.returncode,
+            stdout.decode("utf-8", errors="replace"),
+            stderr.decode("utf-8", errors="replace")
+        )
@@ -0,0 +1,124 @@
+"""帧感知哈希（dHash）与多样性采样：发给多模态LLM的帧去重，并在预算内尽量覆盖不同画面"""
+from typing import Any, List, Optional, Sequence, TypeVar
+
+import numpy as np
+
+from ..core.config import settings
+from ..core.logging import logger
+
+
+T = TypeVar("T")
+
+HASH_BITS = 64
+
+
+def dhash_image(image: np.ndarray) -> int:
+    """64位差值哈希：缩到9x8灰度，逐行比较相邻像素"""
+    import cv2
+    
+    gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+def dhash_file(path: str) -> Optional[int]:
+    """按1/8尺寸解码图片计算dHash，读取失败时返回None"""
+    import cv2
+    
+    image = cv2.imread(str(path), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    if image is None:
+        return None
+    return dhash_image(image)
+
+
+def format_hash(value: int) -> str:
+    """帧索引中以16位十六进制字符串保存（JSON安全）"""
+    return f"{value:016x}"
+
+
+def frame_hash(frame: Any) -> Optional[int]:
+    """
+    帧的dHash：优先读取帧索引中缓存的 dhash，缺失时从图片计算并写回
+    
+    兼容帧索引字典（dhash/path键）和 FrameInput（dhash/image_path属性）。
+    """
+    if isinstance(frame, dict):
+        cached = frame.get("dhash")
+        if cached is None:
+            value = dhash_file(frame["path"])
+            if value is not None:
+                frame["dhash"] = format_hash(value)
+            return value
+        return int(cached, 16) if isinstance(cached, str) else int(cached)
+    
+    cached = getattr(frame, "dhash", None)
+    if cached is None:
+        cached = dhash_file(frame.image_path)
+        frame.dhash = cached
+    return int(cached, 16) if isinstance(cached, str) else cached
+
+
+def annotate_hashes(frames: Sequence[Any]) -> None:
+    """为帧索引中缺少 dhash 的帧计算并缓存哈希"""
+    for frame in frames:
+        frame_hash(frame)
+
+
+def hamming_matrix(hashes: Sequence[int]) -> np.ndarray:
+    """两两汉明距离矩阵"""
+    values = np.array(hashes, dtype=np.uint64)
+    xor = values[:, None] ^ values[None, :]
+    return np.unpackbits(xor.view(np.uint8).reshape(len(values), len(values), 8), axis=-1).sum(axis=-1)
+
+
+def select_diverse(
+    frames: Sequence[T],
+    max_frames: int,
+    threshold: Optional[int] = None
+) -> List[T]:
+    """
+    在预算内贪心选出画面差异最大的帧（按时间顺序返回）
+    
+    从时间居中的帧开始，每次选与已选帧最小汉明距离最大的帧（距离相同时选
+    时间上离已选帧最远的）；剩余帧与已选帧的距离都不超过 threshold 时视为重复，
+    提前结束，因此静止画面只发一帧。没有哈希（图片读取失败）的帧按不重复处理。
+    
+    Args:
+        frames: 按时间排序的帧
+        max_frames: 最多选出的帧数
+        threshold: 汉明距离不超过该值视为重复，默认取 settings.llm_frame_dedup_distance
+    """
+    if max_frames <= 0 or not frames:
+        return []
+    threshold = settings.llm_frame_dedup_distance if threshold is None else threshold
+    
+    hashes = [frame_hash(frame) for frame in frames]
+    n = len(frames)
+    
+    # 读取失败的帧给一个与其他帧都不同的距离，保证能被选中
+    valid = np.array([h is not None for h in hashes])
+    dist = hamming_matrix([h if h is not None else 0 for h in hashes])
+    dist[~valid, :] = HASH_BITS
+    dist[:, ~valid] = HASH_BITS
+    np.fill_diagonal(dist, 0)
+    
+    positions = np.arange(n)
+    selected = [n // 2]
+    min_dist = dist[selected[0]].astype(np.int64)
+    min_gap = np.abs(positions - selected[0])
+    
+    while len(selected) < max_frames:
+        # 先比画面距离，再比时间间隔
+        score = min_dist * (n + 1) + min_gap
+        score[selected] = -1
+        best = int(np.argmax(score))
+        if score[best] < 0 or min_dist[best] <= threshold:
+            break
+        selected.append(best)
+        min_dist = np.minimum(min_dist, dist[best])
+        min_gap = np.minimum(min_gap, np.abs(positions - best))
+    
+    if len(selected) < min(n, max_frames):
+        logger.debug(f"帧去重: {n}帧中选出{len(selected)}帧（预算{max_frames}）")
+    return [frames[i] for i in sorted(selected)]
@@ -0,0 +1,105 @@
+"""帧索引：按时间戳排序的帧序列，支持二分查找最近帧、区间切片与均匀采样"""
+from collections.abc import Sequence
+from typing import Any, Iterable, Iterator, List, Optional, TypeVar, Union
+
+import numpy as np
+
+
+T = TypeVar("T")
+
+
+def _frame_ts(frame: Any) -> float:
+    """帧时间戳：兼容帧索引字典（ts_ms键）和 FrameInput（ts_ms属性）"""
+    if isinstance(frame, dict):
+        return float(frame["ts_ms"])
+    return float(frame.ts_ms)
+
+
+class FrameIndex(Sequence):
+    """
+    帧索引
+    
+    抽帧完成时构建一次，之后在场景分析、关键帧选择等步骤间传递。时间戳保存在
+    NumPy数组中，按时间查找均为二分查找，不再对每个片段扫描全部帧。
+    本身是只读序列，原先按列表使用帧索引的代码（len/下标/切片/遍历）不受影响。
+    """
+    
+    def __init__(self, frames: Iterable[T], timestamps: Optional[Iterable[float]] = None):
+        frames = list(frames)
+        if timestamps is None:
+            timestamps = [_frame_ts(frame) for frame in frames]
+        ts = np.asarray(list(timestamps), dtype=np.float64)
+        if len(ts) != len(frames):
+            raise ValueError("frames 与 timestamps 长度不一致")
+        
+        if len(ts) > 1 and np.any(np.diff(ts) < 0):
+            order = np.argsort(ts, kind="stable")
+            frames = [frames[i] for i in order]
+            ts = ts[order]
+        
+        ts.setflags(write=False)
+        self._frames: List[T] = frames
+        self._ts = ts
+    
+    @classmethod
+    def of(cls, frames: Union["FrameIndex", Iterable[T]]) -> "FrameIndex":
+        """已是FrameIndex时直接返回，否则构建"""
+        return frames if isinstance(frames, FrameIndex) else cls(frames)
+    
+    def __len__(self) -> int:
+        return len(self._frames)
+    
+    def __getitem__(self, index):
+        return self._frames[index]
+    
+    def __iter__(self) -> Iterator[T]:
+        return iter(self._frames)
+    
+    def __repr__(self) -> str:
+        return f"FrameIndex({len(self._frames)} frames)"
+    
+    @property
+    def timestamps(self) -> np.ndarray:
+        """全部帧时间戳（毫秒，升序，只读）"""
+        return self._ts
+    
+    def nearest(self, target_ms: float) -> Optional[T]:
+        """最接近目标时间的帧（距离相同时取较早的帧）"""
+        if not self._frames:
+            return None
+        
+        pos = int(np.searchsorted(self._ts, target_ms, side="left"))
+        if pos == 0:
+            return self._frames[0]
+        if pos == len(self._frames):
+            return self._frames[-1]
+        
+        before = pos - 1
+        if target_ms - self._ts[before] <= self._ts[pos] - target_ms:
+            return self._frames[before]
+        return self._frames[pos]
+    
+    def _bounds(self, start_ms: Optional[float], end_ms: Optional[float]):
+        lo = 0 if start_ms is None else int(np.searchsorted(self._ts, start_ms, side="left"))
+        hi = len(self._frames) if end_ms is None else int(np.searchsorted(self._ts, end_ms, side="right"))
+        return lo, max(lo, hi)
+    
+    def range(self, start_ms: Optional[float] = None, end_ms: Optional[float] = None) -> List[T]:
+        """时间落在 [start_ms, end_ms] 内的帧（两端包含）"""
+        lo, hi = self._bounds(start_ms, end_ms)
+        return self._frames[lo:hi]
+    
+    def sample(
+        self,
+        max_frames: int,
+        start_ms: Optional[float] = None,
+        end_ms: Optional[float] = None
+    ) -> List[T]:
+        """在 [start_ms, end_ms] 内均匀采样最多 max_frames 帧"""
+        lo, hi = self._bounds(start_ms, end_ms)
+        count = hi - lo
+        if count <= max_frames:
+            return self._frames[lo:hi]
+        
+        step = count / max_frames
+        return [self._frames[lo + int(i * step)] for i in range(max_frames)]
@@ -0,0 +1,179 @@
+"""持久化Job队列（SQLite落盘）+ 有界worker池"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from ..core.config import settings
+from ..core.errors import QueueFullError
+from ..core.logging import logger
+from ..db.models import JobStatus
+from ..db.repo import JobRepository, JobQueueRepository
+from ..db.session import get_db
+
+
+JobRunner = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+
+class JobQueue:
+    """
+    Job队列
+    
+    入队的Job写入 job_queue 表，由固定数量的worker按优先级（或FIFO）领取执行，
+    执行结束后移出队列。进程重启时，已领取但未完成的Job会被重新放回队列。
+    """
+    
+    def __init__(
+        self,
+        runner: JobRunner,
+        concurrency: Optional[int] = None,
+        max_depth: Optional[int] = None,
+        ordering: Optional[str] = None
+    ):
+        self.runner = runner
+        self.concurrency = max(1, concurrency or settings.job_worker_concurrency)
+        self.max_depth = max_depth or settings.job_queue_max_depth
+        self.by_priority = (ordering or settings.job_queue_ordering).lower() != "fifo"
+        
+        self.running = 0
+        self._workers: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+    
+    def depth(self) -> int:
+        """排队中的Job数量"""
+        with get_db() as db:
+            return JobQueueRepository(db).depth()
+    
+    def check_capacity(self):
+        """队列已满时抛出 QueueFullError（用于接口层背压）"""
+        depth = self.depth()
+        if depth >= self.max_depth:
+            raise QueueFullError(
+                f"任务队列已满（{depth}/{self.max_depth}），请稍后重试",
+                details={"retry_after": settings.job_queue_retry_after}
+            )
+    
+    def enqueue(self, job_id: str, job_config: Dict[str, Any], priority: int = 0):
+        """Job入队并唤醒空闲worker"""
+        with get_db() as db:
+            JobQueueRepository(db).enqueue(job_id, job_config, priority)
+        
+        logger.info(f"Job {job_id} 入队，priority={priority}")
+        
+        if self._wakeup is not None:
+            self._wakeup.set()
+    
+    async def start(self):
+        """恢复中断的Job并启动worker"""
+        if self._workers:
+            return
+        
+        self._recover()
+        
+        self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        self._workers = [
+            asyncio.create_task(self._worker(i)) for i in range(self.concurrency)
+        ]
+        logger.info(f"Job队列已启动: workers={self.concurrency}, max_depth={self.max_depth}")
+    
+    async def stop(self):
+        """停止worker（执行中的Job保留在队列中，下次启动时恢复）"""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._wakeup = None
+        logger.info("Job队列已停止")
+    
+    def stats(self) -> Dict[str, Any]:
+        """队列状态"""
+        return {
+            "depth": self.depth(),
+            "running": self.running,
+            "concurrency": self.concurrency,
+            "max_depth": self.max_depth
+        }
+    
+    def _recover(self):
+        """将上次进程中断时执行中的Job放回队列"""
+        requeued = 0
+        failed = 0
+        
+        with get_db() as db:
+            job_repo = JobRepository(db)
+            queue_repo = JobQueueRepository(db)
+            
+            for item in queue_repo.list_claimed():
+                if job_repo.get(item.job_id) is None:
+                    queue_repo.complete(item.job_id)
+                elif item.attempts >= settings.job_queue_max_attempts:
+                    job_repo.update_status(
+                        item.job_id,
+                        JobStatus.FAILED,
+                        error_message=f"任务被中断{item.attempts}次，已放弃执行"
+                    )
+                    queue_repo.complete(item.job_id)
+                    failed += 1
+                else:
+                    job_repo.update_status(item.job_id, JobStatus.QUEUED)
+                    queue_repo.release(item)
+                    requeued += 1
+            
+            # 不在队列中的running Job缺少配置，无法恢复
+            for job in job_repo.list_by_status(JobStatus.RUNNING, limit=1000):
+                job_repo.update_status(
+                    job.id,
+                    JobStatus.FAILED,
+                    error_message="服务重启，任务中断"
+                )
+                failed += 1
+        
+        if requeued or failed:
+            logger.warning(f"Job队列恢复: 重新入队{requeued}个，置为失败{failed}个")
+    
+    def _claim_next(self):
+        with get_db() as db:
+            return JobQueueRepository(db).claim_next(self.by_priority)
+    
+    def _complete(self, job_id: str):
+        with get_db() as db:
+            JobQueueRepository(db).complete(job_id)
+    
+    async def _worker(self, worker_id: int):
+        """worker循环：领取 -> 执行 -> 移出队列"""
+        while True:
+            # 先清通知再领取：领取之后才入队的Job一定会重新置位，不会被错过
+            self._wakeup.clear()
+            try:
+                claimed = self._claim_next()
+            except Exception as e:
+                # 个别队列项出错不能让worker退出，稍后重试
+                logger.error(f"worker-{worker_id} 领取Job失败: {str(e)}", exc_info=True)
+                claimed = None
+            
+            if claimed is None:
+                # 没有排队的Job，等待入队通知（定期轮询兜底）
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(),
+                        timeout=settings.job_queue_poll_interval
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            
+            job_id, job_config = claimed
+            logger.info(f"worker-{worker_id} 开始执行Job {job_id}")
+            
+            self.running += 1
+            try:
+                await self.runner(job_id, job_config)
+            except asyncio.CancelledError:
+                # 关闭时被取消：保留队列项，下次启动时恢复
+                logger.warning(f"Job {job_id} 执行被中断，将在重启后恢复")
+                raise
+            except Exception as e:
+                logger.error(f"Job {job_id} 执行异常: {str(e)}", exc_info=True)
+            finally:
+                self.running -= 1
+            
+            self._complete(job_id)
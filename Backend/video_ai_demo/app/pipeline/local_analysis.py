@@ -0,0 +1,110 @@
+"""
+场景特征的本地分析与LLM分工
+
+每个特征模块可选三种来源：
+  - llm：只问LLM
+  - local：只用本地分析结果，不再出现在提示词中
+  - hybrid：本地结果可信时采用并不再询问LLM对应部分，否则仍由LLM分析
+
+本地分析能覆盖的部分：camera_motion 中的运镜方式（景别、拍摄角度仍需LLM）、
+color_grading 的色调/饱和度/对比度、lighting 中的影调（光位仍需LLM）。
+camera_motion 为 local 时也只替换运镜方式，景别和拍摄角度照常询问LLM。
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+from ..core.config import settings
+from ..core.errors import ValidationError
+from ..core.shot_terminology import CAMERA_MOVEMENTS, LIGHTING_KEYS
+from .camera_motion import analyze_segment_motion
+from .color_analysis import analyze_segment_color
+
+
+MODULE_SOURCES = ("llm", "local", "hybrid")
+
+
+def resolve_module_sources(llm_config: Dict[str, Any]) -> Dict[str, str]:
+    """合并全局配置与Job的 options.llm.module_sources"""
+    sources = {**settings.module_sources, **(llm_config.get("module_sources") or {})}
+    for module, source in sources.items():
+        if source not in MODULE_SOURCES:
+            raise ValidationError(f"模块{module}的分析来源无效: {source}，可选 {', '.join(MODULE_SOURCES)}")
+    return sources
+
+
+@dataclass
+class LocalAnalysis:
+    """一个场景的本地分析结果，以及LLM还需要分析什么"""
+    features: List[Dict[str, Any]] = field(default_factory=list)  # 采用的本地特征（排在结果最前）
+    local_modules: Set[str] = field(default_factory=set)  # 完全由本地确定、不再询问LLM的模块
+    motion: Optional[Dict[str, Any]] = None  # 已确定的运镜方式，提示词中只问景别和拍摄角度
+    replaced_types: Set[str] = field(default_factory=set)  # LLM结果中要被本地特征替换掉的类型
+    
+    def llm_modules(self, enabled_modules: Sequence[str]) -> List[str]:
+        """仍需LLM分析的模块"""
+        return [m for m in enabled_modules if m not in self.local_modules]
+    
+    def merge(self, llm_features: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """本地特征放在最前，去掉LLM给出的、已由本地确定的特征"""
+        return self.features + [
+            f for f in llm_features
+            if f.get("category") not in self.local_modules
+            and f.get("type") not in self.replaced_types
+        ]
+
+
+def analyze_segment_locally(
+    frames: Sequence[Dict[str, Any]],
+    start_ms: float,
+    end_ms: float,
+    enabled_modules: Sequence[str],
+    sources: Dict[str, str],
+    motion_confidence: Optional[float] = None,
+    color_confidence: Optional[float] = None
+) -> LocalAnalysis:
+    """
+    按各模块的来源对一个场景做本地分析
+    
+    hybrid 下只采用置信度达到阈值的结果；color_grading 需色调、饱和度、对比度都可信
+    才整体交给本地。
+    """
+    motion_confidence = settings.local_camera_motion_confidence if motion_confidence is None else motion_confidence
+    color_confidence = settings.local_color_confidence if color_confidence is None else color_confidence
+    result = LocalAnalysis()
+    
+    def source(module: str) -> str:
+        return sources.get(module, "llm") if module in enabled_modules else "llm"
+    
+    if source("camera_motion") != "llm":
+        motion = analyze_segment_motion(frames, start_ms, end_ms)
+        local = source("camera_motion") == "local"
+        if motion is not None and (local or motion["confidence"] >= motion_confidence):
+            result.motion = motion
+            result.features.append(motion)
+        if result.motion is not None or local:
+            # local 下即使本地无法识别也不采用LLM的运镜方式
+            result.replaced_types.update(CAMERA_MOVEMENTS)
+    
+    if source("color_grading") != "llm" or source("lighting") != "llm":
+        color_features = analyze_segment_color(frames, start_ms, end_ms)
+        grading = [f for f in color_features if f["category"] == "color_grading"]
+        lighting = [f for f in color_features if f["category"] == "lighting"]
+        
+        if source("color_grading") == "local" or (
+            source("color_grading") == "hybrid" and grading
+            and min(f["confidence"] for f in grading) >= color_confidence
+        ):
+            result.local_modules.add("color_grading")
+            result.features.extend(grading)
+        
+        if source("lighting") == "local":
+            result.local_modules.add("lighting")
+            result.features.extend(lighting)
+        elif source("lighting") == "hybrid":
+            # 光位仍由LLM分析，只替换影调
+            confident = [f for f in lighting if f["confidence"] >= color_confidence]
+            result.features.extend(confident)
+            if confident:
+                result.replaced_types.update(LIGHTING_KEYS)
+    
+    return result
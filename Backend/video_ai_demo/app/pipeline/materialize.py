@@ -0,0 +1,172 @@
+"""文件落地：按 reflink → 硬链接 → 软链接 → 复制 的顺序把已有文件放到新位置，尽量不复制数据"""
+import errno
+import hashlib
+import os
+import shutil
+import sys
+import uuid
+from pathlib import Path
+from typing import BinaryIO, Optional, Sequence, Tuple, Union
+
+from ..core.config import settings
+from ..core.logging import logger
+
+
+PathLike = Union[str, Path]
+
+MATERIALIZE_METHODS = ("reflink", "hardlink", "symlink", "copy")
+
+# Linux FICLONE ioctl（btrfs/xfs/overlay等支持写时复制的文件系统）
+_FICLONE = 0x40049409
+
+# 这些错误表示当前方式不可用（跨设备、文件系统不支持等），继续尝试下一种
+_UNSUPPORTED_ERRNOS = {
+    errno.EXDEV,
+    errno.EPERM,
+    errno.EACCES,
+    errno.EMLINK,
+    errno.ENOTSUP,
+    errno.EOPNOTSUPP,
+    errno.EINVAL,
+    errno.ENOTTY,
+    errno.ENOSYS,
+}
+
+
+def _configured_methods() -> Sequence[str]:
+    methods = [m.strip() for m in settings.materialize_methods.split(",") if m.strip()]
+    unknown = set(methods) - set(MATERIALIZE_METHODS)
+    if unknown:
+        logger.warning(f"忽略未知的materialize方式: {', '.join(sorted(unknown))}")
+    return [m for m in methods if m in MATERIALIZE_METHODS] or ["copy"]
+
+
+def _reflink(src: Path, dst: Path):
+    if not sys.platform.startswith("linux"):
+        raise OSError(errno.ENOTSUP, "reflink仅支持Linux")
+    import fcntl
+    
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+        except OSError:
+            fdst.close()
+            dst.unlink()
+            raise
+    shutil.copystat(src, dst)
+
+
+def _hardlink(src: Path, dst: Path):
+    os.link(src, dst)
+
+
+def _symlink(src: Path, dst: Path):
+    os.symlink(src.resolve(), dst)
+
+
+def _copy(src: Path, dst: Path):
+    shutil.copy2(src, dst)
+
+
+_HANDLERS = {
+    "reflink": _reflink,
+    "hardlink": _hardlink,
+    "symlink": _symlink,
+    "copy": _copy,
+}
+
+
+def materialize(
+    src: PathLike,
+    dst: PathLike,
+    methods: Optional[Sequence[str]] = None,
+    durable: bool = False
+) -> str:
+    """
+    把 src 放到 dst（dst 已存在时替换）
+    
+    产物落地后只读，因此共享数据块或inode是安全的；Job目录删除时只删除链接本身。
+    
+    Args:
+        methods: 尝试顺序，默认取 settings.materialize_methods
+        durable: src 之后可能被删除（如下载缓存淘汰）时为True，不使用软链接（最后回退到复制），
+            已有的软链接也会被替换
+    
+    Returns:
+        实际使用的方式：reflink / hardlink / symlink / copy；dst 已指向 src 时为 existing
+    """
+    src = Path(src)
+    dst = Path(dst)
+    if not src.is_file():
+        raise FileNotFoundError(f"源文件不存在: {src}")
+    
+    if dst.is_symlink() or dst.exists():
+        if dst.exists() and not (durable and dst.is_symlink()) and os.path.samefile(src, dst):
+            return "existing"
+        dst.unlink()
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    
+    methods = list(methods or _configured_methods())
+    if durable:
+        methods = [m for m in methods if m not in ("symlink", "copy")] + ["copy"]
+    for i, method in enumerate(methods):
+        try:
+            _HANDLERS[method](src, dst)
+            return method
+        except OSError as e:
+            if i == len(methods) - 1 or e.errno not in _UNSUPPORTED_ERRNOS:
+                raise
+            logger.debug(f"{method}不可用（{e.strerror}），尝试下一种: {src} -> {dst}")
+    
+    raise OSError(errno.ENOTSUP, f"没有可用的materialize方式: {methods}")
+
+
+def materialize_dir(src_dir: PathLike, dst_dir: PathLike) -> int:
+    """把目录下的所有文件逐个落地到 dst_dir（不递归），返回文件数"""
+    src_dir = Path(src_dir)
+    dst_dir = Path(dst_dir)
+    dst_dir.mkdir(parents=True, exist_ok=True)
+    
+    count = 0
+    for src in sorted(src_dir.iterdir()):
+        if src.is_file():
+            materialize(src, dst_dir / src.name)
+            count += 1
+    return count
+
+
+def store_by_content_hash(
+    fileobj: BinaryIO,
+    store_dir: Path,
+    suffix: str = "",
+    chunk_size: int = 1024 * 1024
+) -> Tuple[Path, str, bool]:
+    """
+    流式写入并计算SHA-256，按内容哈希存放（相同内容只保存一份）
+    
+    Returns:
+        (文件路径, sha256, 是否为新文件)
+    """
+    store_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = store_dir / f".upload_{uuid.uuid4().hex}.tmp"
+    digest = hashlib.sha256()
+    
+    try:
+        with tmp_path.open("wb") as out:
+            while True:
+                chunk = fileobj.read(chunk_size)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                out.write(chunk)
+        
+        sha256 = digest.hexdigest()
+        final_path = store_dir / f"{sha256}{suffix}"
+        if final_path.exists():
+            return final_path, sha256, False
+        
+        os.replace(tmp_path, final_path)
+        return final_path, sha256, True
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
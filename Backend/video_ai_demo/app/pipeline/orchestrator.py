@@ -1,25 +1,38 @@
 """Pipeline编排器"""
 import asyncio
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Callable, Awaitable
 import uuid
 
 from .steps.ingest import ingest_video
 from .steps.extract_frames import extract_frames
-from .steps.scene_detect import detect_scenes
+from .steps.fast_scene_detect import SCENE_ENGINES, detect_scenes_fast
+from .steps.parallel_scene_detect import detect_scenes_parallel
+from .steps.scene_detect import detect_scenes_with_optical_flow
+from .steps.media_pass import run_media_pass
 from .steps.mm_llm_decompose import decompose_with_mm_llm
 from .steps.artifacts import generate_artifacts
 from .steps.compare_map import map_segments
 from .steps.improve_steps import generate_improvements
 from .steps.format_analysis import generate_formatted_analysis
+from .job_queue import JobQueue
+from .executors import run_cpu_bound, run_blocking_io
+from .events import job_events
+from .frame_index import FrameIndex
+from .frame_hash import select_diverse
+from .local_analysis import LocalAnalysis, analyze_segment_locally, resolve_module_sources
+from .adaptive_sampling import resolve_mode
+from .asset_store import asset_store
+from .materialize import materialize_dir
 
 from ..db.session import get_db
-from ..db.repo import JobRepository, AssetRepository, ArtifactRepository
+from ..db.repo import JobRepository, JobSegmentRepository, AssetRepository, ArtifactRepository
+from ..db.progress_writer import progress_writer
 from ..db.models import JobStatus, Asset, AssetRole, Artifact, ArtifactType
 from ..core.config import settings
-from ..core.errors import JobExecutionError
+from ..core.errors import JobExecutionError, LLMAPIError
 from ..core.logging import logger
-from ..integrations.mm_llm_client import MMHLLMClient
+from ..integrations.mm_llm_client import FrameInput, MMHLLMClient, SegmentBatching
 
 
 class PipelineOrchestrator:
@@ -61,44 +74,142 @@ class PipelineOrchestrator:
         ingest_result = await self._ingest_asset(target_video, AssetRole.TARGET)
         
         # 2. CV场景检测（新增）
-        use_cv_detection = options.get("scene_detection", {}).get("use_cv", True)
-        
-        if use_cv_detection:
+        scene_options = options.get("scene_detection", {})
+        use_cv_detection = scene_options.get("use_cv", True)
+        scene_engine = scene_options.get("engine", settings.scene_engine)
+        if scene_engine not in SCENE_ENGINES:
+            logger.warning(f"未知的场景检测引擎 {scene_engine}，使用 content")
+            scene_engine = "content"
+        # 单次解码基于ContentDetector，选择其他引擎时单独检测
+        single_pass = use_cv_detection and scene_engine == "content" and scene_options.get(
+            "single_pass", settings.single_decode_pass
+        )
+        frames_result = None
+        
+        if single_pass:
+            # 单次解码：场景检测、抽帧、场景关键帧共用一次解码
+            self._update_progress("scene_detection", 25, "CV场景检测与抽帧...")
+            frame_config = options.get("frame_extract", {})
+            media_options = {
+                "fps": frame_config.get("fps", 2.0),
+                "max_frames": frame_config.get("max_frames", 240),
+                "threshold": scene_options.get("threshold", 27.0),
+                "sampling_mode": resolve_mode(frame_config.get("mode"))
+            }
+            frames_result = await self._derive_asset(
+                ingest_result,
+                AssetRole.TARGET,
+                "media_pass",
+                media_options,
+                lambda root: run_cpu_bound(
+                    run_media_pass,
+                    ingest_result["local_path"],
+                    root or self.job_dir / "target",
+                    root or self.job_dir,
+                    **media_options
+                )
+            )
+            cv_segments = frames_result["segments"]
+        elif use_cv_detection and scene_engine == "flow":
             self._update_progress("scene_detection", 25, "CV场景检测...")
-            cv_segments = detect_scenes(
-                ingest_result["local_path"],
-                self.job_dir / "target",
-                threshold=options.get("scene_detection", {}).get("threshold", 27.0)
+            flow_params = {
+                "flow_threshold": scene_options.get("flow_threshold", 30.0),
+                "method": scene_options.get("flow_method", settings.optical_flow_method),
+                "decode_width": scene_options.get("decode_width", settings.optical_flow_decode_width),
+                "sample_rate": scene_options.get("sample_rate", settings.optical_flow_sample_rate),
+                "grid_step": scene_options.get("grid_step", settings.optical_flow_grid_step)
+            }
+            cv_segments = await self._derive_asset(
+                ingest_result,
+                AssetRole.TARGET,
+                "scenes_flow",
+                flow_params,
+                lambda root: run_cpu_bound(
+                    detect_scenes_with_optical_flow,
+                    ingest_result["local_path"],
+                    root or self.job_dir / "target",
+                    **flow_params
+                )
+            )
+        elif use_cv_detection and scene_engine != "content":
+            self._update_progress("scene_detection", 25, "CV场景检测...")
+            scene_params = {
+                "threshold": scene_options.get("threshold", 27.0),
+                "backend": "ffmpeg" if scene_engine == "ffmpeg" else "opencv",
+                "sample_rate": scene_options.get("sample_rate", settings.fast_scene_sample_rate),
+                "decode_width": scene_options.get("decode_width", settings.fast_scene_decode_width)
+            }
+            if scene_engine == "ffmpeg":
+                scene_params["ffmpeg_threshold"] = scene_options.get(
+                    "ffmpeg_threshold", settings.ffmpeg_scene_threshold
+                )
+            else:
+                scene_params["hist_threshold"] = scene_options.get(
+                    "hist_threshold", settings.fast_scene_hist_threshold
+                )
+                scene_params["motion_ratio"] = scene_options.get(
+                    "motion_ratio", settings.fast_scene_motion_ratio
+                )
+            cv_segments = await self._derive_asset(
+                ingest_result,
+                AssetRole.TARGET,
+                "scenes_fast",
+                scene_params,
+                lambda root: run_cpu_bound(
+                    detect_scenes_fast,
+                    ingest_result["local_path"],
+                    root or self.job_dir / "target",
+                    **scene_params
+                )
+            )
+        elif use_cv_detection:
+            self._update_progress("scene_detection", 25, "CV场景检测...")
+            threshold = scene_options.get("threshold", 27.0)
+            cv_segments = await self._derive_asset(
+                ingest_result,
+                AssetRole.TARGET,
+                "scenes",
+                {"threshold": threshold},
+                # 长视频分段并行，结果与 detect_scenes 相同
+                lambda root: detect_scenes_parallel(
+                    ingest_result["local_path"],
+                    root or self.job_dir / "target",
+                    threshold=threshold
+                )
             )
+        else:
+            cv_segments = None
+        
+        if use_cv_detection:
             logger.info(f"CV检测到{len(cv_segments)}个场景")
             
-            # 立即保存CV检测结果（无特征）
-            partial_result = {
+            # 立即保存CV检测结果（无特征），每个片段一行
+            self._save_partial_result({
                 "mode": "learn",
                 "target": {
                     "asset_id": ingest_result.get("asset_id"),
-                    "segments": [
-                        {
-                            **seg,
-                            "features": [],
-                            "analyzing": True  # 标记为分析中
-                        }
-                        for seg in cv_segments
-                    ],
                     "detection_method": "cv",
                     "analyzing": True
                 }
-            }
-            self._save_partial_result(partial_result)
-        else:
-            cv_segments = None
+            })
+            self._init_segments([
+                {
+                    **seg,
+                    "features": [],
+                    "analyzing": True  # 标记为分析中
+                }
+                for seg in cv_segments
+            ])
         
-        # 3. Extract frames
-        self._update_progress("extract_frames", 35, "抽取关键帧...")
-        frames_result = self._extract_frames_for_asset(
-            ingest_result["local_path"],
-            options.get("frame_extract", {})
-        )
+        # 3. Extract frames（单次解码模式下已完成）
+        if frames_result is None:
+            self._update_progress("extract_frames", 35, "抽取关键帧...")
+            frames_result = await self._extract_frames_for_asset(
+                ingest_result,
+                AssetRole.TARGET,
+                options.get("frame_extract", {}),
+                cv_segments
+            )
         
         # 4. LLM特征分析（基于CV检测的场景）
         self._update_progress("feature_analysis", 60, "分析视频特征...")
@@ -116,11 +227,16 @@ class PipelineOrchestrator:
                 frames_result["frames_index"],
                 options.get("llm", {})
             )
+            self._init_segments(decompose_result["segments"])
+        
+        # 最终片段以片段表为准
+        segments = self._load_segments()
         
         # 5. Generate artifacts
         self._update_progress("artifacts", 85, "生成产物...")
-        artifacts_result = generate_artifacts(
-            decompose_result["segments"],
+        artifacts_result = await run_blocking_io(
+            generate_artifacts,
+            segments,
             frames_result["frames_index"],
             self.job_dir / "target",
             asset_role="target"
@@ -133,7 +249,7 @@ class PipelineOrchestrator:
             "mode": "learn",
             "target": {
                 "asset_id": ingest_result.get("asset_id"),
-                "segments": decompose_result["segments"],
+                "segments": segments,
                 "keyframes": artifacts_result["keyframes"],
                 "detection_method": "cv" if use_cv_detection else "llm"
             }
@@ -158,8 +274,9 @@ class PipelineOrchestrator:
         target_ingest = await self._ingest_asset(target_video, AssetRole.TARGET)
         
         self._update_progress("target_extract", 15, "抽取target关键帧...")
-        target_frames = self._extract_frames_for_asset(
-            target_ingest["local_path"],
+        target_frames = await self._extract_frames_for_asset(
+            target_ingest,
+            AssetRole.TARGET,
             options.get("frame_extract", {})
         )
         
@@ -169,7 +286,8 @@ class PipelineOrchestrator:
             options.get("llm", {})
         )
         
-        target_artifacts = generate_artifacts(
+        target_artifacts = await run_blocking_io(
+            generate_artifacts,
             target_decompose["segments"],
             target_frames["frames_index"],
             self.job_dir / "target",
@@ -181,8 +299,9 @@ class PipelineOrchestrator:
         user_ingest = await self._ingest_asset(user_video, AssetRole.USER)
         
         self._update_progress("user_extract", 50, "抽取user关键帧...")
-        user_frames = self._extract_frames_for_asset(
-            user_ingest["local_path"],
+        user_frames = await self._extract_frames_for_asset(
+            user_ingest,
+            AssetRole.USER,
             options.get("frame_extract", {})
         )
         
@@ -192,7 +311,8 @@ class PipelineOrchestrator:
             options.get("llm", {})
         )
         
-        user_artifacts = generate_artifacts(
+        user_artifacts = await run_blocking_io(
+            generate_artifacts,
             user_decompose["segments"],
             user_frames["frames_index"],
             self.job_dir / "user",
@@ -246,7 +366,7 @@ class PipelineOrchestrator:
         video_config: Dict[str, Any],
         role: AssetRole
     ) -> Dict[str, Any]:
-        """摄取资源"""
+        """摄取资源（可重入：崩溃恢复后重跑时复用已有Asset并清掉上次的产物和片段）"""
         
         source = video_config.get("source", {})
         source_type = source.get("type", "url")
@@ -265,6 +385,8 @@ class PipelineOrchestrator:
         # 保存到数据库
         with get_db() as db:
             asset_repo = AssetRepository(db)
+            ArtifactRepository(db).delete_by_job_and_role(self.job_id, role.value)
+            JobSegmentRepository(db).replace_all(self.job_id, [], asset_role=role.value)
             
             asset_id = f"{self.job_id}_{role.value}"
             asset = Asset(
@@ -282,80 +404,207 @@ class PipelineOrchestrator:
                 codec=ingest_result["codec"]
             )
             
-            asset_repo.create(asset)
+            asset_repo.upsert(asset)
         
         return {**ingest_result, "asset_id": asset_id}
     
-    def _extract_frames_for_asset(
+    async def _extract_frames_for_asset(
         self,
-        video_path: str,
-        frame_config: Dict[str, Any]
+        ingest_result: Dict[str, Any],
+        role: AssetRole,
+        frame_config: Dict[str, Any],
+        segments: Optional[List[Dict[str, Any]]] = None
     ) -> Dict[str, Any]:
-        """为资源抽取帧"""
+        """为资源抽取帧（adaptive模式下按 segments 的场景边界分配抽帧预算）"""
         
         fps = frame_config.get("fps", 2.0)
         max_frames = frame_config.get("max_frames", 240)
+        mode = resolve_mode(frame_config.get("mode"))
+        
+        frame_options = {"fps": fps, "max_frames": max_frames, "sampling_mode": mode}
+        if mode == "adaptive" and segments:
+            frame_options["boundaries"] = [[s["start_ms"], s["end_ms"]] for s in segments]
+        
+        return await self._derive_asset(
+            ingest_result,
+            role,
+            "frames",
+            frame_options,
+            lambda root: extract_frames(
+                ingest_result["local_path"],
+                root or self.job_dir,
+                fps,
+                max_frames,
+                mode=mode,
+                segments=segments,
+                duration_ms=ingest_result.get("duration_ms")
+            )
+        )
+    
+    async def _derive_asset(
+        self,
+        ingest_result: Dict[str, Any],
+        role: AssetRole,
+        kind: str,
+        options: Dict[str, Any],
+        produce: Callable[[Optional[Path]], Awaitable[Any]]
+    ) -> Any:
+        """
+        获取视频的派生产物（抽帧、场景检测、场景关键帧）
         
-        return extract_frames(
-            video_path,
-            self.job_dir,
-            fps,
-            max_frames
+        启用资源仓库时，内容相同的视频在相同参数下只计算一次，产物保存在仓库中，
+        场景关键帧落地到本Job的资源目录以保持原有访问路径。
+        produce(root) 在 root 下生成产物，root 为 None 时写入Job目录。
+        """
+        content_hash = ingest_result.get("content_hash")
+        if not settings.asset_store_enabled or not content_hash:
+            return await produce(None)
+        
+        result, product_dir, reused = await asset_store.derive(
+            content_hash, kind, options, produce
         )
+        if reused:
+            logger.info(f"Job {self.job_id} 复用{role.value}视频的{kind}产物")
+        
+        keyframes_dir = product_dir / "scene_keyframes"
+        job_keyframes_dir = self.job_dir / role.value / "scene_keyframes"
+        if keyframes_dir.is_dir():
+            await run_blocking_io(materialize_dir, keyframes_dir, job_keyframes_dir)
+        
+        if isinstance(result, dict):
+            result = dict(result)
+            if "frames_index" in result:
+                result["frames_index"] = FrameIndex.of(result["frames_index"])
+            if "scene_keyframes" in result:
+                result["scene_keyframes"] = [
+                    str(job_keyframes_dir / Path(path).name)
+                    for path in result["scene_keyframes"]
+                ]
+        return result
     
     async def _analyze_cv_segments(
         self,
         cv_segments: List[Dict[str, Any]],
-        frames_index: List[Dict[str, Any]],
+        frames_index: FrameIndex,
         llm_config: Dict[str, Any]
     ) -> Dict[str, Any]:
         """
         基于CV检测的场景，使用LLM分析特征
-        """
-        from .steps.mm_llm_decompose import decompose_with_mm_llm
-        from ..integrations.mm_llm_client import MMHLLMClient, FrameInput
         
+        各场景的LLM调用相互独立，按 max_concurrency 限流并发执行；
+        每完成一个场景只更新该场景所在的一行，并按场景位置推送增量。
+        llm_config 启用联系表或多片段打包时，以打包后的请求为并发单位。
+        """
         logger.info(f"开始分析{len(cv_segments)}个CV检测的场景")
         
-        segments_with_features = []
+        frames_index = FrameIndex.of(frames_index)
         total_segments = len(cv_segments)
+        max_concurrency = max(
+            1,
+            int(llm_config.get("max_concurrency") or settings.llm_segment_concurrency)
+        )
+        semaphore = asyncio.Semaphore(max_concurrency)
         
-        # 为每个CV检测的场景分析特征
-        for idx, segment in enumerate(cv_segments):
-            segment_id = segment["segment_id"]
-            start_ms = segment["start_ms"]
-            end_ms = segment["end_ms"]
-            
-            # 获取该场景的帧
-            segment_frames = [
-                f for f in frames_index
-                if start_ms <= f["ts_ms"] <= end_ms
-            ]
-            
-            if not segment_frames:
-                # 如果没有帧，使用边界附近的帧
-                closest_frame = min(frames_index, key=lambda f: abs(f["ts_ms"] - start_ms))
-                segment_frames = [closest_frame]
-            
-            # 准备帧输入
-            frame_inputs = [
-                FrameInput(ts_ms=frame["ts_ms"], image_path=frame["path"])
-                for frame in segment_frames[:5]  # 最多5帧
-            ]
-            
-            # 创建LLM客户端
+        # 整个Job共用一个客户端（底层为进程级连接池）
+        try:
             client = MMHLLMClient(model=llm_config.get("model"))
-            
-            # 只分析特征，不做场景切分
-            enabled_modules = llm_config.get("enabled_modules", [
-                "camera_motion", "lighting", "color_grading"
-            ])
-            
-            prompt = self._build_feature_only_prompt(
-                segment_id, start_ms, end_ms, enabled_modules
+        except LLMAPIError as e:
+            logger.error(f"LLM客户端初始化失败: {e.message}")
+            client = None
+        
+        # 按场景顺序占位，None表示仍在分析中
+        results: List[Optional[Dict[str, Any]]] = [None] * total_segments
+        
+        batching = SegmentBatching.from_config(llm_config)
+        if batching.enabled:
+            batches = batching.plan(cv_segments)
+            logger.info(
+                f"合并请求: {total_segments}个场景打包为{len(batches)}次请求"
+                f"（联系表={batching.contact_sheet}）"
             )
-            
+        else:
+            batches = [[idx] for idx in range(total_segments)]
+        
+        async def analyze_with_limit(batch: List[int]):
+            async with semaphore:
+                if batching.enabled:
+                    batch_results = await self._analyze_cv_segment_batch(
+                        [cv_segments[idx] for idx in batch],
+                        frames_index,
+                        llm_config,
+                        client,
+                        batching.contact_sheet
+                    )
+                else:
+                    batch_results = [await self._analyze_single_cv_segment(
+                        cv_segments[batch[0]],
+                        frames_index,
+                        llm_config,
+                        client
+                    )]
+            return list(zip(batch, batch_results))
+        
+        tasks = [
+            asyncio.create_task(analyze_with_limit(batch))
+            for batch in batches
+        ]
+        
+        completed = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                for idx, segment_result in await next_done:
+                    results[idx] = segment_result
+                    completed += 1
+                    
+                    # 立即更新部分结果
+                    progress_percent = 60 + completed / total_segments * 25  # 60-85%
+                    self._update_progress(
+                        "feature_analysis",
+                        progress_percent,
+                        f"分析特征 {completed}/{total_segments}"
+                    )
+                    
+                    # 只写入这一个片段（行级更新），并推送增量
+                    self._save_segment(idx, segment_result, total_segments)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+        
+        return {"segments": results}
+    
+    async def _analyze_single_cv_segment(
+        self,
+        segment: Dict[str, Any],
+        frames_index: FrameIndex,
+        llm_config: Dict[str, Any],
+        client: Optional[MMHLLMClient]
+    ) -> Dict[str, Any]:
+        """分析单个CV场景的特征（失败时返回空特征的场景）"""
+        segment_id = segment["segment_id"]
+        start_ms = segment["start_ms"]
+        end_ms = segment["end_ms"]
+        
+        # 只分析特征，不做场景切分
+        enabled_modules = llm_config.get("enabled_modules", [
+            "camera_motion", "lighting", "color_grading"
+        ])
+        
+        local = await self._analyze_locally(
+            frames_index, start_ms, end_ms, llm_config, enabled_modules
+        )
+        llm_modules = local.llm_modules(enabled_modules)
+        
+        normalized_features = []
+        if llm_modules:
             try:
+                if client is None:
+                    raise LLMAPIError("LLM客户端不可用")
+                
+                frame_inputs = await self._select_segment_frames(frames_index, start_ms, end_ms)
+                prompt = self._build_feature_only_prompt(
+                    segment_id, start_ms, end_ms, llm_modules, local.motion
+                )
                 response = await client._call_api(frame_inputs, prompt)
                 
                 # 解析特征
@@ -370,67 +619,154 @@ class PipelineOrchestrator:
                 # 规范化特征
                 normalized_features = client._normalize_features(features, start_ms, end_ms)
                 
-                segments_with_features.append({
-                    "segment_id": segment_id,
-                    "start_ms": start_ms,
-                    "end_ms": end_ms,
-                    "duration_ms": end_ms - start_ms,
-                    "features": normalized_features,
-                    "analyzing": False  # 标记为分析完成
-                })
-                
                 logger.info(f"场景{segment_id}分析完成，{len(normalized_features)}个特征")
-                
+            
             except Exception as e:
                 logger.error(f"场景{segment_id}分析失败: {str(e)}")
                 # 添加空特征的场景
-                segments_with_features.append({
-                    "segment_id": segment_id,
-                    "start_ms": start_ms,
-                    "end_ms": end_ms,
-                    "duration_ms": end_ms - start_ms,
-                    "features": [],
-                    "analyzing": False
-                })
-            
-            # 立即更新部分结果
-            progress_percent = 60 + (idx + 1) / total_segments * 25  # 60-85%
-            self._update_progress(
-                "feature_analysis",
-                progress_percent,
-                f"分析特征 {idx + 1}/{total_segments}"
+                normalized_features = []
+        
+        normalized_features = local.merge(normalized_features)
+        
+        return {
+            "segment_id": segment_id,
+            "start_ms": start_ms,
+            "end_ms": end_ms,
+            "duration_ms": end_ms - start_ms,
+            "features": normalized_features,
+            "analyzing": False  # 标记为分析完成
+        }
+    
+    async def _analyze_cv_segment_batch(
+        self,
+        segments: List[Dict[str, Any]],
+        frames_index: FrameIndex,
+        llm_config: Dict[str, Any],
+        client: Optional[MMHLLMClient],
+        contact_sheet: bool
+    ) -> List[Dict[str, Any]]:
+        """
+        一次请求分析一组CV场景（联系表 / 多片段打包），按 segment_id 拆回各场景
+        
+        整个请求失败或回复中缺少某个场景时，该场景退回单独分析。
+        """
+        enabled_modules = llm_config.get("enabled_modules", [
+            "camera_motion", "lighting", "color_grading"
+        ])
+        label = f"{segments[0]['segment_id']}~{segments[-1]['segment_id']}"
+        
+        locals_by_id = {
+            seg["segment_id"]: await self._analyze_locally(
+                frames_index, seg["start_ms"], seg["end_ms"], llm_config, enabled_modules
             )
-            
-            # 构建当前的部分结果（包含已分析的和待分析的）
-            all_segments = segments_with_features + [
-                {
-                    **cv_segments[i],
-                    "features": [],
-                    "analyzing": True
-                }
-                for i in range(idx + 1, total_segments)
-            ]
-            
-            partial_result = {
-                "mode": "learn",
-                "target": {
-                    "segments": all_segments,
-                    "detection_method": "cv",
-                    "analyzing": idx + 1 < total_segments
-                }
-            }
-            self._save_partial_result(partial_result)
+            for seg in segments
+        }
+        # 所有模块都已在本地确定的场景不再发给LLM
+        pending = [seg for seg in segments if locals_by_id[seg["segment_id"]].llm_modules(enabled_modules)]
+        batch_modules = [
+            m for m in enabled_modules
+            if any(m in locals_by_id[seg["segment_id"]].llm_modules(enabled_modules) for seg in pending)
+        ]
+        
+        features_by_id: Dict[str, List[Dict[str, Any]]] = {
+            seg["segment_id"]: [] for seg in segments if seg not in pending
+        }
+        if client is not None and pending:
+            try:
+                frame_groups = [
+                    await self._select_segment_frames(frames_index, seg["start_ms"], seg["end_ms"])
+                    for seg in pending
+                ]
+                features_by_id.update(await client.analyze_segment_batch(
+                    pending, frame_groups, batch_modules, contact_sheet,
+                    local_motions={
+                        seg_id: local.motion for seg_id, local in locals_by_id.items()
+                        if local.motion is not None
+                    },
+                    local_modules={
+                        seg_id: sorted(local.local_modules) for seg_id, local in locals_by_id.items()
+                        if local.local_modules
+                    }
+                ))
+                logger.info(f"场景{label}合并分析完成")
+            except Exception as e:
+                logger.error(f"场景{label}合并分析失败: {str(e)}")
+        
+        results = []
+        for seg in segments:
+            if seg["segment_id"] not in features_by_id:
+                results.append(await self._analyze_single_cv_segment(
+                    seg, frames_index, llm_config, client
+                ))
+                continue
+            results.append({
+                "segment_id": seg["segment_id"],
+                "start_ms": seg["start_ms"],
+                "end_ms": seg["end_ms"],
+                "duration_ms": seg["end_ms"] - seg["start_ms"],
+                "features": locals_by_id[seg["segment_id"]].merge(features_by_id[seg["segment_id"]]),
+                "analyzing": False
+            })
+        return results
+    
+    async def _analyze_locally(
+        self,
+        frames_index: FrameIndex,
+        start_ms: float,
+        end_ms: float,
+        llm_config: Dict[str, Any],
+        enabled_modules: List[str]
+    ) -> LocalAnalysis:
+        """按 options.llm.module_sources 用场景内已抽取的帧做本地分析（失败时全部交给LLM）"""
+        try:
+            return await run_blocking_io(
+                analyze_segment_locally,
+                frames_index.range(start_ms, end_ms),
+                start_ms,
+                end_ms,
+                enabled_modules,
+                resolve_module_sources(llm_config),
+                llm_config.get("local_camera_motion_confidence"),
+                llm_config.get("local_color_confidence")
+            )
+        except Exception as e:
+            logger.warning(f"本地特征分析失败（{start_ms}ms - {end_ms}ms）: {str(e)}")
+            return LocalAnalysis()
+    
+    async def _select_segment_frames(
+        self,
+        frames_index: FrameIndex,
+        start_ms: float,
+        end_ms: float
+    ) -> List[FrameInput]:
+        """场景内按感知哈希去重，最多取5帧画面差异最大的帧"""
+        segment_frames = await run_blocking_io(
+            select_diverse, frames_index.range(start_ms, end_ms), 5
+        )
         
-        return {"segments": segments_with_features}
+        if not segment_frames:
+            # 如果没有帧，使用边界附近的帧
+            segment_frames = [frames_index.nearest(start_ms)]
+        
+        return [
+            FrameInput(ts_ms=frame["ts_ms"], image_path=frame["path"], dhash=frame.get("dhash"))
+            for frame in segment_frames
+        ]
     
     def _build_feature_only_prompt(
         self,
         segment_id: str,
         start_ms: float,
         end_ms: float,
-        enabled_modules: List[str]
+        enabled_modules: List[str],
+        local_motion: Optional[Dict[str, Any]] = None
     ) -> str:
-        """构建仅分析特征的提示词（不做场景切分）"""
+        """
+        构建仅分析特征的提示词（不做场景切分）
+        
+        local_motion 为本地已确定的运镜方式时，提示词去掉运镜术语、示例和要求，
+        camera_motion 只询问景别和拍摄角度。示例和要求只包含 enabled_modules 中的模块。
+        """
         
         from ..core.shot_terminology import get_shot_terminology_prompt
         
@@ -439,19 +775,61 @@ class PipelineOrchestrator:
             "lighting": "光线布局（如主光位置、补光、轮廓光等）",
             "color_grading": "调色风格（如色温、饱和度、对比度风格等）"
         }
+        camera_requirement = """camera_motion类别必须包含：
+   - 景别（全景/中全景/中景/近景/特写）
+   - 运镜方式（摇镜头/移镜头/推镜头/拉镜头/跟踪镜头/升格镜头/降格镜头/固定镜头）
+   - 拍摄角度（贴地角度/仰拍角度/俯拍角度/鸟瞰镜头）- 至少识别3个以上特征"""
+        examples = [
+            ("camera_motion", "push_in", "推镜头 - 缓慢向前推进", "0.85"),
+            ("camera_motion", "medium_shot", "中景 - 人物腰部以上", "0.90"),
+            ("camera_motion", "low_angle", "仰拍角度 - 向上仰拍", "0.82"),
+            ("lighting", "natural", "自然光从侧面照射", "0.90"),
+            ("color_grading", "warm_tone", "暖色调，高饱和度", "0.88"),
+        ]
+        if local_motion is not None:
+            modules_desc["camera_motion"] = f"景别和拍摄角度（运镜方式已确定为{local_motion['value']}，不要输出运镜方式）"
+            camera_requirement = """camera_motion类别必须包含：
+   - 景别（全景/中全景/中景/近景/特写）
+   - 拍摄角度（贴地角度/仰拍角度/俯拍角度/鸟瞰镜头）"""
+            examples = examples[1:]
         
         enabled_desc = "\n".join([
             f"- {modules_desc.get(m, m)}" for m in enabled_modules
         ])
         
-        # 获取标准术语
-        shot_terminology = get_shot_terminology_prompt()
+        example_json = ",\n".join([
+            f"""  {{
+    "category": "{category}",
+    "type": "{feature_type}",
+    "value": "{value}",
+    "confidence": {confidence},
+    "evidence": {{
+      "time_ranges_ms": [[{start_ms}, {end_ms}]]
+    }}
+  }}"""
+            for category, feature_type, value, confidence in examples
+            if category in enabled_modules
+        ])
+        
+        requirements = [f"必须分析所有启用的特征类别（{'、'.join(enabled_modules)}）"]
+        if "camera_motion" in enabled_modules:
+            requirements.append(camera_requirement)
+        requirements += [
+            "每个feature的type使用英文key（如push_in, medium_shot, low_angle）",
+            "每个feature的value使用标准中文术语",
+            "confidence为0-1的数值",
+            "只输出JSON数组，不要其他文字"
+        ]
+        requirements_desc = "\n".join(f"{i}. {text}" for i, text in enumerate(requirements, 1))
+        
+        # 获取标准术语（只在需要分析 camera_motion 时附上）
+        shot_terminology = ""
+        if "camera_motion" in enabled_modules:
+            shot_terminology = get_shot_terminology_prompt(include_movements=local_motion is None) + "\n\n"
         
         return f"""请分析这个视频片段的影视特征。
 
-{shot_terminology}
-
-片段ID: {segment_id}
+{shot_terminology}片段ID: {segment_id}
 时间范围: {start_ms}ms - {end_ms}ms
 
 需要分析的特征：
@@ -461,78 +839,42 @@ class PipelineOrchestrator:
 
 ```json
 [
-  {{
-    "category": "camera_motion",
-    "type": "push_in",
-    "value": "推镜头 - 缓慢向前推进",
-    "confidence": 0.85,
-    "evidence": {{
-      "time_ranges_ms": [[{start_ms}, {end_ms}]]
-    }}
-  }},
-  {{
-    "category": "camera_motion",
-    "type": "medium_shot",
-    "value": "中景 - 人物腰部以上",
-    "confidence": 0.90,
-    "evidence": {{
-      "time_ranges_ms": [[{start_ms}, {end_ms}]]
-    }}
-  }},
-  {{
-    "category": "camera_motion",
-    "type": "low_angle",
-    "value": "仰拍角度 - 向上仰拍",
-    "confidence": 0.82,
-    "evidence": {{
-      "time_ranges_ms": [[{start_ms}, {end_ms}]]
-    }}
-  }},
-  {{
-    "category": "lighting",
-    "type": "natural",
-    "value": "自然光从侧面照射",
-    "confidence": 0.90,
-    "evidence": {{
-      "time_ranges_ms": [[{start_ms}, {end_ms}]]
-    }}
-  }},
-  {{
-    "category": "color_grading",
-    "type": "warm_tone",
-    "value": "暖色调，高饱和度",
-    "confidence": 0.88,
-    "evidence": {{
-      "time_ranges_ms": [[{start_ms}, {end_ms}]]
-    }}
-  }}
+{example_json}
 ]
 ```
 
 要求：
-1. 必须分析所有启用的特征类别（camera_motion、lighting、color_grading）
-2. camera_motion类别必须包含：
-   - 景别（全景/中全景/中景/近景/特写）
-   - 运镜方式（摇镜头/移镜头/推镜头/拉镜头/跟踪镜头/升格镜头/降格镜头/固定镜头）
-   - 拍摄角度（贴地角度/仰拍角度/俯拍角度/鸟瞰镜头）- 至少识别3个以上特征
-3. 每个feature的type使用英文key（如push_in, medium_shot, low_angle）
-4. 每个feature的value使用标准中文术语
-5. confidence为0-1的数值
-6. 只输出JSON数组，不要其他文字
+{requirements_desc}
 """
-    
+
     def _update_progress(self, stage: str, percent: float, message: str):
-        """更新进度"""
-        with get_db() as db:
-            job_repo = JobRepository(db)
-            job_repo.update_progress(self.job_id, stage, percent, message)
+        """更新进度（立即推送，合并后落库）"""
+        progress_writer.submit(self.job_id, stage, percent, message)
+        job_events.publish_progress(self.job_id, stage, percent, message)
     
     def _save_partial_result(self, partial_result: Dict[str, Any]):
-        """保存部分结果（用于流式更新）"""
+        """保存部分结果的概要信息（片段单独存放在片段表中）"""
         with get_db() as db:
             job_repo = JobRepository(db)
             job_repo.save_partial_result(self.job_id, partial_result)
     
+    def _init_segments(self, segments: List[Dict[str, Any]]):
+        """写入全部片段并推送全量列表"""
+        with get_db() as db:
+            JobSegmentRepository(db).replace_all(self.job_id, segments)
+        job_events.publish_segments(self.job_id, segments)
+    
+    def _save_segment(self, index: int, segment: Dict[str, Any], total: int):
+        """更新单个片段并推送增量"""
+        with get_db() as db:
+            JobSegmentRepository(db).upsert(self.job_id, index, segment)
+        job_events.publish_segment(self.job_id, index, segment, total)
+    
+    def _load_segments(self) -> List[Dict[str, Any]]:
+        """按顺序读取片段表"""
+        with get_db() as db:
+            return JobSegmentRepository(db).list_segments(self.job_id)
+    
     async def _generate_summary(self, result: Dict[str, Any]) -> Dict[str, Any]:
         """生成任务总结（标题和学习要点）"""
         try:
@@ -565,28 +907,18 @@ class PipelineOrchestrator:
             }
 
 
-# 全局Job运行器（简单版本：内存字典）
-_running_jobs: Dict[str, asyncio.Task] = {}
-
-
-async def submit_job(job_id: str, job_config: Dict[str, Any]):
-    """提交Job到运行器"""
+async def submit_job(job_id: str, job_config: Dict[str, Any], priority: int = 0):
+    """提交Job到队列（由worker池按并发上限执行）"""
     
     logger.info(f"提交Job {job_id}")
     
-    # 更新状态为running
-    with get_db() as db:
-        job_repo = JobRepository(db)
-        job_repo.update_status(job_id, JobStatus.RUNNING)
-    
-    # 创建orchestrator
+    job_queue.enqueue(job_id, job_config, priority)
+
+
+async def _execute_queued_job(job_id: str, job_config: Dict[str, Any]):
+    """worker领取Job后执行"""
     orchestrator = PipelineOrchestrator(job_id, job_config)
-    
-    # 创建异步任务
-    task = asyncio.create_task(_run_job(job_id, orchestrator))
-    _running_jobs[job_id] = task
-    
-    return task
+    await _run_job(job_id, orchestrator)
 
 
 async def _run_job(job_id: str, orchestrator: PipelineOrchestrator):
@@ -624,6 +956,7 @@ async def _run_job(job_id: str, orchestrator: PipelineOrchestrator):
                 logger.error(f"生成格式化分析报告失败: {str(e)}")
         
         # 更新状态为succeeded，并保存总结和格式化报告
+        progress_writer.discard(job_id)
         with get_db() as db:
             job_repo = JobRepository(db)
             job_repo.update_status(job_id, JobStatus.SUCCEEDED)
@@ -638,6 +971,14 @@ async def _run_job(job_id: str, orchestrator: PipelineOrchestrator):
             # 保存格式化分析报告（用于前端直接读取）
             if formatted_analysis:
                 job_repo.save_partial_result(job_id, formatted_analysis)
+            # 保存结果摘要列（列表和仪表板直接读取）
+            job_repo.save_result_summary(job_id, result, formatted_analysis)
+        
+        job_events.publish_terminal(job_id, {
+            "type": "complete",
+            "status": "succeeded",
+            "result": result
+        })
         
         logger.info(f"Job {job_id} 完成，标题: {summary.get('title')}")
     
@@ -645,6 +986,7 @@ async def _run_job(job_id: str, orchestrator: PipelineOrchestrator):
         logger.error(f"Job {job_id} 失败: {str(e)}", exc_info=True)
         
         # 更新状态为failed
+        progress_writer.discard(job_id)
         with get_db() as db:
             job_repo = JobRepository(db)
             job_repo.update_status(
@@ -653,9 +995,17 @@ async def _run_job(job_id: str, orchestrator: PipelineOrchestrator):
                 error_message=str(e),
                 error_details={"exception": str(type(e).__name__)}
             )
-    
-    finally:
-        # 清理任务
-        if job_id in _running_jobs:
-            del _running_jobs[job_id]
+        
+        job_events.publish_terminal(job_id, {
+            "type": "error",
+            "status": "failed",
+            "error": {
+                "message": str(e),
+                "details": {"exception": str(type(e).__name__)}
+            }
+        })
+
+
+# 全局Job队列（持久化，worker池在应用lifespan中启动）
+job_queue = JobQueue(_execute_queued_job)
 
@@ -1,14 +1,15 @@
 """生成产物步骤"""
 from pathlib import Path
-from typing import Dict, Any, List
-import shutil
+from typing import Dict, Any, List, Optional, Union
 
 from ...core.logging import logger
+from ..frame_index import FrameIndex
+from ..materialize import materialize
 
 
 def generate_artifacts(
     segments: List[Dict[str, Any]],
-    frames_index: List[Dict[str, Any]],
+    frames_index: Union[FrameIndex, List[Dict[str, Any]]],
     output_dir: Path,
     asset_role: str = "target"
 ) -> Dict[str, Any]:
@@ -28,6 +29,8 @@ def generate_artifacts(
     """
     logger.info(f"生成产物，共{len(segments)}个镜头")
     
+    frames_index = FrameIndex.of(frames_index)
+    
     keyframes_dir = output_dir / "keyframes"
     keyframes_dir.mkdir(parents=True, exist_ok=True)
     
@@ -45,11 +48,11 @@ def generate_artifacts(
         closest_frame = _find_closest_frame(frames_index, mid_ms)
         
         if closest_frame:
-            # 复制为关键帧
+            # 关键帧直接引用已抽取的帧文件
             src_path = Path(closest_frame["path"])
             dst_path = keyframes_dir / f"{asset_role}_{segment_id}_key.jpg"
             
-            shutil.copy2(src_path, dst_path)
+            materialize(src_path, dst_path)
             
             keyframes.append({
                 "segment_id": segment_id,
@@ -63,16 +66,9 @@ def generate_artifacts(
 
 
 def _find_closest_frame(
-    frames_index: List[Dict[str, Any]],
+    frames_index: FrameIndex,
     target_ms: float
-) -> Dict[str, Any]:
+) -> Optional[Dict[str, Any]]:
     """找到最接近目标时间的帧"""
-    if not frames_index:
-        return None
-    
-    closest = min(
-        frames_index,
-        key=lambda f: abs(f["ts_ms"] - target_ms)
-    )
-    return closest
+    return frames_index.nearest(target_ms)
 
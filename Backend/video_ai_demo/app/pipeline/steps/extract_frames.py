@@ -1,40 +1,70 @@
 """抽帧步骤"""
-import subprocess
 import json
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 from ...core.errors import VideoProcessingError
 from ...core.config import settings
 from ...core.logging import logger
+from ..adaptive_sampling import (
+    prune_candidates,
+    resolve_mode,
+    score_image_files,
+    select_adaptive_frames,
+)
+from ..executors import run_blocking_io, run_subprocess
+from ..frame_hash import annotate_hashes
+from ..frame_index import FrameIndex
 
 
-def extract_frames(
+async def extract_frames(
     video_path: str,
     output_dir: Path,
     fps: float = 2.0,
-    max_frames: int = 240
+    max_frames: int = 240,
+    mode: Optional[str] = None,
+    segments: Optional[List[Dict[str, Any]]] = None,
+    duration_ms: Optional[float] = None
 ) -> Dict[str, Any]:
     """
     从视频中抽取关键帧
     
+    adaptive 模式下先按 fps×adaptive_oversample 抽取覆盖整段视频的候选帧，
+    再按场景边界和相邻候选帧的变化分数选出不超过 max_frames 帧。
+    
     Args:
         video_path: 视频路径
         output_dir: 输出目录
         fps: 抽帧率
         max_frames: 最大帧数
+        mode: fixed / adaptive，默认取 settings.frame_sampling_mode
+        segments: 场景列表（adaptive模式使用，为空时整段视频视为一个场景）
+        duration_ms: 视频时长（adaptive模式用于让候选帧覆盖整段视频）
     
     Returns:
         {
             "frames_dir": str,
-            "frames_index": List[{"frame_id": str, "ts_ms": float, "path": str}],
+            "frames_index": FrameIndex[{"frame_id": str, "ts_ms": float, "path": str, "dhash": str}],
             "total_frames": int
         }
     """
     frames_dir = output_dir / "frames"
     frames_dir.mkdir(parents=True, exist_ok=True)
     
-    logger.info(f"开始抽帧: fps={fps}, max_frames={max_frames}")
+    adaptive = resolve_mode(mode) == "adaptive"
+    sample_fps = fps
+    sample_limit = max_frames
+    if adaptive:
+        oversample = max(1, settings.adaptive_oversample)
+        sample_limit = max_frames * oversample
+        sample_fps = fps * oversample
+        if duration_ms:
+            sample_fps = min(sample_fps, sample_limit / (duration_ms / 1000))
+    
+    logger.info(
+        f"开始抽帧: fps={fps}, max_frames={max_frames}, "
+        f"sampling={'adaptive' if adaptive else 'fixed'}"
+    )
     
     # 使用ffmpeg抽帧
     output_pattern = str(frames_dir / "frame_%05d.jpg")
@@ -42,24 +72,33 @@ def extract_frames(
     cmd = [
         settings.ffmpeg_bin,
         "-i", video_path,
-        "-vf", f"fps={fps}",
-        "-frames:v", str(max_frames),
+        "-vf", f"fps={sample_fps}",
+        "-frames:v", str(sample_limit),
         "-q:v", "2",  # 高质量JPEG
         output_pattern
     ]
     
-    try:
-        subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            check=True
-        )
-    except subprocess.CalledProcessError as e:
-        raise VideoProcessingError(f"ffmpeg抽帧失败: {e.stderr}")
+    returncode, _, stderr = await run_subprocess(cmd)
+    if returncode != 0:
+        raise VideoProcessingError(f"ffmpeg抽帧失败: {stderr}")
     
     # 生成帧索引
-    frames_index = _build_frames_index(frames_dir, fps)
+    frames_index = _build_frames_index(frames_dir, sample_fps)
+    
+    if adaptive:
+        candidate_count = len(frames_index)
+        scores = await run_blocking_io(score_image_files, [f["path"] for f in frames_index])
+        selected = select_adaptive_frames(
+            [f["ts_ms"] for f in frames_index],
+            scores,
+            [(s["start_ms"], s["end_ms"]) for s in segments or []],
+            max_frames
+        )
+        frames_index = await run_blocking_io(prune_candidates, frames_index, selected)
+        logger.info(f"自适应抽帧: 候选{candidate_count}帧，选中{len(frames_index)}帧")
+    
+    # 感知哈希只算一次，随帧索引保存
+    await run_blocking_io(annotate_hashes, frames_index)
     
     # 保存索引文件
     index_file = output_dir / "frames_index.json"
@@ -70,7 +109,7 @@ def extract_frames(
     
     return {
         "frames_dir": str(frames_dir),
-        "frames_index": frames_index,
+        "frames_index": FrameIndex(frames_index),
         "total_frames": len(frames_index)
     }
 
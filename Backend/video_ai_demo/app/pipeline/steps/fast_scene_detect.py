@@ -0,0 +1,313 @@
+"""快速场景检测引擎 - 跳帧解码、低分辨率、批量NumPy计算帧差，可选ffmpeg场景滤镜后端"""
+import re
+import subprocess
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ...core.config import settings
+from ...core.errors import VideoProcessingError
+from ...core.logging import logger
+from .media_pass import _build_segments
+
+
+# content：PySceneDetect ContentDetector（detect_scenes / 单次解码）
+# fast：本模块的OpenCV后端；ffmpeg：ffmpeg select=scene 滤镜
+# flow：光流法（detect_scenes_with_optical_flow）
+SCENE_ENGINES = ("content", "fast", "ffmpeg", "flow")
+
+# HS直方图的分箱数（与 _calculate_histogram 相同）
+H_BINS = 50
+S_BINS = 60
+
+BATCH_SIZE = 64
+
+# 跳帧时用前几次帧差的中位数作为运动基线
+MOTION_WINDOW = 5
+
+_PTS_TIME_RE = re.compile(r"pts_time:\s*([0-9.]+)")
+
+
+def detect_scenes_fast(
+    video_path: str,
+    output_dir: Path,
+    threshold: float = 27.0,
+    min_scene_len: int = 15,
+    backend: str = "opencv",
+    sample_rate: Optional[int] = None,
+    decode_width: Optional[int] = None,
+    hist_threshold: Optional[float] = None,
+    motion_ratio: Optional[float] = None,
+    ffmpeg_threshold: Optional[float] = None,
+    max_scene_keyframes: int = 50
+) -> List[Dict[str, Any]]:
+    """
+    快速CV场景检测，返回格式与 detect_scenes 相同
+    
+    opencv 后端：每 sample_rate 帧取一帧，其余帧只 grab() 不解码输出；取出的帧按行列
+    间隔抽取到约 decode_width 宽（OpenCV无法按缩小分辨率解码，抽取比插值缩放便宜得多），
+    按批计算与上一采样帧的 HSV 平均差（与 ContentDetector 的 content_val 同一尺度，
+    threshold 含义相同）和 HS 直方图 L1 距离。直方图距离超过 hist_threshold，或帧差超过
+    threshold 即为切点；sample_rate>1 时跨多帧的帧差会随镜头运动放大，帧差还需达到前
+    MOTION_WINDOW 次帧差中位数的 motion_ratio 倍。切点精度为 sample_rate 帧。
+    
+    ffmpeg 后端：用 select='gt(scene,T)' 滤镜在缩小后的画面上找切点。
+    
+    两种后端都按 ContentDetector 的规则应用 min_scene_len：距上一个切点（起始为第0帧）
+    不足 min_scene_len 帧的切点被忽略。
+    
+    Args:
+        video_path: 视频路径
+        output_dir: 输出目录（场景关键帧写在 scene_keyframes/）
+        threshold: HSV平均差阈值（同 ContentDetector，默认27）
+        min_scene_len: 最小场景长度（帧数）
+        backend: opencv / ffmpeg
+        sample_rate: 每N帧检测一次，默认取 settings.fast_scene_sample_rate
+        decode_width: 检测用的画面宽度，默认取 settings.fast_scene_decode_width
+        hist_threshold: HS直方图L1距离阈值（0~1），默认取 settings.fast_scene_hist_threshold
+        motion_ratio: 跳帧时相对运动基线的倍数，默认取 settings.fast_scene_motion_ratio
+        ffmpeg_threshold: ffmpeg scene分数阈值（0~1），默认取 settings.ffmpeg_scene_threshold
+        max_scene_keyframes: 场景数不超过该值时导出场景关键帧
+    """
+    sample_rate = max(1, sample_rate or settings.fast_scene_sample_rate)
+    decode_width = decode_width or settings.fast_scene_decode_width
+    hist_threshold = settings.fast_scene_hist_threshold if hist_threshold is None else hist_threshold
+    motion_ratio = settings.fast_scene_motion_ratio if motion_ratio is None else motion_ratio
+    ffmpeg_threshold = settings.ffmpeg_scene_threshold if ffmpeg_threshold is None else ffmpeg_threshold
+    
+    logger.info(
+        f"开始快速场景检测: backend={backend}, threshold={threshold}, "
+        f"min_scene_len={min_scene_len}, sample_rate={sample_rate}, decode_width={decode_width}"
+    )
+    
+    try:
+        if backend == "ffmpeg":
+            video_fps, frame_count = _probe(video_path)
+            cut_times = _detect_cut_times_ffmpeg(video_path, ffmpeg_threshold, decode_width)
+            candidates = [int(round(t * video_fps)) for t in cut_times]
+            total_frames = frame_count
+        elif backend == "opencv":
+            video_fps, candidates, total_frames = _detect_cuts_opencv(
+                video_path, threshold, hist_threshold, motion_ratio, sample_rate, decode_width
+            )
+        else:
+            raise VideoProcessingError(f"未知的场景检测后端: {backend}")
+        
+        cuts = apply_min_scene_len(candidates, min_scene_len, total_frames)
+        if not cuts:
+            logger.warning("未检测到场景切换，使用整个视频作为单一场景")
+        
+        segments = _build_segments(cuts, total_frames, video_fps)
+        logger.info(f"快速场景检测完成，共检测到{len(segments)}个场景")
+        
+        if 0 < len(segments) < max_scene_keyframes:
+            try:
+                _save_scene_keyframes(video_path, segments, output_dir / "scene_keyframes")
+            except Exception as e:
+                logger.warning(f"保存场景关键帧失败: {str(e)}")
+        
+        return segments
+    
+    except VideoProcessingError:
+        raise
+    except Exception as e:
+        raise VideoProcessingError(f"快速场景检测失败: {str(e)}")
+
+
+def apply_min_scene_len(candidates: List[int], min_scene_len: int, total_frames: int) -> List[int]:
+    """按 ContentDetector 的规则过滤切点：与上一个切点（起始为第0帧）间隔不足 min_scene_len 的忽略"""
+    cuts = []
+    last_cut = 0
+    for frame in sorted(set(candidates)):
+        if frame <= 0 or frame >= total_frames:
+            continue
+        if frame - last_cut >= min_scene_len:
+            cuts.append(frame)
+            last_cut = frame
+    return cuts
+
+
+def frame_features(frames: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    批量计算帧特征
+    
+    Args:
+        frames: (B, H, W, 3) BGR
+    
+    Returns:
+        (HSV图 (B, H, W, 3) uint8, 归一化HS直方图 (B, H_BINS*S_BINS))
+    """
+    import cv2
+    
+    hsv = np.stack([cv2.cvtColor(frame, cv2.COLOR_BGR2HSV) for frame in frames])
+    hist = np.stack([
+        cv2.calcHist([frame], [0, 1], None, [H_BINS, S_BINS], [0, 180, 0, 256]).ravel()
+        for frame in hsv
+    ])
+    return hsv, hist / (hsv.shape[1] * hsv.shape[2])
+
+
+def pairwise_scores(
+    hsv: np.ndarray,
+    hist: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    相邻帧的差异分数（第0帧为上一批的最后一帧）
+    
+    Returns:
+        (HSV三通道平均差的均值（0~255，同ContentDetector）, HS直方图L1距离（0~1）)
+    """
+    import cv2
+    
+    # uint8 上直接取绝对差，避免整批转成有符号类型
+    flat = hsv.reshape(len(hsv), -1)
+    diff = cv2.absdiff(flat[1:], flat[:-1])
+    content = diff.sum(axis=1, dtype=np.uint64) / flat.shape[1]
+    hist_distance = 0.5 * np.abs(np.diff(hist, axis=0)).sum(axis=1)
+    return content, hist_distance
+
+
+def _detect_cuts_opencv(
+    video_path: str,
+    threshold: float,
+    hist_threshold: float,
+    motion_ratio: float,
+    sample_rate: int,
+    decode_width: int
+) -> Tuple[float, List[int], int]:
+    """OpenCV后端：返回 (帧率, 候选切点, 总帧数)"""
+    import cv2
+    
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise VideoProcessingError(f"无法打开视频: {video_path}")
+    
+    try:
+        video_fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        if video_fps <= 0:
+            raise VideoProcessingError("无法获取视频帧率")
+        
+        candidates: List[int] = []
+        batch: List[np.ndarray] = []
+        batch_frames: List[int] = []
+        prev: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        recent = deque(maxlen=MOTION_WINDOW)
+        step = None
+        
+        def flush():
+            nonlocal prev
+            hsv, hist = frame_features(np.stack(batch))
+            if prev is not None:
+                hsv = np.concatenate([prev[0], hsv])
+                hist = np.concatenate([prev[1], hist])
+                numbers = batch_frames
+            else:
+                numbers = batch_frames[1:]
+            content, hist_distance = pairwise_scores(hsv, hist)
+            for frame_num, score, distance in zip(numbers, content, hist_distance):
+                if distance >= hist_threshold:
+                    candidates.append(frame_num)
+                elif score >= threshold:
+                    if sample_rate == 1 or not recent or score >= motion_ratio * float(np.median(recent)):
+                        candidates.append(frame_num)
+                recent.append(score)
+            prev = (hsv[-1:], hist[-1:])
+            batch.clear()
+            batch_frames.clear()
+        
+        frame_num = 0
+        while cap.grab():
+            # 非采样帧只grab，不做颜色转换和拷贝
+            if frame_num % sample_rate == 0:
+                ok, frame = cap.retrieve()
+                if ok:
+                    if step is None:
+                        step = max(1, frame.shape[1] // decode_width)
+                    # 拷贝出抽取后的小图，不持有整帧
+                    batch.append(np.ascontiguousarray(frame[::step, ::step]))
+                    batch_frames.append(frame_num)
+                    if len(batch) >= BATCH_SIZE:
+                        flush()
+            frame_num += 1
+        
+        if batch:
+            flush()
+        
+        if frame_num == 0:
+            raise VideoProcessingError("无法读取视频帧")
+        
+        return video_fps, candidates, frame_num
+    finally:
+        cap.release()
+
+
+def _probe(video_path: str) -> Tuple[float, int]:
+    import cv2
+    
+    cap = cv2.VideoCapture(video_path)
+    try:
+        if not cap.isOpened():
+            raise VideoProcessingError(f"无法打开视频: {video_path}")
+        video_fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    finally:
+        cap.release()
+    if video_fps <= 0 or frame_count <= 0:
+        raise VideoProcessingError("无法获取视频帧率或帧数")
+    return video_fps, frame_count
+
+
+def _detect_cut_times_ffmpeg(video_path: str, scene_threshold: float, decode_width: int) -> List[float]:
+    """ffmpeg后端：在缩小的画面上运行 select=scene 滤镜，返回切点时间（秒）"""
+    cmd = [
+        settings.ffmpeg_bin,
+        "-hide_banner", "-nostats",
+        "-an", "-sn", "-dn",
+        "-i", video_path,
+        "-vf", f"scale={decode_width}:-2,select='gt(scene,{scene_threshold})',showinfo",
+        "-f", "null", "-"
+    ]
+    try:
+        proc = subprocess.run(
+            cmd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            timeout=settings.ffmpeg_timeout
+        )
+    except FileNotFoundError:
+        raise VideoProcessingError(f"命令不存在: {settings.ffmpeg_bin}")
+    except subprocess.TimeoutExpired:
+        raise VideoProcessingError(f"ffmpeg场景检测超时（{settings.ffmpeg_timeout}秒）")
+    
+    stderr = proc.stderr.decode("utf-8", errors="replace")
+    if proc.returncode != 0:
+        raise VideoProcessingError(f"ffmpeg场景检测失败: {stderr[-500:]}")
+    
+    return [
+        float(match.group(1))
+        for line in stderr.splitlines() if "showinfo" in line
+        for match in [_PTS_TIME_RE.search(line)] if match
+    ]
+
+
+def _save_scene_keyframes(video_path: str, segments: List[Dict[str, Any]], keyframes_dir: Path):
+    """按场景中点定位导出关键帧（命名同 detect_scenes：001-keyframe.jpg）"""
+    import cv2
+    
+    keyframes_dir.mkdir(parents=True, exist_ok=True)
+    cap = cv2.VideoCapture(video_path)
+    try:
+        for i, seg in enumerate(segments):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, (seg["start_frame"] + seg["end_frame"]) // 2)
+            ok, frame = cap.read()
+            if ok:
+                cv2.imwrite(
+                    str(keyframes_dir / f"{i + 1:03d}-keyframe.jpg"),
+                    frame,
+                    [cv2.IMWRITE_JPEG_QUALITY, 95]
+                )
+    finally:
+        cap.release()
+    logger.info(f"场景关键帧已保存到: {keyframes_dir}")
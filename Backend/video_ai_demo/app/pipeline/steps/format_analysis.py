@@ -75,8 +75,7 @@ async def generate_formatted_analysis(segments: List[Dict[str, Any]], job_id: st
     try:
         # 调用LLM API
         logger.info(f"开始为Job {job_id} 生成格式化分析报告")
-        messages = [{"role": "user", "content": prompt}]
-        response_text = await llm_client._call_api(messages, image_urls=[])
+        response_text = await llm_client._call_api([], prompt)
         
         # 解析JSON响应
         llm_result = llm_client._extract_json_from_text(response_text)
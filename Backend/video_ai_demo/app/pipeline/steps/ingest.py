@@ -1,13 +1,16 @@
 """视频摄取步骤"""
-import httpx
-import subprocess
 import json
+import shutil
 from pathlib import Path
 from typing import Dict, Any, Optional
 
 from ...core.errors import VideoProcessingError
 from ...core.config import settings
 from ...core.logging import logger
+from ...integrations.downloader import VideoDownloader, get_downloader
+from ..asset_store import asset_store, file_sha256
+from ..executors import run_blocking_io, run_subprocess
+from ..materialize import materialize
 
 
 async def ingest_video(
@@ -22,6 +25,7 @@ async def ingest_video(
     Returns:
         {
             "local_path": str,
+            "content_hash": str,  # 视频内容SHA-256
             "duration_ms": float,
             "width": int,
             "height": int,
@@ -37,52 +41,61 @@ async def ingest_video(
     if source_type == "url":
         await _download_video(source_url, local_path)
     elif source_type == "file":
-        _copy_video(source_path, local_path)
+        await run_blocking_io(_copy_video, source_path, local_path)
     else:
         raise VideoProcessingError(f"不支持的source_type: {source_type}")
     
+    # 内容哈希：相同视频（无论来源）共享资源仓库中的探测信息和派生产物
+    content_hash = await run_blocking_io(file_sha256, str(local_path))
+    
     # 获取视频元数据
-    metadata = _probe_video(local_path)
+    metadata = asset_store.load_probe(content_hash) if settings.asset_store_enabled else None
+    if metadata is None:
+        metadata = await _probe_video(local_path)
+        if settings.asset_store_enabled:
+            asset_store.save_probe(content_hash, metadata)
     
     return {
         "local_path": str(local_path),
+        "content_hash": content_hash,
         **metadata
     }
 
 
 async def _download_video(url: str, output_path: Path):
-    """下载视频"""
+    """下载视频（启用下载缓存时同一URL只下载一次，Job目录中引用缓存文件）"""
     logger.info(f"下载视频: {url}")
     
     try:
-        async with httpx.AsyncClient(timeout=300.0) as client:
-            async with client.stream("GET", url) as response:
-                response.raise_for_status()
-                
-                with open(output_path, "wb") as f:
-                    async for chunk in response.aiter_bytes(chunk_size=8192):
-                        f.write(chunk)
+        if settings.download_cache_enabled:
+            cached_path = await get_downloader().fetch(url)
+            # 缓存文件可能被淘汰，Job输入不能是指向缓存的软链接
+            await run_blocking_io(materialize, cached_path, output_path, durable=True)
+        else:
+            download_dir = output_path.parent / ".download"
+            downloaded = await VideoDownloader(download_dir, fresh_seconds=0).fetch(url)
+            await run_blocking_io(shutil.move, str(downloaded), str(output_path))
+            await run_blocking_io(shutil.rmtree, download_dir, True)
         
         logger.info(f"视频下载完成: {output_path}")
     
+    except VideoProcessingError:
+        raise
     except Exception as e:
         raise VideoProcessingError(f"视频下载失败: {str(e)}")
 
 
 def _copy_video(source_path: str, output_path: Path):
-    """复制本地视频"""
-    import shutil
-    
-    logger.info(f"复制视频: {source_path} -> {output_path}")
-    
+    """把本地视频放入Job目录（优先reflink/硬链接，不复制数据）"""
     source = Path(source_path)
     if not source.exists():
         raise VideoProcessingError(f"源视频不存在: {source_path}")
     
-    shutil.copy2(source, output_path)
+    method = materialize(source, output_path)
+    logger.info(f"引入视频({method}): {source_path} -> {output_path}")
 
 
-def _probe_video(video_path: Path) -> Dict[str, Any]:
+async def _probe_video(video_path: Path) -> Dict[str, Any]:
     """探测视频元数据（使用ffprobe）"""
     logger.info(f"探测视频元数据: {video_path}")
     
@@ -95,9 +108,12 @@ def _probe_video(video_path: Path) -> Dict[str, Any]:
         str(video_path)
     ]
     
+    returncode, stdout, stderr = await run_subprocess(cmd)
+    if returncode != 0:
+        raise VideoProcessingError(f"ffprobe执行失败: {stderr}")
+    
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        probe_data = json.loads(result.stdout)
+        probe_data = json.loads(stdout)
         
         # 提取视频流信息
         video_stream = None
@@ -132,8 +148,6 @@ def _probe_video(video_path: Path) -> Dict[str, Any]:
             "codec": codec
         }
     
-    except subprocess.CalledProcessError as e:
-        raise VideoProcessingError(f"ffprobe执行失败: {e.stderr}")
     except Exception as e:
         raise VideoProcessingError(f"视频元数据提取失败: {str(e)}")
 
@@ -0,0 +1,304 @@
+"""单次解码媒体处理步骤 - 一次读取视频，同时完成场景检测、抽帧和场景关键帧导出"""
+import json
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from ...core.config import settings
+from ...core.errors import VideoProcessingError
+from ...core.logging import logger
+from ..adaptive_sampling import (
+    change_score,
+    prune_candidates,
+    resolve_mode,
+    select_adaptive_frames,
+    thumbnail,
+)
+from ..frame_hash import dhash_image, format_hash
+from ..frame_index import FrameIndex
+from ..materialize import materialize
+
+
+def run_media_pass(
+    video_path: str,
+    output_dir: Path,
+    frames_root: Path,
+    fps: float = 2.0,
+    max_frames: int = 240,
+    threshold: float = 27.0,
+    min_scene_len: int = 15,
+    max_scene_keyframes: int = 50,
+    sampling_mode: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    单次解码：同一帧流同时喂给场景检测器、抽帧采样和场景关键帧导出
+    
+    取代 detect_scenes + save_images + extract_frames 三次独立解码。
+    场景检测使用与 detect_scenes 相同的 ContentDetector 和降采样策略，
+    因此切分结果一致。
+    
+    adaptive 模式下先按 fps×adaptive_oversample 覆盖整段视频写出候选帧，并在每个
+    检测到切点的帧额外取一帧；解码结束后按场景边界和变化分数选出不超过 max_frames 帧，
+    删除其余候选帧。
+    
+    Args:
+        video_path: 视频路径
+        output_dir: 资源输出目录（scene_keyframes 写在这里）
+        frames_root: 抽帧输出根目录（frames/ 与 frames_index.json 写在这里）
+        fps: 抽帧率
+        max_frames: 最大抽帧数
+        threshold: 场景检测阈值
+        min_scene_len: 最小场景长度（帧数）
+        max_scene_keyframes: 最多导出的场景关键帧数量
+        sampling_mode: fixed / adaptive，默认取 settings.frame_sampling_mode
+    
+    Returns:
+        {
+            "segments": 与 detect_scenes 相同格式的场景列表,
+            "frames_dir": str,
+            "frames_index": FrameIndex[{"frame_id": str, "ts_ms": float, "path": str, "dhash": str}],
+            "total_frames": int,
+            "scene_keyframes": List[str]
+        }
+    """
+    import cv2
+    from scenedetect.detectors import ContentDetector
+    from scenedetect.scene_manager import compute_downscale_factor
+    
+    adaptive = resolve_mode(sampling_mode) == "adaptive"
+    
+    logger.info(
+        f"开始单次解码媒体处理: fps={fps}, max_frames={max_frames}, "
+        f"threshold={threshold}, min_scene_len={min_scene_len}, "
+        f"sampling={'adaptive' if adaptive else 'fixed'}"
+    )
+    
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise VideoProcessingError(f"无法打开视频: {video_path}")
+    
+    # JPEG编码放到写线程，与解码重叠（cv2编码时释放GIL）
+    writer = ThreadPoolExecutor(max_workers=2, thread_name_prefix="media_pass_writer")
+    pending_writes: Dict[str, Future] = {}
+    
+    try:
+        video_fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        if video_fps <= 0:
+            raise VideoProcessingError("无法获取视频帧率")
+        
+        frame_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        downscale_factor = compute_downscale_factor(frame_width) if frame_width > 0 else 1
+        
+        frames_dir = frames_root / "frames"
+        frames_dir.mkdir(parents=True, exist_ok=True)
+        keyframes_dir = output_dir / "scene_keyframes"
+        keyframes_dir.mkdir(parents=True, exist_ok=True)
+        
+        detector = ContentDetector(threshold=threshold, min_scene_len=min_scene_len)
+        
+        sample_interval = video_fps / fps
+        max_samples = max_frames
+        if adaptive:
+            # 候选帧覆盖整段视频：数量超出 max_frames×oversample 时拉大间隔
+            oversample = max(1, settings.adaptive_oversample)
+            max_samples = max_frames * oversample
+            sample_interval /= oversample
+            frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0
+            if frame_count > 0:
+                sample_interval = max(sample_interval, frame_count / max_samples)
+        next_sample_frame = 0.0
+        frames_index: List[Dict[str, Any]] = []
+        change_scores: List[float] = []
+        prev_thumb = None
+        keyframe_sources: set = set()
+        
+        cuts: List[int] = []
+        scene_keyframes: List[str] = []
+        scene_start = 0
+        scene_first_frame = None
+        
+        frame_num = 0
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            
+            if frame_num == 0:
+                scene_first_frame = frame
+            
+            # 场景检测（与SceneManager相同的降采样）
+            detect_frame = frame
+            if downscale_factor > 1:
+                detect_frame = cv2.resize(
+                    frame,
+                    (round(frame.shape[1] / downscale_factor), round(frame.shape[0] / downscale_factor)),
+                    interpolation=cv2.INTER_LINEAR
+                )
+            
+            cut_detected = False
+            for cut in detector.process_frame(frame_num, detect_frame):
+                cuts.append(cut)
+                cut_detected = adaptive
+                # 上一个场景结束，导出其关键帧
+                if len(scene_keyframes) < max_scene_keyframes:
+                    scene_keyframes.append(_export_scene_keyframe(
+                        keyframes_dir,
+                        len(cuts),
+                        scene_start,
+                        cut,
+                        frames_index,
+                        scene_first_frame,
+                        pending_writes,
+                        keyframe_sources
+                    ))
+                scene_start = cut
+                scene_first_frame = frame
+            
+            # 按fps采样抽帧（自适应模式下切点帧也作为候选）
+            sample_due = frame_num + 1e-6 >= next_sample_frame
+            if len(frames_index) < max_samples and (sample_due or cut_detected):
+                frame_path = frames_dir / f"frame_{len(frames_index) + 1:05d}.jpg"
+                pending_writes[str(frame_path)] = writer.submit(
+                    cv2.imwrite, str(frame_path), frame, [cv2.IMWRITE_JPEG_QUALITY, 95]
+                )
+                frames_index.append({
+                    "frame_id": f"f_{len(frames_index):05d}",
+                    "ts_ms": frame_num / video_fps * 1000,
+                    "path": str(frame_path),
+                    "frame_num": frame_num,
+                    # 感知哈希在内存中的降采样帧上计算，供LLM采样去重
+                    "dhash": format_hash(dhash_image(detect_frame))
+                })
+                if adaptive:
+                    thumb = thumbnail(detect_frame)
+                    change_scores.append(change_score(prev_thumb, thumb))
+                    prev_thumb = thumb
+            if sample_due:
+                next_sample_frame += sample_interval
+            
+            frame_num += 1
+        
+        if frame_num == 0:
+            raise VideoProcessingError("无法读取视频帧")
+        
+        cuts += detector.post_process(frame_num)
+        total_frames = frame_num
+        
+        # 最后一个场景
+        if len(scene_keyframes) < max_scene_keyframes:
+            scene_keyframes.append(_export_scene_keyframe(
+                keyframes_dir,
+                len(cuts) + 1,
+                scene_start,
+                total_frames,
+                frames_index,
+                scene_first_frame,
+                pending_writes,
+                keyframe_sources
+            ))
+        
+        for future in pending_writes.values():
+            future.result()
+    finally:
+        cap.release()
+        writer.shutdown(wait=True)
+    
+    if not cuts:
+        logger.warning("未检测到场景切换，使用整个视频作为单一场景")
+    
+    segments = _build_segments(cuts, total_frames, video_fps)
+    
+    if adaptive:
+        candidate_count = len(frames_index)
+        selected = select_adaptive_frames(
+            [f["ts_ms"] for f in frames_index],
+            change_scores,
+            [(s["start_ms"], s["end_ms"]) for s in segments],
+            max_frames
+        )
+        # 场景关键帧可能以软链接引用候选帧，这些文件保留
+        frames_index = prune_candidates(frames_index, selected, keyframe_sources)
+        logger.info(f"自适应抽帧: 候选{candidate_count}帧，选中{len(frames_index)}帧")
+    
+    # 保存帧索引
+    index_file = frames_root / "frames_index.json"
+    with open(index_file, "w", encoding="utf-8") as f:
+        json.dump(frames_index, f, ensure_ascii=False, indent=2)
+    
+    logger.info(
+        f"单次解码完成: 解码{total_frames}帧，{len(segments)}个场景，"
+        f"抽帧{len(frames_index)}帧，场景关键帧{len(scene_keyframes)}张"
+    )
+    
+    return {
+        "segments": segments,
+        "frames_dir": str(frames_dir),
+        "frames_index": FrameIndex(frames_index),
+        "total_frames": len(frames_index),
+        "scene_keyframes": scene_keyframes
+    }
+
+
+def _build_segments(
+    cuts: List[int],
+    total_frames: int,
+    video_fps: float
+) -> List[Dict[str, Any]]:
+    """根据切点构建场景列表（格式同 detect_scenes）"""
+    boundaries = [0] + sorted(set(cuts)) + [total_frames]
+    
+    segments = []
+    for i in range(len(boundaries) - 1):
+        start_frame = boundaries[i]
+        end_frame = boundaries[i + 1]
+        
+        start_ms = (start_frame / video_fps) * 1000
+        end_ms = (end_frame / video_fps) * 1000
+        
+        segments.append({
+            "segment_id": f"seg_{i+1:03d}",
+            "start_ms": start_ms,
+            "end_ms": end_ms,
+            "start_frame": start_frame,
+            "end_frame": end_frame,
+            "duration_ms": end_ms - start_ms
+        })
+    
+    return segments
+
+
+def _export_scene_keyframe(
+    keyframes_dir: Path,
+    scene_number: int,
+    start_frame: int,
+    end_frame: int,
+    frames_index: List[Dict[str, Any]],
+    first_frame: Optional[Any],
+    pending_writes: Dict[str, Future],
+    used_paths: Optional[set] = None
+) -> str:
+    """
+    导出场景关键帧：优先复用最接近场景中点的已抽帧（无需再次解码），
+    场景内没有抽帧时写出场景首帧
+    """
+    import cv2
+    
+    dst_path = keyframes_dir / f"{scene_number:03d}-keyframe.jpg"
+    mid_frame = (start_frame + end_frame) / 2
+    
+    candidates = [
+        f for f in frames_index
+        if start_frame <= f["frame_num"] < end_frame
+    ]
+    
+    if candidates:
+        closest = min(candidates, key=lambda f: abs(f["frame_num"] - mid_frame))
+        # 等待该帧写盘完成
+        pending_writes[closest["path"]].result()
+        materialize(closest["path"], dst_path)
+        if used_paths is not None:
+            used_paths.add(closest["path"])
+    elif first_frame is not None:
+        cv2.imwrite(str(dst_path), first_frame, [cv2.IMWRITE_JPEG_QUALITY, 95])
+    
+    return str(dst_path)
@@ -34,7 +34,7 @@ async def decompose_with_mm_llm(
     
     # 准备帧输入
     frame_inputs = [
-        FrameInput(ts_ms=frame["ts_ms"], image_path=frame["path"])
+        FrameInput(ts_ms=frame["ts_ms"], image_path=frame["path"], dhash=frame.get("dhash"))
         for frame in frames_index
     ]
     
@@ -47,7 +47,13 @@ async def decompose_with_mm_llm(
     prompt_config = {
         "enabled_modules": llm_config.get("enabled_modules", [
             "camera_motion", "lighting", "color_grading"
-        ])
+        ]),
+        # 联系表 / 多片段打包
+        **{
+            key: llm_config[key]
+            for key in ("contact_sheet", "batch_segments", "batch_max_segment_ms")
+            if key in llm_config
+        }
     }
     
     # 调用拆解
@@ -0,0 +1,191 @@
+"""分段并行场景检测 - 长视频按时间切成若干段，在进程池中同时运行ContentDetector后拼接切点"""
+import asyncio
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ...core.config import settings
+from ...core.errors import VideoProcessingError
+from ...core.logging import logger
+from ..executors import run_blocking_io, run_cpu_bound
+from .fast_scene_detect import _probe, _save_scene_keyframes, apply_min_scene_len
+from .media_pass import _build_segments
+from .scene_detect import detect_scenes
+
+
+# 重叠区内两段各自检测到的切点相差不超过该帧数时视为同一个
+MERGE_TOLERANCE = 1
+
+
+def plan_chunks(
+    total_frames: int,
+    chunks: int,
+    min_chunk_frames: int
+) -> List[Tuple[int, Optional[int]]]:
+    """
+    把 [0, total_frames) 均分为不超过 chunks 段，每段至少 min_chunk_frames 帧
+    
+    Returns:
+        [(起始帧, 结束帧)]，最后一段结束帧为 None（读到文件末尾，不依赖容器记录的帧数）
+    """
+    count = max(1, min(chunks, total_frames // max(1, min_chunk_frames)))
+    bounds = [total_frames * i // count for i in range(count)]
+    return [(start, end) for start, end in zip(bounds, bounds[1:] + [None])]
+
+
+def detect_chunk_candidates(
+    video_path: str,
+    start_frame: int,
+    end_frame: Optional[int],
+    threshold: float = 27.0,
+    overlap: int = 0
+) -> Dict[str, Any]:
+    """
+    对一段帧运行 ContentDetector，返回所有超过阈值的候选切点（进程池任务）
+    
+    从 start_frame - overlap 开始解码，第一帧只作为比较基准。min_scene_len 在这里
+    不生效（设为0），由 merge_chunk_candidates 在拼接后统一应用，跨段时与整段检测一致。
+    降采样方式与 SceneManager 相同，因此帧差分数与 detect_scenes 逐帧相同。
+    
+    Returns:
+        {"start_frame": int, "end_frame": 实际读到的结束帧, "candidates": List[int]}
+    """
+    import cv2
+    from scenedetect.detectors import ContentDetector
+    from scenedetect.scene_manager import compute_downscale_factor
+    
+    decode_start = max(0, start_frame - overlap)
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise VideoProcessingError(f"无法打开视频: {video_path}")
+    
+    try:
+        frame_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        downscale_factor = compute_downscale_factor(frame_width) if frame_width > 0 else 1
+        
+        if decode_start > 0:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, decode_start)
+            position = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+            if position != decode_start:
+                raise VideoProcessingError(f"视频定位失败: 目标第{decode_start}帧，实际第{position}帧")
+        
+        detector = ContentDetector(threshold=threshold, min_scene_len=0)
+        candidates: List[int] = []
+        frame_num = decode_start
+        while end_frame is None or frame_num < end_frame:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            if downscale_factor > 1:
+                frame = cv2.resize(
+                    frame,
+                    (round(frame.shape[1] / downscale_factor), round(frame.shape[0] / downscale_factor)),
+                    interpolation=cv2.INTER_LINEAR
+                )
+            candidates.extend(detector.process_frame(frame_num, frame))
+            frame_num += 1
+    finally:
+        cap.release()
+    
+    # 段的第一帧没有上一帧可比，分数为0，不会成为候选
+    return {
+        "start_frame": start_frame,
+        "end_frame": frame_num,
+        "candidates": candidates
+    }
+
+
+def merge_chunk_candidates(
+    chunk_results: Sequence[Dict[str, Any]],
+    min_scene_len: int
+) -> Tuple[List[int], int]:
+    """
+    按段顺序拼接候选切点并应用 min_scene_len
+    
+    重叠区 [start_frame - overlap, start_frame) 被前后两段都检测过：前一段连续解码，
+    以它的结果为准，后一段在重叠区内与之相差不超过 MERGE_TOLERANCE 帧的切点丢弃。
+    
+    Returns:
+        (切点列表, 总帧数)
+    """
+    merged: List[int] = []
+    seen: set = set()
+    for result in sorted(chunk_results, key=lambda r: r["start_frame"]):
+        for frame in result["candidates"]:
+            duplicate = any(
+                frame + delta in seen for delta in range(-MERGE_TOLERANCE, MERGE_TOLERANCE + 1)
+            )
+            if frame < result["start_frame"] and duplicate:
+                continue
+            merged.append(frame)
+            seen.add(frame)
+    
+    total_frames = max(result["end_frame"] for result in chunk_results)
+    return apply_min_scene_len(merged, min_scene_len, total_frames), total_frames
+
+
+async def detect_scenes_parallel(
+    video_path: str,
+    output_dir: Path,
+    threshold: float = 27.0,
+    min_scene_len: int = 15,
+    chunks: Optional[int] = None,
+    max_scene_keyframes: int = 50
+) -> List[Dict[str, Any]]:
+    """
+    分段并行的 detect_scenes，返回格式与切分结果与之相同
+    
+    视频按帧数均分为 chunks 段（默认 settings.scene_parallel_chunks，0 表示与
+    cpu_pool_workers 相同），每段至少 scene_chunk_min_seconds 秒；只有一段时直接
+    调用 detect_scenes。各段在进程池中解码检测，前后段重叠
+    scene_chunk_overlap_frames 帧，拼接后统一应用 min_scene_len。
+    
+    Args:
+        video_path: 视频路径
+        output_dir: 输出目录（场景关键帧写在 scene_keyframes/）
+        threshold: 检测阈值（同 detect_scenes）
+        min_scene_len: 最小场景长度（帧数）
+        chunks: 分段数
+        max_scene_keyframes: 场景数不超过该值时导出场景关键帧
+    """
+    chunks = settings.scene_parallel_chunks if chunks is None else chunks
+    if chunks <= 0:
+        chunks = max(1, settings.cpu_pool_workers)
+    
+    video_fps, frame_count = await run_blocking_io(_probe, video_path)
+    ranges = plan_chunks(
+        frame_count,
+        chunks,
+        int(settings.scene_chunk_min_seconds * video_fps)
+    )
+    if len(ranges) == 1:
+        return await run_cpu_bound(
+            detect_scenes, video_path, output_dir, threshold=threshold, min_scene_len=min_scene_len
+        )
+    
+    overlap = max(1, settings.scene_chunk_overlap_frames)
+    logger.info(
+        f"开始分段并行场景检测: {len(ranges)}段, threshold={threshold}, "
+        f"min_scene_len={min_scene_len}, overlap={overlap}"
+    )
+    
+    chunk_results = await asyncio.gather(*[
+        run_cpu_bound(detect_chunk_candidates, video_path, start, end, threshold, overlap)
+        for start, end in ranges
+    ])
+    
+    cuts, total_frames = merge_chunk_candidates(chunk_results, min_scene_len)
+    if not cuts:
+        logger.warning("未检测到场景切换，使用整个视频作为单一场景")
+    
+    segments = _build_segments(cuts, total_frames, video_fps)
+    logger.info(f"分段并行场景检测完成，共检测到{len(segments)}个场景")
+    
+    if 0 < len(segments) < max_scene_keyframes:
+        try:
+            await run_cpu_bound(
+                _save_scene_keyframes, video_path, segments, output_dir / "scene_keyframes"
+            )
+        except Exception as e:
+            logger.warning(f"保存场景关键帧失败: {str(e)}")
+    
+    return segments
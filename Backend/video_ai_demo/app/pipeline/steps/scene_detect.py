@@ -1,14 +1,23 @@
 """CV场景检测步骤 - 使用传统CV算法进行镜头切分"""
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from scenedetect import open_video, SceneManager, split_video_ffmpeg
 from scenedetect.detectors import ContentDetector, ThresholdDetector
 from scenedetect.scene_manager import save_images
 
+from ...core.config import settings
 from ...core.errors import VideoProcessingError
 from ...core.logging import logger
 
 
+# 光流算法：farneback 与 DIS 的两个预设
+OPTICAL_FLOW_METHODS = ("farneback", "dis_ultrafast", "dis_fast")
+OPTICAL_FLOW_PRESETS = {
+    "dis_ultrafast": "DISOPTICAL_FLOW_PRESET_ULTRAFAST",
+    "dis_fast": "DISOPTICAL_FLOW_PRESET_FAST",
+}
+
+
 def detect_scenes(
     video_path: str,
     output_dir: Path,
@@ -109,7 +118,7 @@ def detect_scenes(
                 logger.warning(f"保存场景关键帧失败: {str(e)}")
         
         return segments
-        
+    
     except Exception as e:
         raise VideoProcessingError(f"CV场景检测失败: {str(e)}")
 
@@ -117,75 +126,108 @@ def detect_scenes(
 def detect_scenes_with_optical_flow(
     video_path: str,
     output_dir: Path,
-    flow_threshold: float = 30.0
+    flow_threshold: float = 30.0,
+    method: Optional[str] = None,
+    decode_width: Optional[int] = None,
+    sample_rate: Optional[int] = None,
+    grid_step: Optional[int] = None
 ) -> List[Dict[str, Any]]:
     """
-    使用光流法检测场景切换（更精确但更慢）
+    使用光流法检测场景切换：相邻帧平均光流幅度超过阈值的帧视为切点
+    
+    画面先缩到 decode_width 宽再计算光流，幅度乘回原始分辨率的像素单位，因此
+    flow_threshold 含义不变；平均幅度在光流场上按 grid_step 间隔取点计算。
+    
+    sample_rate>1 时先只算每 sample_rate 帧一次的跨帧光流：跨帧幅度未超过阈值时，
+    区间内逐帧光流也不会超过（运动随帧数累积，画面突变时幅度同样很大），直接跳过；
+    超过阈值时再用缓存的区间内各帧逐对计算，切点仍精确到帧。
     
     Args:
         video_path: 视频路径
         output_dir: 输出目录
-        flow_threshold: 光流阈值
+        flow_threshold: 光流阈值（原始分辨率下的平均像素位移）
+        method: farneback / dis_ultrafast / dis_fast，默认取 settings.optical_flow_method
+        decode_width: 计算光流的画面宽度，默认取 settings.optical_flow_decode_width（0表示原始分辨率）
+        sample_rate: 每N帧先做一次跨帧检测，默认取 settings.optical_flow_sample_rate
+        grid_step: 光流幅度统计的取点间隔，默认取 settings.optical_flow_grid_step
     
     Returns:
         场景列表
     """
     import cv2
-    import numpy as np
     
-    logger.info(f"开始光流法场景检测: threshold={flow_threshold}")
+    method = method or settings.optical_flow_method
+    decode_width = settings.optical_flow_decode_width if decode_width is None else decode_width
+    sample_rate = max(1, sample_rate or settings.optical_flow_sample_rate)
+    grid_step = max(1, grid_step or settings.optical_flow_grid_step)
+    
+    logger.info(
+        f"开始光流法场景检测: threshold={flow_threshold}, method={method}, "
+        f"decode_width={decode_width}, sample_rate={sample_rate}, grid_step={grid_step}"
+    )
     
     try:
+        flow_magnitude = _optical_flow_magnitude(method, grid_step)
+        
         cap = cv2.VideoCapture(video_path)
         fps = cap.get(cv2.CAP_PROP_FPS)
         total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
         
         # 读取第一帧
-        ret, prev_frame = cap.read()
+        ret, first_frame = cap.read()
         if not ret:
             raise VideoProcessingError("无法读取视频第一帧")
         
-        prev_gray = cv2.cvtColor(prev_frame, cv2.COLOR_BGR2GRAY)
+        width = first_frame.shape[1]
+        small_width = min(width, decode_width) if decode_width > 0 else width
+        scale = width / small_width
+        size = (small_width, max(1, round(first_frame.shape[0] / scale)))
+        
+        def to_gray(frame):
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            if size != (gray.shape[1], gray.shape[0]):
+                gray = cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+            return gray
         
         # 检测场景切换点
         scene_changes = [0]  # 起始帧
-        frame_idx = 1
+        # window[0] 为上一个检测帧，其后为尚未检测的帧
+        window = [to_gray(first_frame)]
+        window_start = 0
+        
+        def check_window():
+            """跨帧光流超过阈值时逐对细查，返回切点"""
+            if len(window) > 2 and flow_magnitude(window[0], window[-1]) * scale <= flow_threshold:
+                return []
+            changes = []
+            for offset in range(1, len(window)):
+                mean_mag = flow_magnitude(window[offset - 1], window[offset]) * scale
+                # 如果光流突变，认为是场景切换
+                if mean_mag > flow_threshold:
+                    changes.append(window_start + offset)
+                    logger.debug(f"检测到场景切换: 帧{window_start + offset}, 光流={mean_mag:.2f}")
+            return changes
         
+        frame_idx = 1
         while True:
             ret, frame = cap.read()
             if not ret:
                 break
             
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            
-            # 计算光流
-            flow = cv2.calcOpticalFlowFarneback(
-                prev_gray, gray, None,
-                pyr_scale=0.5,
-                levels=3,
-                winsize=15,
-                iterations=3,
-                poly_n=5,
-                poly_sigma=1.2,
-                flags=0
-            )
-            
-            # 计算光流幅度
-            mag, _ = cv2.cartToPolar(flow[..., 0], flow[..., 1])
-            mean_mag = np.mean(mag)
-            
-            # 如果光流突变，认为是场景切换
-            if mean_mag > flow_threshold:
-                scene_changes.append(frame_idx)
-                logger.debug(f"检测到场景切换: 帧{frame_idx}, 光流={mean_mag:.2f}")
-            
-            prev_gray = gray
+            window.append(to_gray(frame))
+            if len(window) > sample_rate:
+                scene_changes.extend(check_window())
+                window_start = frame_idx
+                window = window[-1:]
             frame_idx += 1
             
             # 进度提示
             if frame_idx % 100 == 0:
                 logger.debug(f"光流检测进度: {frame_idx}/{total_frames}")
         
+        if len(window) > 1:
+            scene_changes.extend(check_window())
+        
         scene_changes.append(total_frames - 1)  # 结束帧
         cap.release()
         
@@ -209,11 +251,43 @@ def detect_scenes_with_optical_flow(
         
         logger.info(f"光流法检测完成，共检测到{len(segments)}个场景")
         return segments
-        
+    
     except Exception as e:
         raise VideoProcessingError(f"光流法场景检测失败: {str(e)}")
 
 
+def _optical_flow_magnitude(method: str, grid_step: int):
+    """返回 (prev_gray, gray) -> 平均光流幅度（当前分辨率像素）的函数"""
+    import cv2
+    import numpy as np
+    
+    if method == "farneback":
+        def compute(prev_gray, gray):
+            return cv2.calcOpticalFlowFarneback(
+                prev_gray, gray, None,
+                pyr_scale=0.5,
+                levels=3,
+                winsize=15,
+                iterations=3,
+                poly_n=5,
+                poly_sigma=1.2,
+                flags=0
+            )
+    elif method in OPTICAL_FLOW_PRESETS:
+        dis = cv2.DISOpticalFlow_create(getattr(cv2, OPTICAL_FLOW_PRESETS[method]))
+        
+        def compute(prev_gray, gray):
+            return dis.calc(prev_gray, gray, None)
+    else:
+        raise VideoProcessingError(f"未知的光流算法: {method}")
+    
+    def magnitude(prev_gray, gray):
+        flow = compute(prev_gray, gray)[::grid_step, ::grid_step]
+        return float(np.mean(np.hypot(flow[..., 0], flow[..., 1])))
+    
+    return magnitude
+
+
 def detect_scenes_simple(
     video_path: str,
     output_dir: Path,
@@ -301,7 +375,7 @@ def detect_scenes_simple(
         
         logger.info(f"快速场景检测完成，共检测到{len(segments)}个场景")
         return segments
-        
+    
     except Exception as e:
         raise VideoProcessingError(f"快速场景检测失败: {str(e)}")
 
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+场景特征分析的请求合并基准测试
+
+对比：
+  - 每个场景一次请求（默认路径）
+  - 联系表：每个场景的采样帧拼成一张图
+  - 多片段打包：相邻短场景合并为一次请求
+  - 联系表 + 多片段打包
+
+LLM服务用本地模拟接口代替：每次请求固定延迟 + 按图片字节数计算的上传时间，
+回复按提示词中的片段生成。统计请求数、图片字节数（data URL解码后）和总耗时。
+
+用法：
+  python -m benchmarks.bench_llm_batching [视频路径] [--seconds 60] [--latency 0.8]
+未提供视频时生成合成视频（场景时长在1~6秒之间）。
+"""
+import argparse
+import asyncio
+import base64
+import json
+import re
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks.synthetic import make_synthetic_video
+from app.integrations.llm_cache import LLMResponseCache
+from app.integrations.mm_llm_client import MMHLLMClient
+from app.pipeline import orchestrator as orchestrator_module
+from app.pipeline.orchestrator import PipelineOrchestrator
+from app.pipeline.steps.media_pass import run_media_pass
+
+
+CASES = [
+    ("per-segment", {}),
+    ("contact-sheet", {"contact_sheet": True}),
+    ("batched", {"batch_segments": 4}),
+    ("sheet+batched", {"contact_sheet": True, "batch_segments": 4}),
+]
+
+
+def _fake_llm(stats, latency: float, upload_mb_per_s: float):
+    """模拟多模态接口：固定延迟 + 上传耗时，按提示词中的片段回复"""
+    
+    async def handler(request: httpx.Request) -> httpx.Response:
+        content = json.loads(request.content)["messages"][0]["content"]
+        prompt = content[0]["text"]
+        image_bytes = sum(
+            len(base64.b64decode(item["image_url"]["url"].split(",", 1)[1]))
+            for item in content if item["type"] == "image_url"
+        )
+        stats["requests"] += 1
+        stats["images"] += len(content) - 1
+        stats["image_bytes"] += image_bytes
+        
+        await asyncio.sleep(latency + image_bytes / (upload_mb_per_s * 1024 * 1024))
+        
+        feature = {"category": "lighting", "type": "natural", "value": "自然光", "confidence": 0.9}
+        batch_ids = re.findall(r"^- (seg_\d+): ", prompt, re.MULTILINE)
+        reply = {"segments": [{"segment_id": seg_id, "features": [feature]} for seg_id in batch_ids]} \
+            if batch_ids else [feature]
+        return httpx.Response(200, json={
+            "choices": [{"message": {"content": json.dumps(reply, ensure_ascii=False)}}]
+        })
+    
+    return handler
+
+
+def _run_case(name, llm_options, segments, frames_index, work_dir: Path, args) -> dict:
+    stats = {"requests": 0, "images": 0, "image_bytes": 0}
+    http_client = httpx.AsyncClient(
+        transport=httpx.MockTransport(_fake_llm(stats, args.latency, args.upload_mb_per_s))
+    )
+    # 每种方式使用独立的空缓存，避免命中上一轮的回复
+    cache = LLMResponseCache(work_dir / f"llm_cache_{name}.db", max_bytes=256 * 1024 * 1024, ttl_seconds=3600)
+    orchestrator_module.MMHLLMClient = lambda model=None: MMHLLMClient(
+        api_key="bench", http_client=http_client, cache=cache
+    )
+    
+    orchestrator = PipelineOrchestrator(f"bench_{name}", {"mode": "learn"})
+    orchestrator._update_progress = lambda *a: None
+    orchestrator._save_segment = lambda *a: None
+    
+    llm_config = {"max_concurrency": args.concurrency, **llm_options}
+    t0 = time.perf_counter()
+    result = asyncio.run(orchestrator._analyze_cv_segments(segments, frames_index, llm_config))
+    stats["elapsed"] = time.perf_counter() - t0
+    stats["analyzed"] = sum(1 for seg in result["segments"] if seg["features"])
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM请求合并基准")
+    parser.add_argument("video", nargs="?", help="输入视频（默认生成合成视频）")
+    parser.add_argument("--seconds", type=float, default=60.0, help="合成视频时长（秒）")
+    parser.add_argument("--latency", type=float, default=0.8, help="模拟单次请求延迟（秒）")
+    parser.add_argument("--upload-mb-per-s", type=float, default=2.0, help="模拟上传带宽（MB/s）")
+    parser.add_argument("--concurrency", type=int, default=4, help="并发请求数")
+    args = parser.parse_args()
+    
+    work_dir = Path(tempfile.mkdtemp(prefix="bench_llm_batching_"))
+    original_client = orchestrator_module.MMHLLMClient
+    try:
+        if args.video:
+            video_path = Path(args.video)
+        else:
+            pattern = [1.5, 2.0, 1.0, 6.0, 2.5, 1.2, 4.0, 1.8]
+            scene_seconds = []
+            while sum(scene_seconds) < args.seconds:
+                scene_seconds.append(pattern[len(scene_seconds) % len(pattern)])
+            print(f"生成合成视频: 1280x720, {sum(scene_seconds):.0f}秒, {len(scene_seconds)}个场景...")
+            video_path = make_synthetic_video(
+                work_dir / "input.mp4", scene_seconds=scene_seconds, size=(1280, 720)
+            )
+        
+        media = run_media_pass(str(video_path), work_dir / "target", work_dir)
+        segments = media["segments"]
+        print(f"{len(segments)}个场景，{len(media['frames_index'])}帧")
+        print(f"latency={args.latency}s upload={args.upload_mb_per_s}MB/s concurrency={args.concurrency}\n")
+        
+        print(f"{'mode':<16}{'requests':>9}{'images':>8}{'image MB':>10}{'wall(s)':>9}{'analyzed':>10}")
+        for name, llm_options in CASES:
+            r = _run_case(name, llm_options, segments, media["frames_index"], work_dir, args)
+            print(
+                f"{name:<16}{r['requests']:>9}{r['images']:>8}{r['image_bytes'] / 1024 / 1024:>10.2f}"
+                f"{r['elapsed']:>9.2f}{r['analyzed']:>7}/{len(segments)}"
+            )
+    finally:
+        orchestrator_module.MMHLLMClient = original_client
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
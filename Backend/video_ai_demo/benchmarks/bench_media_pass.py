@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+单次解码 vs 三次解码 基准测试
+
+对比：
+  - 旧路径：detect_scenes（含save_images） + extract_frames（ffmpeg）
+  - 新路径：run_media_pass
+
+用法：
+  python -m benchmarks.bench_media_pass [视频路径] [--seconds 600]
+未提供视频时生成合成1080p视频。
+"""
+import argparse
+import asyncio
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import make_synthetic_video
+from app.core.config import settings
+from app.pipeline.steps.scene_detect import detect_scenes
+from app.pipeline.steps.extract_frames import extract_frames
+from app.pipeline.steps.media_pass import run_media_pass
+
+
+def _segments_signature(segments):
+    return [(s["start_frame"], s["end_frame"]) for s in segments]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="单次解码媒体处理基准")
+    parser.add_argument("video", nargs="?", help="输入视频（默认生成合成1080p视频）")
+    parser.add_argument("--seconds", type=float, default=120.0, help="合成视频时长（秒）")
+    parser.add_argument("--fps", type=float, default=2.0)
+    parser.add_argument("--max-frames", type=int, default=240)
+    args = parser.parse_args()
+    
+    work_dir = Path(tempfile.mkdtemp(prefix="bench_media_pass_"))
+    try:
+        if args.video:
+            video_path = Path(args.video)
+        else:
+            scene_count = max(1, int(args.seconds / 4))
+            print(f"生成合成视频: 1920x1080, {args.seconds:.0f}秒, {scene_count}个场景...")
+            video_path = make_synthetic_video(
+                work_dir / "input.mp4",
+                scene_seconds=[4.0] * scene_count
+            )
+        
+        print("=" * 60)
+        print(f"视频: {video_path}")
+        print("=" * 60)
+        
+        # 旧路径
+        legacy_dir = work_dir / "legacy"
+        t0 = time.perf_counter()
+        legacy_segments = detect_scenes(str(video_path), legacy_dir / "target")
+        t_detect = time.perf_counter() - t0
+        
+        t_extract = None
+        if shutil.which(settings.ffmpeg_bin):
+            t0 = time.perf_counter()
+            asyncio.run(extract_frames(str(video_path), legacy_dir, args.fps, args.max_frames))
+            t_extract = time.perf_counter() - t0
+        else:
+            print(f"⚠️  未找到 {settings.ffmpeg_bin}，旧路径只统计场景检测部分")
+        
+        # 新路径
+        single_dir = work_dir / "single"
+        t0 = time.perf_counter()
+        single_result = run_media_pass(
+            str(video_path),
+            single_dir / "target",
+            single_dir,
+            fps=args.fps,
+            max_frames=args.max_frames
+        )
+        t_single = time.perf_counter() - t0
+        
+        legacy_total = t_detect + (t_extract or 0.0)
+        print()
+        print(f"旧路径 detect_scenes+save_images: {t_detect:.2f}s")
+        if t_extract is not None:
+            print(f"旧路径 extract_frames(ffmpeg):    {t_extract:.2f}s")
+        print(f"旧路径 合计:                      {legacy_total:.2f}s")
+        print(f"新路径 run_media_pass:            {t_single:.2f}s")
+        print(f"加速比:                           {legacy_total / t_single:.2f}x")
+        same = _segments_signature(legacy_segments) == _segments_signature(single_result["segments"])
+        print(f"场景切分一致:                     {'✅' if same else '❌'}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+光流法场景检测基准测试
+
+在 pan / zoom / static 三种合成视频上，对比原始设置（原始分辨率、逐帧 Farneback、
+全部像素统计）与缩小画面、跳帧粗查、网格统计及 DIS 光流的各种组合：
+  - 处理速度（视频帧/秒）与加速比
+  - 切点是否与原始设置完全一致
+
+用法：
+  python -m benchmarks.bench_optical_flow [--width 1280] [--threshold 6]
+阈值需落在镜头内运动幅度与切点幅度之间（默认视频上约4.2~7.5），否则各算法的
+判定本身就不可比。
+"""
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import make_synthetic_video
+from app.pipeline.steps.scene_detect import detect_scenes_with_optical_flow
+
+
+REFERENCE = {"method": "farneback", "decode_width": 0, "sample_rate": 1, "grid_step": 1}
+CASES = [
+    ("farneback 320", {"method": "farneback", "decode_width": 320, "sample_rate": 1, "grid_step": 4}),
+    ("farneback 320 k=2", {"method": "farneback", "decode_width": 320, "sample_rate": 2, "grid_step": 4}),
+    ("dis_fast 320", {"method": "dis_fast", "decode_width": 320, "sample_rate": 1, "grid_step": 4}),
+    ("dis_ultrafast 320", {"method": "dis_ultrafast", "decode_width": 320, "sample_rate": 1, "grid_step": 4}),
+    ("dis_ultrafast 320 k=4", {"method": "dis_ultrafast", "decode_width": 320, "sample_rate": 4, "grid_step": 4}),
+]
+
+
+def _cuts(segments):
+    return [s["start_frame"] for s in segments[1:]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="光流法场景检测基准")
+    parser.add_argument("--width", type=int, default=1280, help="合成视频宽度（16:9）")
+    parser.add_argument("--threshold", type=float, default=6.0, help="光流阈值")
+    args = parser.parse_args()
+    
+    work_dir = Path(tempfile.mkdtemp(prefix="bench_optical_flow_"))
+    size = (args.width, args.width * 9 // 16)
+    try:
+        print(f"{'clip':<8}{'settings':<24}{'time(s)':>9}{'fps':>8}{'speedup':>9}{'cuts':>12}{'same':>6}")
+        for motion in ("pan", "zoom", "static"):
+            video_path = str(make_synthetic_video(
+                work_dir / f"{motion}.mp4", scene_seconds=[2.0, 1.5, 2.5], size=size, motion=motion
+            ))
+            
+            t0 = time.perf_counter()
+            reference = detect_scenes_with_optical_flow(
+                video_path, work_dir, flow_threshold=args.threshold, **REFERENCE
+            )
+            t_ref = time.perf_counter() - t0
+            total_frames = reference[-1]["end_frame"] + 1
+            print(f"{motion:<8}{'original':<24}{t_ref:>9.2f}{total_frames / t_ref:>8.1f}{1.0:>8.2f}x"
+                  f"{str(_cuts(reference)):>12}{'-':>6}")
+            
+            for name, params in CASES:
+                t0 = time.perf_counter()
+                segments = detect_scenes_with_optical_flow(
+                    video_path, work_dir, flow_threshold=args.threshold, **params
+                )
+                elapsed = time.perf_counter() - t0
+                same = "yes" if _cuts(segments) == _cuts(reference) else "NO"
+                print(f"{motion:<8}{name:<24}{elapsed:>9.2f}{total_frames / elapsed:>8.1f}"
+                      f"{t_ref / elapsed:>8.2f}x{str(_cuts(segments)):>12}{same:>6}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
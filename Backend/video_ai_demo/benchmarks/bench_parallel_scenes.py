@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+分段并行场景检测基准测试
+
+对比 detect_scenes（单进程整段检测）与 detect_scenes_parallel 在不同分段数下的
+耗时；每种分段数使用同样大小的进程池，并检查切分结果与 detect_scenes 一致。
+
+用法：
+  python -m benchmarks.bench_parallel_scenes [视频路径] [--seconds 600] [--chunks 2 4 8]
+未提供视频时生成合成1080p视频。
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import make_synthetic_video
+from app.core.config import settings
+from app.pipeline.executors import init_process_pool, shutdown_process_pool
+from app.pipeline.steps.parallel_scene_detect import detect_scenes_parallel
+from app.pipeline.steps.scene_detect import detect_scenes
+
+
+def _segments_signature(segments):
+    return [(s["start_frame"], s["end_frame"]) for s in segments]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="分段并行场景检测基准")
+    parser.add_argument("video", nargs="?", help="输入视频（默认生成合成1080p视频）")
+    parser.add_argument("--seconds", type=float, default=600.0, help="合成视频时长（秒）")
+    parser.add_argument("--chunks", type=int, nargs="+", default=[2, 4, 8], help="分段数")
+    args = parser.parse_args()
+    
+    work_dir = Path(tempfile.mkdtemp(prefix="bench_parallel_scenes_"))
+    try:
+        if args.video:
+            video_path = Path(args.video)
+        else:
+            pattern = [4.0, 2.5, 6.0, 1.5, 3.0]
+            scene_seconds = []
+            while sum(scene_seconds) < args.seconds:
+                scene_seconds.append(pattern[len(scene_seconds) % len(pattern)])
+            print(f"生成合成视频: 1920x1080, {sum(scene_seconds):.0f}秒, {len(scene_seconds)}个场景...")
+            video_path = make_synthetic_video(work_dir / "input.mp4", scene_seconds=scene_seconds)
+        
+        t0 = time.perf_counter()
+        reference = detect_scenes(str(video_path), work_dir / "reference")
+        t_ref = time.perf_counter() - t0
+        print(f"\n{reference[-1]['end_frame']}帧，{len(reference)}个场景，CPU核数 {os.cpu_count()}\n")
+        print(f"{'chunks':<10}{'time(s)':>9}{'speedup':>9}{'identical':>11}")
+        print(f"{'1 (serial)':<10}{t_ref:>9.2f}{1.0:>8.2f}x{'yes':>11}")
+        
+        # 分段时长下限不参与比较
+        settings.scene_chunk_min_seconds = 1.0
+        for chunks in args.chunks:
+            shutdown_process_pool()
+            settings.cpu_pool_workers = chunks
+            init_process_pool()
+            
+            t0 = time.perf_counter()
+            segments = asyncio.run(detect_scenes_parallel(
+                str(video_path), work_dir / f"chunks_{chunks}", chunks=chunks
+            ))
+            elapsed = time.perf_counter() - t0
+            identical = _segments_signature(segments) == _segments_signature(reference)
+            print(f"{chunks:<10}{elapsed:>9.2f}{t_ref / elapsed:>8.2f}x{'yes' if identical else 'NO':>11}")
+    finally:
+        shutdown_process_pool()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+场景检测引擎基准测试
+
+对比 detect_scenes（PySceneDetect ContentDetector）与 detect_scenes_fast 的
+opencv 后端（不同采样间隔）及 ffmpeg 后端（如已安装）：
+  - 处理速度（视频帧/秒）
+  - 与 detect_scenes 切点的一致性（容差为采样间隔内的召回率/精确率）
+
+用法：
+  python -m benchmarks.bench_scene_engines [视频路径] [--seconds 120]
+未提供视频时生成合成1080p视频。
+"""
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import make_synthetic_video
+from app.core.config import settings
+from app.pipeline.steps.fast_scene_detect import detect_scenes_fast
+from app.pipeline.steps.scene_detect import detect_scenes
+
+
+def _cuts(segments):
+    return [s["start_frame"] for s in segments[1:]]
+
+
+def _agreement(reference, cuts, tolerance):
+    """在容差内匹配切点，返回 (召回率, 精确率)"""
+    unmatched = list(cuts)
+    matched = 0
+    for ref in reference:
+        hit = next((c for c in unmatched if abs(c - ref) <= tolerance), None)
+        if hit is not None:
+            unmatched.remove(hit)
+            matched += 1
+    recall = matched / len(reference) if reference else 1.0
+    precision = matched / len(cuts) if cuts else 1.0
+    return recall, precision
+
+
+def main():
+    parser = argparse.ArgumentParser(description="场景检测引擎基准")
+    parser.add_argument("video", nargs="?", help="输入视频（默认生成合成1080p视频）")
+    parser.add_argument("--seconds", type=float, default=120.0, help="合成视频时长（秒）")
+    parser.add_argument("--decode-width", type=int, default=settings.fast_scene_decode_width)
+    args = parser.parse_args()
+    
+    work_dir = Path(tempfile.mkdtemp(prefix="bench_scene_engines_"))
+    try:
+        if args.video:
+            video_path = Path(args.video)
+        else:
+            pattern = [4.0, 2.5, 6.0, 1.5, 3.0]
+            scene_seconds = []
+            while sum(scene_seconds) < args.seconds:
+                scene_seconds.append(pattern[len(scene_seconds) % len(pattern)])
+            print(f"生成合成视频: 1920x1080, {sum(scene_seconds):.0f}秒, {len(scene_seconds)}个场景...")
+            video_path = make_synthetic_video(work_dir / "input.mp4", scene_seconds=scene_seconds)
+        
+        t0 = time.perf_counter()
+        reference = detect_scenes(str(video_path), work_dir / "content")
+        t_ref = time.perf_counter() - t0
+        total_frames = reference[-1]["end_frame"]
+        ref_cuts = _cuts(reference)
+        
+        print(f"\n{total_frames}帧，detect_scenes 检测到{len(ref_cuts)}个切点\n")
+        print(f"{'engine':<22}{'time(s)':>9}{'fps':>9}{'speedup':>9}{'cuts':>6}{'recall':>8}{'precision':>11}")
+        print(f"{'content (detect_scenes)':<22}{t_ref:>9.2f}{total_frames / t_ref:>9.0f}{1.0:>8.2f}x{len(ref_cuts):>6}"
+              f"{1.0:>8.2f}{1.0:>11.2f}")
+        
+        cases = [(f"fast sample_rate={k}", "opencv", k) for k in (1, 2, 4)]
+        if shutil.which(settings.ffmpeg_bin):
+            cases.append(("ffmpeg scene", "ffmpeg", 1))
+        else:
+            print(f"（未找到 {settings.ffmpeg_bin}，跳过ffmpeg后端）")
+        
+        for name, backend, sample_rate in cases:
+            t0 = time.perf_counter()
+            segments = detect_scenes_fast(
+                str(video_path),
+                work_dir / name.replace(" ", "_"),
+                backend=backend,
+                sample_rate=sample_rate,
+                decode_width=args.decode_width
+            )
+            elapsed = time.perf_counter() - t0
+            cuts = _cuts(segments)
+            recall, precision = _agreement(ref_cuts, cuts, tolerance=max(1, sample_rate))
+            print(f"{name:<22}{elapsed:>9.2f}{total_frames / elapsed:>9.0f}{t_ref / elapsed:>8.2f}x"
+                  f"{len(cuts):>6}{recall:>8.2f}{precision:>11.2f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
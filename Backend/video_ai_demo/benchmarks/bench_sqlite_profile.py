@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+SQLite存储配置基准测试：并发Job进度写入 + 状态读取
+
+对比：
+  - default / performance 两种 sqlite_profile
+  - 每次进度直接写库 / ProgressWriter 合并写入
+
+写入方：N个Job在事件循环上按固定间隔上报进度（与 _update_progress 相同）
+读取方：M个线程持续读取Job行（模拟轮询 GET /jobs/{id} 与SSE兜底检查）
+
+用法：
+  python -m benchmarks.bench_sqlite_profile [--jobs 8] [--updates 200] [--readers 4]
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models import Base, Job, JobMode, JobStatus
+from app.db.progress_writer import ProgressWriter
+from app.db.repo import JobRepository
+from app.db.session import create_db_engine
+
+
+def _session_scope(factory):
+    @contextmanager
+    def scope():
+        db = factory()
+        try:
+            yield db
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    return scope
+
+
+def _run_case(db_path: Path, profile: str, coalesce: bool, args) -> dict:
+    engine = create_db_engine(str(db_path), profile=profile)
+    Base.metadata.create_all(bind=engine)
+    scope = _session_scope(sessionmaker(autocommit=False, autoflush=False, bind=engine))
+    
+    job_ids = [f"job_{i:03d}" for i in range(args.jobs)]
+    with scope() as db:
+        for job_id in job_ids:
+            db.add(Job(id=job_id, mode=JobMode.LEARN, status=JobStatus.RUNNING))
+    
+    writer = ProgressWriter(flush_interval=args.flush_interval, session_scope=scope)
+    stop = threading.Event()
+    read_latencies = []
+    errors = {"write": 0, "read": 0}
+    
+    def reader(offset: int):
+        i = offset
+        while not stop.is_set():
+            job_id = job_ids[i % len(job_ids)]
+            t0 = time.perf_counter()
+            try:
+                with scope() as db:
+                    JobRepository(db).get(job_id).progress_percent
+                read_latencies.append(time.perf_counter() - t0)
+            except OperationalError:
+                errors["read"] += 1
+            i += 1
+    
+    async def job(job_id: str):
+        for step in range(args.updates):
+            percent = step / args.updates * 100
+            if coalesce:
+                writer.submit(job_id, "feature_analysis", percent, f"{step}/{args.updates}")
+            else:
+                try:
+                    with scope() as db:
+                        JobRepository(db).update_progress(
+                            job_id, "feature_analysis", percent, f"{step}/{args.updates}"
+                        )
+                except OperationalError:
+                    errors["write"] += 1
+            await asyncio.sleep(args.interval)
+    
+    async def main():
+        await asyncio.gather(*[job(job_id) for job_id in job_ids])
+        writer.flush()
+    
+    readers = [threading.Thread(target=reader, args=(i,)) for i in range(args.readers)]
+    for thread in readers:
+        thread.start()
+    
+    t0 = time.perf_counter()
+    asyncio.run(main())
+    elapsed = time.perf_counter() - t0
+    
+    stop.set()
+    for thread in readers:
+        thread.join()
+    engine.dispose()
+    
+    latencies = sorted(read_latencies) or [0.0]
+    return {
+        "elapsed": elapsed,
+        "write_txns": writer.flushes if coalesce else args.jobs * args.updates - errors["write"],
+        "reads": len(read_latencies),
+        "read_p50_ms": statistics.median(latencies) * 1000,
+        "read_p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "read_max_ms": latencies[-1] * 1000,
+        "write_errors": errors["write"],
+        "read_errors": errors["read"]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite存储配置基准测试")
+    parser.add_argument("--jobs", type=int, default=8, help="并发Job数")
+    parser.add_argument("--updates", type=int, default=200, help="每个Job的进度更新次数")
+    parser.add_argument("--interval", type=float, default=0.002, help="进度更新间隔（秒）")
+    parser.add_argument("--readers", type=int, default=4, help="读取线程数")
+    parser.add_argument("--flush-interval", type=float, default=0.5, help="合并写入间隔（秒）")
+    args = parser.parse_args()
+    
+    print(
+        f"jobs={args.jobs} updates={args.updates} interval={args.interval}s "
+        f"readers={args.readers} flush_interval={args.flush_interval}s\n"
+    )
+    print(
+        f"{'profile':<12}{'writer':<11}{'elapsed':>9}{'txns':>7}{'reads':>8}"
+        f"{'p50(ms)':>9}{'p95(ms)':>9}{'max(ms)':>9}{'errors':>8}"
+    )
+    
+    with tempfile.TemporaryDirectory(prefix="bench_sqlite_") as tmp:
+        for profile in ("default", "performance"):
+            for coalesce in (False, True):
+                db_path = Path(tmp) / f"{profile}_{int(coalesce)}.db"
+                r = _run_case(db_path, profile, coalesce, args)
+                print(
+                    f"{profile:<12}{'coalesced' if coalesce else 'direct':<11}"
+                    f"{r['elapsed']:>8.2f}s{r['write_txns']:>7}{r['reads']:>8}"
+                    f"{r['read_p50_ms']:>9.2f}{r['read_p95_ms']:>9.2f}{r['read_max_ms']:>9.2f}"
+                    f"{r['write_errors'] + r['read_errors']:>8}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""基准测试用的合成视频"""
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple, Union
+
+import cv2
+import numpy as np
+
+
+def make_synthetic_video(
+    output_path: Path,
+    scene_seconds: List[float] = (3.0, 2.0, 4.0, 1.5, 3.5),
+    size: Tuple[int, int] = (1920, 1080),
+    fps: float = 30.0,
+    motion: Union[str, Sequence[str]] = "pan",
+    scene_frames: Optional[Sequence[int]] = None
+) -> Path:
+    """
+    生成多场景合成视频：每个场景是不同配色的纹理画面，场景间硬切
+    
+    Args:
+        output_path: 输出路径（.mp4）
+        scene_seconds: 每个场景的时长（秒）
+        size: (宽, 高)
+        fps: 帧率
+        motion: 场景内运动方式（pan 每帧平移4像素 / zoom / static），可按场景分别给出
+        scene_frames: 每个场景的帧数，给出时代替 scene_seconds（测试需要精确的切点帧号）
+    """
+    if scene_frames is None:
+        scene_frames = [max(1, int(round(seconds * fps))) for seconds in scene_seconds]
+    motions = [motion] * len(scene_frames) if isinstance(motion, str) else list(motion)
+    
+    width, height = size
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    writer = cv2.VideoWriter(
+        str(output_path),
+        cv2.VideoWriter_fourcc(*"mp4v"),
+        fps,
+        (width, height)
+    )
+    rng = np.random.default_rng(42)
+    
+    for frame_count, scene_motion in zip(scene_frames, motions):
+        # 每个场景一张比画面大的纹理，通过平移/缩放产生运动
+        base_color = rng.integers(40, 215, size=3)
+        texture = np.clip(
+            base_color + rng.normal(0, 40, size=(height // 8 + 64, width // 8 + 64, 3)),
+            0, 255
+        ).astype(np.uint8)
+        texture = cv2.resize(texture, (width + 512, height + 512), interpolation=cv2.INTER_LINEAR)
+        cv2.circle(texture, (width // 2 + 256, height // 2 + 256), height // 4, (255, 255, 255), -1)
+        
+        for i in range(frame_count):
+            if scene_motion == "pan":
+                offset = int(i * 4) % 512
+                frame = texture[256:256 + height, offset:offset + width]
+            elif scene_motion == "zoom":
+                crop = int(i * 2) % 256
+                frame = cv2.resize(
+                    texture[crop:crop + height + 512 - 2 * crop, crop:crop + width + 512 - 2 * crop],
+                    (width, height)
+                )
+            else:
+                frame = texture[256:256 + height, 256:256 + width]
+            writer.write(np.ascontiguousarray(frame))
+    
+    writer.release()
+    return output_path
@@ -0,0 +1,98 @@
+"""
+数据库迁移脚本：添加Job结果摘要字段和索引
+为 jobs 表添加 duration_ms, segment_count, *_count, hook_score, detection_method 字段，
+为 status 及列表游标分页的 (created_at, id) 建立索引，并从已有的 result_json 回填摘要
+"""
+import json
+import sqlite3
+from pathlib import Path
+
+from app.db.repo import FEATURE_CATEGORIES, compute_result_summary
+
+
+SUMMARY_COLUMNS = [
+    ("duration_ms", "FLOAT"),
+    ("segment_count", "INTEGER"),
+    *[(f"{category}_count", "INTEGER") for category in FEATURE_CATEGORIES],
+    ("hook_score", "INTEGER"),
+    ("detection_method", "VARCHAR"),
+]
+
+INDEXES = [
+    ("ix_jobs_status", "status"),
+    ("ix_jobs_created_at_id", "created_at, id"),
+    ("ix_jobs_status_created_at_id", "status, created_at, id"),
+]
+
+
+def _load_json(text):
+    if not text:
+        return None
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return None
+
+
+def migrate():
+    """执行迁移"""
+    db_path = Path("./data/demo.db")
+    
+    if not db_path.exists():
+        print(f"数据库文件不存在: {db_path}")
+        return
+    
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    
+    try:
+        # 检查字段是否已存在
+        cursor.execute("PRAGMA table_info(jobs)")
+        columns = [row[1] for row in cursor.fetchall()]
+        
+        for name, column_type in SUMMARY_COLUMNS:
+            if name not in columns:
+                print(f"添加 {name} 字段...")
+                cursor.execute(f"ALTER TABLE jobs ADD COLUMN {name} {column_type}")
+                print(f"✓ {name} 字段已添加")
+            else:
+                print(f"✓ {name} 字段已存在")
+        
+        # 旧版的单列 created_at 索引已被 (created_at, id) 复合索引取代
+        cursor.execute("DROP INDEX IF EXISTS ix_jobs_created_at")
+        for index_name, columns in INDEXES:
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON jobs ({columns})")
+            print(f"✓ 索引 {index_name} 已就绪")
+        
+        # 回填已完成但尚无摘要的任务
+        cursor.execute(
+            "SELECT id, result_json, partial_result_json FROM jobs "
+            "WHERE result_json IS NOT NULL AND segment_count IS NULL"
+        )
+        rows = cursor.fetchall()
+        print(f"回填 {len(rows)} 条记录的摘要...")
+        
+        for job_id, result_json, partial_result_json in rows:
+            result = _load_json(result_json)
+            if result is None:
+                continue
+            # 完成后 partial_result_json 存放的是格式化分析报告（含hookScore）
+            summary = compute_result_summary(result, _load_json(partial_result_json))
+            assignments = ", ".join(f"{field} = ?" for field in summary)
+            cursor.execute(
+                f"UPDATE jobs SET {assignments} WHERE id = ?",
+                (*summary.values(), job_id)
+            )
+        
+        conn.commit()
+        print("\n✅ 数据库迁移完成！")
+        
+    except Exception as e:
+        print(f"\n❌ 迁移失败: {str(e)}")
+        conn.rollback()
+    
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    migrate()
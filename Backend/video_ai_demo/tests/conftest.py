@@ -0,0 +1,43 @@
+"""测试共用的fixture（合成视频见 benchmarks.synthetic.make_synthetic_video）"""
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models import Base
+
+
+@pytest.fixture
+def db_factory(tmp_path):
+    """每个测试使用独立的临时SQLite数据库"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def db(db_factory):
+    """临时数据库上的会话"""
+    session = db_factory()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def get_db(db_factory):
+    """与 app.db.session.get_db 行为一致的上下文管理器，供monkeypatch替换"""
+    @contextmanager
+    def _get_db():
+        session = db_factory()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+    
+    return _get_db
@@ -0,0 +1,104 @@
+"""自适应抽帧测试"""
+from pathlib import Path
+
+import cv2
+
+from app.pipeline.adaptive_sampling import prune_candidates, select_adaptive_frames
+from app.pipeline.steps.media_pass import run_media_pass
+from benchmarks.synthetic import make_synthetic_video
+
+
+def _count_in(ts, selected, start_ms, end_ms):
+    return sum(1 for i in selected if start_ms <= ts[i] < end_ms)
+
+
+def test_select_dense_in_motion_sparse_in_static():
+    """运动场景比等长的静止场景取更多帧，切点处的帧被选中，总数不超过预算"""
+    ts = [i * 100.0 for i in range(200)]  # 20秒，10fps候选
+    scores = [0.0] * 200
+    for i in range(100, 200):
+        scores[i] = 0.1
+    segments = [(0.0, 10000.0), (10000.0, 20000.0)]
+    
+    selected = select_adaptive_frames(ts, scores, segments, max_frames=40)
+    
+    assert len(selected) <= 40
+    static = _count_in(ts, selected, 0, 10000)
+    moving = _count_in(ts, selected, 10000, 20000)
+    assert static >= 1
+    assert moving > static * 3
+    assert 100 in selected
+
+
+def test_select_static_video_stays_sparse():
+    """静止画面按 static_fps 稀疏取帧，不会用满预算"""
+    ts = [i * 100.0 for i in range(300)]
+    selected = select_adaptive_frames(ts, [0.0] * 300, None, max_frames=240, static_fps=0.5)
+    
+    assert 10 <= len(selected) <= 20
+
+
+def test_select_guarantees_frame_per_segment():
+    """每个场景至少一帧，包括短于候选间隔的场景"""
+    ts = [i * 500.0 for i in range(20)]
+    segments = [(0.0, 4000.0), (4000.0, 4200.0), (4200.0, 10000.0)]
+    
+    selected = select_adaptive_frames(ts, [0.05] * 20, segments, max_frames=5)
+    
+    assert len(selected) <= 5
+    assert _count_in(ts, selected, 0, 4000) >= 1
+    assert _count_in(ts, selected, 4200, 10000) >= 1
+    # 短场景内没有候选帧时取离中点最近的候选帧
+    assert 8 in selected
+
+
+def test_select_more_segments_than_budget():
+    ts = [i * 100.0 for i in range(100)]
+    segments = [(i * 1000.0, (i + 1) * 1000.0) for i in range(10)]
+    
+    assert len(select_adaptive_frames(ts, [0.0] * 100, segments, max_frames=4)) == 4
+
+
+def test_prune_candidates(tmp_path):
+    paths = []
+    for i in range(4):
+        path = tmp_path / f"frame_{i:05d}.jpg"
+        path.write_bytes(b"x")
+        paths.append(str(path))
+    candidates = [{"frame_id": f"f_{i:05d}", "ts_ms": i * 100.0, "path": p} for i, p in enumerate(paths)]
+    
+    frames = prune_candidates(candidates, [1, 3], keep_paths=[paths[0]])
+    
+    assert [f["frame_id"] for f in frames] == ["f_00000", "f_00001"]
+    assert [f["path"] for f in frames] == [paths[1], paths[3]]
+    assert [Path(p).exists() for p in paths] == [True, True, False, True]
+
+
+def test_media_pass_adaptive(tmp_path):
+    video = tmp_path / "input.mp4"
+    # 静止场景3秒 + 运动场景3秒 + 静止场景1秒
+    make_synthetic_video(
+        video, scene_frames=[90, 90, 30], size=(320, 180), motion=["static", "pan", "static"]
+    )
+    
+    result = run_media_pass(
+        str(video), tmp_path, tmp_path, fps=2.0, max_frames=12, sampling_mode="adaptive"
+    )
+    
+    segments = result["segments"]
+    frames = result["frames_index"]
+    assert len(segments) == 3
+    assert 3 <= len(frames) <= 12
+    for seg in segments:
+        assert frames.range(seg["start_ms"], seg["end_ms"] - 1)
+    
+    static = len(frames.range(segments[0]["start_ms"], segments[0]["end_ms"] - 1))
+    moving = len(frames.range(segments[1]["start_ms"], segments[1]["end_ms"] - 1))
+    assert moving > static
+    
+    # 未选中的候选帧已删除（场景关键帧引用的除外）
+    kept = {Path(f["path"]).name for f in frames}
+    on_disk = {p.name for p in (tmp_path / "frames").glob("*.jpg")}
+    assert kept <= on_disk
+    assert len(on_disk) < 7 * 2 * 3
+    assert all(cv2.imread(f["path"]) is not None for f in frames)
@@ -0,0 +1,150 @@
+"""资源仓库测试：派生产物按内容哈希+参数只生成一次，跨Job复用"""
+import asyncio
+import hashlib
+import os
+import time
+
+import pytest
+
+from app.db.models import AssetRole
+from app.pipeline import orchestrator as orchestrator_module
+from app.pipeline.asset_store import AssetStore, file_sha256
+from app.pipeline.frame_index import FrameIndex
+from app.pipeline.orchestrator import PipelineOrchestrator
+
+
+def test_file_sha256(tmp_path):
+    video = tmp_path / "video.mp4"
+    video.write_bytes(os.urandom(10_000))
+    linked = tmp_path / "linked.mp4"
+    os.link(video, linked)
+    
+    assert file_sha256(str(video)) == hashlib.sha256(video.read_bytes()).hexdigest()
+    assert file_sha256(str(linked)) == file_sha256(str(video))
+
+
+def test_derive_produces_once_per_options(tmp_path):
+    store = AssetStore(tmp_path / "assets")
+    calls = []
+    
+    async def produce(root):
+        calls.append(root)
+        (root / "frames").mkdir()
+        return {"frames_index": FrameIndex([{"ts_ms": 0.0, "path": str(root / "frames" / "a.jpg")}])}
+    
+    async def run():
+        first = await store.derive("abc", "frames", {"fps": 2.0}, produce)
+        second = await store.derive("abc", "frames", {"fps": 2.0}, produce)
+        other = await store.derive("abc", "frames", {"fps": 4.0}, produce)
+        return first, second, other
+    
+    first, second, other = asyncio.run(run())
+    
+    assert len(calls) == 2
+    assert (first[2], second[2], other[2]) == (False, True, False)
+    assert first[1] == second[1] != other[1]
+    assert second[0]["frames_index"] == list(first[0]["frames_index"])
+
+
+def test_derive_discards_incomplete_or_failed_products(tmp_path):
+    store = AssetStore(tmp_path / "assets")
+    
+    async def fail(root):
+        (root / "partial.jpg").write_bytes(b"x")
+        raise RuntimeError("decode failed")
+    
+    with pytest.raises(RuntimeError):
+        asyncio.run(store.derive("abc", "scenes", {}, fail))
+    assert not any((tmp_path / "assets" / "abc").iterdir())
+    
+    # 残留的无manifest目录（进程中断）会被重新生成
+    product_dir = tmp_path / "assets" / "abc" / f"scenes-{AssetStore.options_key('scenes', {})}"
+    product_dir.mkdir()
+    (product_dir / "stale.jpg").write_bytes(b"x")
+    
+    async def produce(root):
+        return [{"segment_id": "seg_001"}]
+    
+    result, _, reused = asyncio.run(store.derive("abc", "scenes", {}, produce))
+    assert result == [{"segment_id": "seg_001"}] and not reused
+    assert not (product_dir / "stale.jpg").exists()
+
+
+def test_prune_evicts_least_recently_used_products(tmp_path):
+    """超过总量上限按最近使用时间淘汰，复用会刷新使用时间；闲置过久的产物也被淘汰；锁不残留"""
+    store = AssetStore(tmp_path / "assets", max_bytes=2500, max_age_seconds=0, min_idle_seconds=0)
+    
+    async def produce(root):
+        (root / "frame.jpg").write_bytes(b"x" * 1000)
+        return str(root)
+    
+    def derive(content_hash):
+        result, product_dir, reused = asyncio.run(store.derive(content_hash, "frames", {}, produce))
+        # 按顺序设置使用时间，避免文件系统时间精度影响淘汰顺序
+        used_at = time.time() - 100 + len(used)
+        os.utime(product_dir / "manifest.json", (used_at, used_at))
+        used.append(content_hash)
+        return product_dir, reused
+    
+    used = []
+    a, _ = derive("a")
+    b, _ = derive("b")
+    assert derive("a") == (a, True)
+    c, _ = derive("c")
+    
+    assert not b.exists() and a.exists() and c.exists()
+    assert store.evictions == 1
+    assert len(store._locks) == 0
+    
+    store.max_age_seconds = 150
+    os.utime(a / "manifest.json", (time.time() - 200, time.time() - 200))
+    derive("d")
+    assert not a.exists() and c.exists()
+
+
+def test_prune_keeps_recently_used_products(tmp_path):
+    """最近使用过的产物可能仍被运行中的Job引用，超过上限也暂不淘汰"""
+    store = AssetStore(tmp_path / "assets", max_bytes=1500, max_age_seconds=0, min_idle_seconds=3600)
+    
+    async def produce(root):
+        (root / "frame.jpg").write_bytes(b"x" * 1000)
+        return str(root)
+    
+    async def run():
+        first = await store.derive("a", "frames", {}, produce)
+        second = await store.derive("b", "frames", {}, produce)
+        return first[1], second[1]
+    
+    a, b = asyncio.run(run())
+    assert a.exists() and b.exists()
+
+
+def test_orchestrator_reuses_products_across_jobs(tmp_path, monkeypatch):
+    store = AssetStore(tmp_path / "assets")
+    monkeypatch.setattr(orchestrator_module, "asset_store", store)
+    calls = []
+    
+    async def produce(root):
+        calls.append(root)
+        keyframes_dir = root / "scene_keyframes"
+        keyframes_dir.mkdir()
+        (keyframes_dir / "001-keyframe.jpg").write_bytes(b"jpeg")
+        return {
+            "segments": [{"segment_id": "seg_001"}],
+            "frames_index": FrameIndex([]),
+            "scene_keyframes": [str(keyframes_dir / "001-keyframe.jpg")]
+        }
+    
+    results = []
+    for job_id in ["job_a", "job_b"]:
+        orchestrator = PipelineOrchestrator(job_id, {"mode": "learn"})
+        orchestrator.job_dir = tmp_path / "jobs" / job_id
+        results.append(asyncio.run(orchestrator._derive_asset(
+            {"content_hash": "abc"}, AssetRole.TARGET, "media_pass", {"fps": 2.0}, produce
+        )))
+    
+    assert len(calls) == 1
+    keyframe = tmp_path / "jobs" / "job_b" / "target" / "scene_keyframes" / "001-keyframe.jpg"
+    assert results[1]["scene_keyframes"] == [str(keyframe)]
+    assert keyframe.read_bytes() == b"jpeg"
+    assert isinstance(results[1]["frames_index"], FrameIndex)
@@ -0,0 +1,164 @@
+"""本地运镜识别测试"""
+import asyncio
+import json
+
+import cv2
+import httpx
+import numpy as np
+import pytest
+
+from app.integrations.llm_cache import LLMResponseCache
+from app.integrations.mm_llm_client import MMHLLMClient
+from app.pipeline.camera_motion import analyze_segment_motion
+from app.pipeline.frame_index import FrameIndex
+from app.pipeline.local_analysis import analyze_segment_locally
+from app.pipeline.orchestrator import PipelineOrchestrator
+
+
+def _write_frames(tmp_path, motion, count=8, interval_ms=500.0, size=(640, 360)):
+    """
+    纹理画面上的合成镜头运动：pan 每帧内容左移24像素（镜头向右摇），
+    zoom 每帧放大4%（推镜头），static 不动
+    """
+    frames_dir = tmp_path / motion
+    frames_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(7)
+    width, height = size
+    texture = np.clip(
+        128 + rng.normal(0, 50, size=(height // 8, width // 4, 3)), 0, 255
+    ).astype(np.uint8)
+    texture = cv2.resize(texture, (width * 2, height), interpolation=cv2.INTER_LINEAR)
+    
+    images = []
+    for i in range(count):
+        if motion == "pan":
+            image = texture[:, i * 24:i * 24 + width]
+        elif motion == "zoom":
+            scale = 1.04 ** i
+            crop_w, crop_h = int(width / scale), int(height / scale)
+            left, top = (width - crop_w) // 2, (height - crop_h) // 2
+            image = cv2.resize(
+                texture[top:top + crop_h, left:left + crop_w], size, interpolation=cv2.INTER_LINEAR
+            )
+        else:
+            image = texture[:, :width]
+        images.append(np.ascontiguousarray(image))
+    
+    frames = []
+    for i, image in enumerate(images):
+        path = frames_dir / f"frame_{i:05d}.jpg"
+        cv2.imwrite(str(path), image)
+        frames.append({"frame_id": f"f_{i:05d}", "ts_ms": i * interval_ms, "path": str(path)})
+    return frames
+
+
+@pytest.mark.parametrize("motion,reverse,expected_type,expected_value", [
+    ("pan", False, "pan", "摇镜头 - 向右"),
+    ("pan", True, "pan", "摇镜头 - 向左"),
+    ("zoom", False, "push_in", "推镜头"),
+    ("zoom", True, "pull_out", "拉镜头"),
+    ("static", False, "static", "固定镜头"),
+])
+def test_analyze_segment_motion(tmp_path, motion, reverse, expected_type, expected_value):
+    frames = _write_frames(tmp_path, motion)
+    if reverse:
+        frames = [
+            {**frame, "ts_ms": later["ts_ms"]}
+            for frame, later in zip(reversed(frames), frames)
+        ]
+    
+    feature = analyze_segment_motion(frames, 0, 4000)
+    
+    assert feature["category"] == "camera_motion"
+    assert feature["type"] == expected_type
+    assert feature["value"] == expected_value
+    assert feature["evidence"]["time_ranges_ms"] == [[0, 4000]]
+    assert feature["detailed_description"]["parameters"]["frame_pairs"] == 7
+    assert feature["confidence"] >= 0.8
+
+
+def test_analyze_segment_motion_needs_two_frames(tmp_path):
+    frames = _write_frames(tmp_path, "pan")
+    # 结束时间处的帧属于下一个场景
+    assert analyze_segment_motion(frames, 0, 500) is None
+    assert analyze_segment_motion(frames, 0, 1000)["type"] == "pan"
+
+
+def test_local_source_still_asks_shot_size_and_angle(tmp_path):
+    """camera_motion 为 local 时只替换运镜方式，景别和拍摄角度仍由LLM给出"""
+    frames = _write_frames(tmp_path, "pan")
+    modules = ["camera_motion", "lighting"]
+    llm_features = [
+        {"category": "camera_motion", "type": "push_in", "value": "推镜头"},
+        {"category": "camera_motion", "type": "wide_shot", "value": "全景"},
+    ]
+    
+    # 置信度阈值不影响 local
+    local = analyze_segment_locally(
+        frames, 0, 4000, modules, {"camera_motion": "local"}, motion_confidence=1.0
+    )
+    assert local.llm_modules(modules) == modules
+    assert local.motion["type"] == "pan"
+    assert [f["type"] for f in local.merge(llm_features)] == ["pan", "wide_shot"]
+    
+    # 本地无法识别时不采用LLM的运镜方式，景别照常保留
+    local = analyze_segment_locally(frames, 0, 500, modules, {"camera_motion": "local"})
+    assert local.motion is None and local.llm_modules(modules) == modules
+    assert [f["type"] for f in local.merge(llm_features)] == ["wide_shot"]
+
+
+def test_prompt_drops_movement_when_prefilled():
+    orchestrator = PipelineOrchestrator("job_motion", {"mode": "learn"})
+    modules = ["camera_motion", "lighting", "color_grading"]
+    local = {"value": "摇镜头 - 向右"}
+    
+    full = orchestrator._build_feature_only_prompt("seg_001", 0, 1000, modules)
+    short = orchestrator._build_feature_only_prompt("seg_001", 0, 1000, modules, local)
+    
+    assert "运镜方式 (Camera Movement)" in full and "push_in" in full
+    assert "运镜方式 (Camera Movement)" not in short
+    assert '"type": "push_in"' not in short
+    assert "运镜方式已确定为摇镜头 - 向右" in short
+    assert len(short) < len(full) * 0.8
+
+
+def test_orchestrator_prefills_confident_motion(tmp_path):
+    """本地结果可信时提示词不再询问运镜方式，LLM多给的运镜特征被本地结果替换"""
+    frames = FrameIndex(_write_frames(tmp_path, "pan"))
+    prompts = []
+    
+    def handler(request: httpx.Request) -> httpx.Response:
+        prompts.append(json.loads(request.content)["messages"][0]["content"][0]["text"])
+        reply = [
+            {"category": "camera_motion", "type": "push_in", "value": "推镜头", "confidence": 0.7},
+            {"category": "camera_motion", "type": "wide_shot", "value": "中全景", "confidence": 0.8},
+        ]
+        return httpx.Response(200, json={
+            "choices": [{"message": {"content": json.dumps(reply, ensure_ascii=False)}}]
+        })
+    
+    client = MMHLLMClient(
+        api_key="test",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        cache=LLMResponseCache(tmp_path / "llm_cache.db", max_bytes=1024 * 1024, ttl_seconds=3600)
+    )
+    orchestrator = PipelineOrchestrator("job_motion", {"mode": "learn"})
+    segment = {"segment_id": "seg_001", "start_ms": 0, "end_ms": 4000}
+    llm_config = {
+        "enabled_modules": ["camera_motion", "lighting"],
+        "module_sources": {"camera_motion": "hybrid"}
+    }
+    
+    result = asyncio.run(orchestrator._analyze_single_cv_segment(segment, frames, llm_config, client))
+    
+    assert "运镜方式已确定为摇镜头 - 向右" in prompts[0]
+    assert [f["type"] for f in result["features"]] == ["pan", "wide_shot"]
+    
+    # 默认不做本地识别，按原提示词询问LLM
+    result = asyncio.run(orchestrator._analyze_single_cv_segment(
+        {**segment, "segment_id": "seg_002"}, frames,
+        {"enabled_modules": llm_config["enabled_modules"]}, client
+    ))
+    
+    assert "运镜方式 (Camera Movement)" in prompts[1]
+    assert [f["type"] for f in result["features"]] == ["push_in", "wide_shot"]
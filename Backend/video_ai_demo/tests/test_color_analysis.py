@@ -0,0 +1,262 @@
+"""本地调色/影调分析与模块来源测试"""
+import asyncio
+import json
+
+import cv2
+import httpx
+import numpy as np
+import pytest
+
+from app.core.errors import ValidationError
+from app.integrations.llm_cache import LLMResponseCache
+from app.integrations.mm_llm_client import MMHLLMClient
+from app.pipeline.color_analysis import analyze_segment_color, dominant_palette
+from app.pipeline.frame_index import FrameIndex
+from app.pipeline.local_analysis import (
+    LocalAnalysis,
+    analyze_segment_locally,
+    resolve_module_sources,
+)
+from app.pipeline.orchestrator import PipelineOrchestrator
+
+
+def _base_image(size=(640, 360)):
+    """中等亮度、自然饱和度的彩色纹理"""
+    rng = np.random.default_rng(1)
+    small = rng.integers(0, 255, size=(18, 32, 3), dtype=np.uint8)
+    return cv2.resize(small, size, interpolation=cv2.INTER_LINEAR)
+
+
+GRADES = {
+    "warm": lambda img: np.clip(img * np.array([0.55, 0.85, 1.2]), 0, 255),
+    "cool": lambda img: np.clip(img * np.array([1.25, 1.0, 0.65]), 0, 255),
+    "gray": lambda img: cv2.cvtColor(cv2.cvtColor(img, cv2.COLOR_BGR2GRAY), cv2.COLOR_GRAY2BGR),
+    "flat": lambda img: img * 0.3 + 90,
+    "dark": lambda img: img * 0.3,
+    "bright": lambda img: img * 0.35 + 165,
+}
+
+
+def _write_frames(tmp_path, grade, count=6, interval_ms=500.0):
+    frames_dir = tmp_path / grade
+    frames_dir.mkdir(parents=True, exist_ok=True)
+    image = GRADES[grade](_base_image()).astype(np.uint8)
+    frames = []
+    for i in range(count):
+        path = frames_dir / f"frame_{i:05d}.jpg"
+        cv2.imwrite(str(path), image)
+        frames.append({"frame_id": f"f_{i:05d}", "ts_ms": i * interval_ms, "path": str(path)})
+    return frames
+
+
+@pytest.mark.parametrize("grade,tone,saturation,contrast,key", [
+    ("warm", "warm_tone", "high_saturation", "normal_contrast", "mid_key"),
+    ("cool", "cool_tone", "high_saturation", "normal_contrast", "mid_key"),
+    ("gray", "neutral_tone", "monochrome", "normal_contrast", "mid_key"),
+    ("flat", "neutral_tone", "low_saturation", "low_contrast", "mid_key"),
+    ("dark", "neutral_tone", "natural_saturation", "low_contrast", "low_key"),
+    ("bright", "neutral_tone", "low_saturation", "low_contrast", "high_key"),
+])
+def test_analyze_segment_color(tmp_path, grade, tone, saturation, contrast, key):
+    features = analyze_segment_color(_write_frames(tmp_path, grade), 0, 3000)
+    
+    assert [(f["category"], f["type"]) for f in features] == [
+        ("color_grading", tone),
+        ("color_grading", saturation),
+        ("color_grading", contrast),
+        ("lighting", key),
+    ]
+    for feature in features:
+        assert 0.55 <= feature["confidence"] <= 0.95
+        assert feature["evidence"] == {"time_ranges_ms": [[0, 3000]]}
+        assert set(feature["detailed_description"]) == {
+            "summary", "technical_terms", "purpose", "parameters", "diagram"
+        }
+        assert feature["detailed_description"]["parameters"]["source"] == "local_pixel_stats"
+
+
+def test_color_temperature_estimate(tmp_path):
+    cct = {
+        grade: analyze_segment_color(_write_frames(tmp_path, grade), 0, 3000)[0]
+        ["detailed_description"]["parameters"]["cct_k"]
+        for grade in ("warm", "gray", "cool")
+    }
+    
+    assert cct["warm"] < 5000 < cct["gray"] < 8000 < cct["cool"]
+    # 中性灰即D65白点
+    assert abs(cct["gray"] - 6504) < 100
+
+
+def test_dominant_palette():
+    pixels = np.array([[0, 0, 255]] * 700 + [[255, 0, 0]] * 300, dtype=np.uint8)
+    
+    palette = dominant_palette(pixels, k=2)
+    
+    assert [p["ratio"] for p in palette] == [0.7, 0.3]
+    red, blue = (np.array([int(p["hex"][i:i + 2], 16) for i in (1, 3, 5)]) for p in palette)
+    assert np.abs(red - [255, 0, 0]).max() <= 3
+    assert np.abs(blue - [0, 0, 255]).max() <= 3
+
+
+def test_no_frames_in_segment(tmp_path):
+    assert analyze_segment_color(_write_frames(tmp_path, "warm"), 5000, 6000) == []
+
+
+def test_module_sources(tmp_path, monkeypatch):
+    frames = _write_frames(tmp_path, "cool")
+    modules = ["camera_motion", "lighting", "color_grading"]
+    
+    # hybrid：调色可信时整体交给本地；影调替换LLM的同类结果，光位仍问LLM
+    local = analyze_segment_locally(
+        frames, 0, 3000, modules,
+        {"camera_motion": "llm", "lighting": "hybrid", "color_grading": "hybrid"},
+        color_confidence=0.7
+    )
+    assert local.llm_modules(modules) == ["camera_motion", "lighting"]
+    assert [f["type"] for f in local.features] == [
+        "cool_tone", "high_saturation", "normal_contrast", "mid_key"
+    ]
+    llm_features = [
+        {"category": "lighting", "type": "low_key", "value": "低调照明"},
+        {"category": "lighting", "type": "natural", "value": "自然光"},
+        {"category": "color_grading", "type": "cool_tone", "value": "冷色调"},
+    ]
+    assert [f["type"] for f in local.merge(llm_features)] == [
+        "cool_tone", "high_saturation", "normal_contrast", "mid_key", "natural"
+    ]
+    
+    # 对比度置信度0.72，低于默认阈值时 hybrid 整体退回LLM
+    local = analyze_segment_locally(
+        frames, 0, 3000, modules, {"color_grading": "hybrid"}
+    )
+    assert local.features == [] and local.llm_modules(modules) == modules
+    
+    # local：未启用的模块不分析
+    local = analyze_segment_locally(
+        frames, 0, 3000, ["color_grading"], {"color_grading": "local", "lighting": "local"}
+    )
+    assert local.llm_modules(["color_grading"]) == []
+    assert {f["category"] for f in local.features} == {"color_grading"}
+    
+    monkeypatch.setattr(
+        "app.core.config.settings.module_sources", {"color_grading": "hybrid"}
+    )
+    assert resolve_module_sources({"module_sources": {"lighting": "local"}}) == {
+        "color_grading": "hybrid", "lighting": "local"
+    }
+    with pytest.raises(ValidationError):
+        resolve_module_sources({"module_sources": {"lighting": "gpu"}})
+
+
+def test_local_analysis_merge():
+    local = LocalAnalysis(
+        features=[{"category": "camera_motion", "type": "static"}],
+        local_modules={"color_grading"},
+        replaced_types={"static", "push_in"}
+    )
+    llm_features = [
+        {"category": "camera_motion", "type": "push_in"},
+        {"category": "camera_motion", "type": "medium_shot"},
+        {"category": "color_grading", "type": "warm_tone"},
+        {"category": "lighting", "type": "natural"},
+    ]
+    
+    assert [f["type"] for f in local.merge(llm_features)] == ["static", "medium_shot", "natural"]
+    assert LocalAnalysis().merge(llm_features) == llm_features
+
+
+def _client(tmp_path, prompts):
+    def handler(request: httpx.Request) -> httpx.Response:
+        prompts.append(json.loads(request.content)["messages"][0]["content"][0]["text"])
+        reply = [{"category": "lighting", "type": "natural", "value": "自然光", "confidence": 0.8}]
+        return httpx.Response(200, json={
+            "choices": [{"message": {"content": json.dumps(reply, ensure_ascii=False)}}]
+        })
+    
+    return MMHLLMClient(
+        api_key="test",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        cache=LLMResponseCache(tmp_path / "llm_cache.db", max_bytes=1024 * 1024, ttl_seconds=3600)
+    )
+
+
+def test_orchestrator_local_color_skips_llm(tmp_path):
+    """调色交给本地时提示词不再包含调色；所有模块都在本地确定时不调用LLM"""
+    frames = FrameIndex(_write_frames(tmp_path, "cool"))
+    prompts = []
+    client = _client(tmp_path, prompts)
+    orchestrator = PipelineOrchestrator("job_color", {"mode": "learn"})
+    segment = {"segment_id": "seg_001", "start_ms": 0, "end_ms": 3000}
+    
+    result = asyncio.run(orchestrator._analyze_single_cv_segment(segment, frames, {
+        "enabled_modules": ["lighting", "color_grading"],
+        "module_sources": {"lighting": "llm", "color_grading": "local"}
+    }, client))
+    
+    assert len(prompts) == 1
+    assert "调色风格" not in prompts[0] and "color_grading" not in prompts[0]
+    assert [f["type"] for f in result["features"]] == [
+        "cool_tone", "high_saturation", "normal_contrast", "natural"
+    ]
+    
+    result = asyncio.run(orchestrator._analyze_single_cv_segment(segment, frames, {
+        "enabled_modules": ["lighting", "color_grading"],
+        "module_sources": {"lighting": "local", "color_grading": "hybrid"},
+        "local_color_confidence": 0.7
+    }, None))
+    
+    assert len(prompts) == 1
+    assert [f["type"] for f in result["features"]] == [
+        "cool_tone", "high_saturation", "normal_contrast", "mid_key"
+    ]
+
+
+def test_orchestrator_batch_with_local_color(tmp_path):
+    """合并请求中调色都由本地确定时不再询问调色；整批都在本地确定时不发请求"""
+    frames = FrameIndex(_write_frames(tmp_path, "cool", count=8))
+    segments = [
+        {"segment_id": "seg_001", "start_ms": 0, "end_ms": 2000},
+        {"segment_id": "seg_002", "start_ms": 2000, "end_ms": 4000},
+    ]
+    prompts = []
+    
+    def handler(request: httpx.Request) -> httpx.Response:
+        prompt = json.loads(request.content)["messages"][0]["content"][0]["text"]
+        prompts.append(prompt)
+        reply = {"segments": [
+            {"segment_id": seg["segment_id"], "features": [
+                {"category": "lighting", "type": "natural", "value": "自然光", "confidence": 0.8}
+            ]}
+            for seg in segments
+        ]}
+        return httpx.Response(200, json={
+            "choices": [{"message": {"content": json.dumps(reply, ensure_ascii=False)}}]
+        })
+    
+    client = MMHLLMClient(
+        api_key="test",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        cache=LLMResponseCache(tmp_path / "llm_cache.db", max_bytes=1024 * 1024, ttl_seconds=3600)
+    )
+    orchestrator = PipelineOrchestrator("job_color_batch", {"mode": "learn"})
+    llm_config = {
+        "enabled_modules": ["lighting", "color_grading"],
+        "module_sources": {"lighting": "llm", "color_grading": "local"}
+    }
+    
+    results = asyncio.run(orchestrator._analyze_cv_segment_batch(
+        segments, frames, llm_config, client, contact_sheet=False
+    ))
+    
+    assert len(prompts) == 1
+    assert "调色风格" not in prompts[0]
+    for seg in results:
+        assert [f["category"] for f in seg["features"]] == ["color_grading"] * 3 + ["lighting"]
+    
+    results = asyncio.run(orchestrator._analyze_cv_segment_batch(
+        segments, frames, {**llm_config, "module_sources": {"lighting": "local", "color_grading": "local"}},
+        client, contact_sheet=False
+    ))
+    
+    assert len(prompts) == 1
+    assert [len(seg["features"]) for seg in results] == [4, 4]
@@ -0,0 +1,142 @@
+"""联系表与多片段合并请求测试"""
+import asyncio
+import json
+import re
+
+import cv2
+import httpx
+import numpy as np
+
+from app.integrations.contact_sheet import build_contact_sheet, format_timestamp
+from app.integrations.llm_cache import LLMResponseCache
+from app.integrations.mm_llm_client import MMHLLMClient, SegmentBatching
+from app.pipeline import orchestrator as orchestrator_module
+from app.pipeline.frame_index import FrameIndex
+from app.pipeline.orchestrator import PipelineOrchestrator
+
+
+def _write_frames(tmp_path, count, interval_ms=500.0):
+    frames_dir = tmp_path / "frames"
+    frames_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(0)
+    frames = []
+    for i in range(count):
+        path = frames_dir / f"frame_{i:05d}.jpg"
+        small = rng.integers(0, 255, size=(9, 16, 3), dtype=np.uint8)
+        cv2.imwrite(str(path), cv2.resize(small, (640, 360), interpolation=cv2.INTER_NEAREST))
+        frames.append({"frame_id": f"f_{i:05d}", "ts_ms": i * interval_ms, "path": str(path)})
+    return frames
+
+
+def test_format_timestamp():
+    assert format_timestamp(0) == "00:00.000"
+    assert format_timestamp(83_250.4) == "01:23.250"
+
+
+def test_build_contact_sheet(tmp_path):
+    """网格拼接（5帧为3x2），按输入内容命名，相同输入复用同一文件"""
+    frames = _write_frames(tmp_path, 5)
+    paths = [f["path"] for f in frames]
+    ts = [f["ts_ms"] for f in frames]
+    
+    sheet = build_contact_sheet(paths, ts, title="seg_001", cell_width=200)
+    
+    image = cv2.imread(sheet)
+    assert image.shape[1] == 3 * 200 + 4 * 4
+    assert image.shape[0] == 32 + 2 * 112 + 3 * 4
+    assert sheet.startswith(str(tmp_path / "contact_sheets"))
+    
+    mtime = (tmp_path / "contact_sheets").stat().st_mtime_ns
+    assert build_contact_sheet(paths, ts, title="seg_001", cell_width=200) == sheet
+    assert (tmp_path / "contact_sheets").stat().st_mtime_ns == mtime
+    assert build_contact_sheet(paths, ts, title="seg_002", cell_width=200) != sheet
+
+
+def test_batching_plan():
+    segments = [
+        {"start_ms": start, "end_ms": end}
+        for start, end in [(0, 1000), (1000, 2000), (2000, 9000), (9000, 10000),
+                           (10000, 11000), (11000, 12000), (12000, 13000)]
+    ]
+    
+    batching = SegmentBatching(contact_sheet=False, batch_segments=3, max_segment_ms=4000)
+    assert batching.plan(segments) == [[0, 1], [2], [3, 4, 5], [6]]
+    
+    single = SegmentBatching.from_config({})
+    assert not single.enabled
+    assert single.plan(segments) == [[i] for i in range(7)]
+    assert SegmentBatching.from_config({"contact_sheet": True}).enabled
+
+
+def _fake_llm(requests, drop_segment=None):
+    """按提示词中的片段列表回复，每个片段返回一个特征；drop_segment 模拟回复缺项"""
+    
+    def handler(request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        content = payload["messages"][0]["content"]
+        prompt = content[0]["text"]
+        images = [item for item in content if item["type"] == "image_url"]
+        requests.append(len(images))
+        
+        batch_ids = re.findall(r"^- (seg_\d+): ", prompt, re.MULTILINE)
+        if batch_ids:
+            reply = {"segments": [
+                {"segment_id": seg_id, "features": [
+                    {"category": "lighting", "type": "natural", "value": seg_id, "confidence": 0.9}
+                ]}
+                for seg_id in batch_ids if seg_id != drop_segment
+            ]}
+        else:
+            seg_id = re.search(r"片段ID: (seg_\d+)", prompt).group(1)
+            reply = [{"category": "lighting", "type": "natural", "value": seg_id, "confidence": 0.8}]
+        
+        return httpx.Response(200, json={
+            "choices": [{"message": {"content": json.dumps(reply, ensure_ascii=False)}}]
+        })
+    
+    return handler
+
+
+def test_orchestrator_batches_short_segments_with_contact_sheets(tmp_path, monkeypatch):
+    """短片段打包为一次请求、每片段一张联系表；回复缺少的片段单独重试"""
+    frames = FrameIndex(_write_frames(tmp_path, 20))
+    segments = [
+        {"segment_id": f"seg_{i + 1:03d}", "start_ms": start, "end_ms": end}
+        for i, (start, end) in enumerate([
+            (0, 1000), (1000, 2000), (2000, 3000), (3000, 8000), (8000, 9000), (9000, 10000)
+        ])
+    ]
+    
+    requests = []
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(
+        _fake_llm(requests, drop_segment="seg_005")
+    ))
+    cache = LLMResponseCache(tmp_path / "llm_cache.db", max_bytes=1024 * 1024, ttl_seconds=3600)
+    monkeypatch.setattr(
+        orchestrator_module,
+        "MMHLLMClient",
+        lambda model=None: MMHLLMClient(api_key="test", http_client=http_client, cache=cache)
+    )
+    
+    orchestrator = PipelineOrchestrator("job_batch", {"mode": "learn"})
+    saved = []
+    monkeypatch.setattr(orchestrator, "_update_progress", lambda *args: None)
+    monkeypatch.setattr(
+        orchestrator, "_save_segment", lambda index, segment, total: saved.append(index)
+    )
+    
+    # 只验证请求合并，各模块都交给LLM
+    llm_config = {
+        "contact_sheet": True, "batch_segments": 3, "batch_max_segment_ms": 2000,
+        "module_sources": {"camera_motion": "llm", "lighting": "llm", "color_grading": "llm"}
+    }
+    result = asyncio.run(orchestrator._analyze_cv_segments(segments, frames, llm_config))
+    
+    # 联系表请求 [seg_001-003] [seg_004] [seg_005-006] 每片段一张图；
+    # seg_005 缺项后单独请求，发送场景内的3帧
+    assert sorted(requests) == sorted([3, 1, 2, 3])
+    assert sorted(saved) == list(range(6))
+    assert [s["segment_id"] for s in result["segments"]] == [s["segment_id"] for s in segments]
+    for seg in result["segments"]:
+        assert seg["analyzing"] is False
+        assert [f["value"] for f in seg["features"]] == [seg["segment_id"]]
@@ -0,0 +1,154 @@
+"""URL视频下载器测试（本地HTTP服务器）：缓存与重新验证、断点续传、分段并行、大小上限"""
+import asyncio
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.core.errors import VideoProcessingError
+from app.integrations.downloader import VideoDownloader
+
+
+class _VideoServer:
+    """支持 Range / If-Range / ETag 的测试服务器，可在首个请求中途断开"""
+    
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = '"v1"'
+        self.requests = []  # (Range, 状态码)
+        self.drop_after = None  # 首个完整GET只发送这么多字节后断开
+        self.support_ranges = True
+        
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            
+            def log_message(self, *args):
+                pass
+            
+            def do_GET(self):
+                range_header = self.headers.get("Range")
+                if self.headers.get("If-None-Match") == server.etag:
+                    server.requests.append((range_header, 304))
+                    self.send_response(304)
+                    self.send_header("ETag", server.etag)
+                    self.end_headers()
+                    return
+                
+                body = server.body
+                start, end = 0, len(body) - 1
+                status = 200
+                if range_header and server.support_ranges and self.headers.get("If-Range", server.etag) == server.etag:
+                    first, _, last = range_header[len("bytes="):].partition("-")
+                    start = int(first)
+                    end = int(last) if last else len(body) - 1
+                    status = 206
+                
+                server.requests.append((range_header, status))
+                self.send_response(status)
+                self.send_header("ETag", server.etag)
+                self.send_header("Content-Length", str(end - start + 1))
+                if server.support_ranges:
+                    self.send_header("Accept-Ranges", "bytes")
+                if status == 206:
+                    self.send_header("Content-Range", f"bytes {start}-{end}/{len(body)}")
+                self.end_headers()
+                
+                payload = body[start:end + 1]
+                if server.drop_after is not None and status == 200:
+                    self.wfile.write(payload[:server.drop_after])
+                    self.wfile.flush()
+                    server.drop_after = None
+                    self.close_connection = True
+                    return
+                self.wfile.write(payload)
+        
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/video.mp4"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+    
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    srv = _VideoServer(os.urandom(300_000))
+    yield srv
+    srv.close()
+
+
+def _downloader(tmp_path, **kwargs):
+    options = dict(chunk_size=64 * 1024, parallel_segments=1, max_retries=2, fresh_seconds=3600)
+    options.update(kwargs)
+    return VideoDownloader(tmp_path / "cache", **options)
+
+
+def test_download_then_cache_hit_without_network(server, tmp_path):
+    downloader = _downloader(tmp_path)
+    
+    path = asyncio.run(downloader.fetch(server.url))
+    assert path.read_bytes() == server.body
+    
+    again = asyncio.run(downloader.fetch(server.url))
+    assert again == path
+    assert len(server.requests) == 1
+    assert downloader.stats["hits"] == 1
+
+
+def test_revalidation_uses_etag(server, tmp_path):
+    downloader = _downloader(tmp_path, fresh_seconds=0)
+    asyncio.run(downloader.fetch(server.url))
+    
+    asyncio.run(downloader.fetch(server.url))
+    assert server.requests[-1] == (None, 304)
+    assert downloader.stats["revalidated"] == 1
+    
+    # 内容变化后重新下载
+    server.body = os.urandom(1000)
+    server.etag = '"v2"'
+    path = asyncio.run(downloader.fetch(server.url))
+    assert path.read_bytes() == server.body
+
+
+def test_resumes_after_connection_drop(server, tmp_path):
+    server.drop_after = 100_000
+    downloader = _downloader(tmp_path)
+    
+    path = asyncio.run(downloader.fetch(server.url))
+    
+    assert path.read_bytes() == server.body
+    assert server.requests[-1] == ("bytes=100000-", 206)
+    assert downloader.stats["resumes"] == 1
+
+
+def test_restarts_when_server_ignores_range(server, tmp_path):
+    server.drop_after = 100_000
+    server.support_ranges = False
+    downloader = _downloader(tmp_path)
+    
+    path = asyncio.run(downloader.fetch(server.url))
+    
+    assert path.read_bytes() == server.body
+    assert downloader.stats["resumes"] == 0
+
+
+def test_parallel_segments(server, tmp_path):
+    downloader = _downloader(tmp_path, parallel_segments=4, parallel_min_bytes=1000)
+    
+    path = asyncio.run(downloader.fetch(server.url))
+    
+    assert path.read_bytes() == server.body
+    ranged = [r for r, status in server.requests if status == 206]
+    assert len(ranged) == 4
+    assert "bytes=0-74999" in ranged
+
+
+def test_size_limit(server, tmp_path):
+    downloader = _downloader(tmp_path, max_bytes=1000)
+    
+    with pytest.raises(VideoProcessingError):
+        asyncio.run(downloader.fetch(server.url))
@@ -0,0 +1,61 @@
+"""阻塞任务执行器测试：Job运行期间事件循环保持响应"""
+import asyncio
+import sys
+import time
+
+from app.pipeline.executors import run_cpu_bound, run_subprocess, shutdown_process_pool
+from app.pipeline.steps.scene_detect import detect_scenes
+from benchmarks.synthetic import make_synthetic_video
+
+
+async def _max_heartbeat_gap(work, interval=0.01):
+    """work运行期间，事件循环上心跳任务的最大调度间隔（含结束前的最后一段）"""
+    gaps = []
+    last = time.perf_counter()
+    
+    async def heartbeat():
+        nonlocal last
+        while True:
+            await asyncio.sleep(interval)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+    
+    beat = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0)
+    try:
+        result = await work
+    finally:
+        beat.cancel()
+    gaps.append(time.perf_counter() - last)
+    return result, max(gaps)
+
+
+def test_scene_detection_in_process_pool_keeps_loop_responsive(tmp_path):
+    """场景检测在进程池中执行时，事件循环仍能及时调度其他任务"""
+    video = tmp_path / "video.mp4"
+    make_synthetic_video(video, scene_frames=[90] * 4, size=(640, 360), motion="static")
+    
+    async def main():
+        return await _max_heartbeat_gap(
+            run_cpu_bound(detect_scenes, str(video), tmp_path / "out")
+        )
+    
+    try:
+        segments, max_gap = asyncio.run(main())
+    finally:
+        shutdown_process_pool()
+    
+    assert len(segments) == 4
+    assert max_gap < 0.25
+
+
+def test_run_subprocess_is_non_blocking():
+    """外部命令在异步子进程中执行，不阻塞事件循环"""
+    cmd = [sys.executable, "-c", "import time; time.sleep(0.5); print('done')"]
+    
+    (returncode, stdout, _), max_gap = asyncio.run(_max_heartbeat_gap(run_subprocess(cmd)))
+    
+    assert returncode == 0
+    assert stdout.strip() == "done"
+    assert max_gap < 0.25
@@ -0,0 +1,69 @@
+"""快速场景检测引擎测试"""
+import cv2
+import numpy as np
+import pytest
+
+from app.pipeline.steps.fast_scene_detect import (
+    apply_min_scene_len,
+    detect_scenes_fast,
+    frame_features,
+    pairwise_scores,
+)
+from app.pipeline.steps.scene_detect import detect_scenes
+from benchmarks.synthetic import make_synthetic_video
+
+
+def _cuts(segments):
+    return [s["start_frame"] for s in segments[1:]]
+
+
+def test_batch_scores_match_content_detector_scale():
+    """批量计算的HSV平均差与逐帧计算一致，直方图距离在0~1之间"""
+    rng = np.random.default_rng(1)
+    frames = rng.integers(0, 255, size=(4, 36, 64, 3), dtype=np.uint8)
+    frames[1] = frames[0]
+    
+    hsv, hist = frame_features(frames)
+    content, distance = pairwise_scores(hsv, hist)
+    
+    expected = [
+        np.abs(
+            cv2.cvtColor(frames[i + 1], cv2.COLOR_BGR2HSV).astype(int)
+            - cv2.cvtColor(frames[i], cv2.COLOR_BGR2HSV).astype(int)
+        ).mean()
+        for i in range(3)
+    ]
+    assert np.allclose(content, expected)
+    assert distance[0] == 0
+    assert np.all((distance >= 0) & (distance <= 1))
+    assert np.allclose(hist.sum(axis=1), 1.0)
+
+
+def test_apply_min_scene_len():
+    assert apply_min_scene_len([5, 20, 30, 40, 100], 15, 90) == [20, 40]
+    assert apply_min_scene_len([], 15, 90) == []
+
+
+@pytest.mark.parametrize("sample_rate", [1, 2, 3])
+def test_fast_engine_agrees_with_detect_scenes(tmp_path, sample_rate):
+    """切点与 detect_scenes 一致（误差不超过采样间隔）"""
+    video = tmp_path / "input.mp4"
+    make_synthetic_video(video, scene_frames=[45, 60, 30, 50], size=(640, 360))
+    
+    reference = _cuts(detect_scenes(str(video), tmp_path / "ref"))
+    segments = detect_scenes_fast(str(video), tmp_path / "fast", sample_rate=sample_rate)
+    
+    cuts = _cuts(segments)
+    assert len(cuts) == len(reference) == 3
+    assert all(0 <= c - r < sample_rate for c, r in zip(cuts, reference))
+    assert segments[-1]["end_frame"] == 185
+    assert (tmp_path / "fast" / "scene_keyframes" / "004-keyframe.jpg").exists()
+
+
+def test_fast_engine_respects_min_scene_len(tmp_path):
+    video = tmp_path / "input.mp4"
+    make_synthetic_video(video, scene_frames=[45, 8, 50], size=(640, 360))
+    
+    segments = detect_scenes_fast(str(video), tmp_path, sample_rate=1, min_scene_len=15)
+    
+    assert _cuts(segments) == [45]
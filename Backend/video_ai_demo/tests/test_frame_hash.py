@@ -0,0 +1,84 @@
+"""帧感知哈希与多样性采样测试"""
+import cv2
+import numpy as np
+
+from app.integrations.mm_llm_client import FrameInput, MMHLLMClient
+from app.pipeline.frame_hash import dhash_file, dhash_image, format_hash, select_diverse
+
+
+def _pattern(seed):
+    rng = np.random.default_rng(seed)
+    small = rng.integers(0, 255, size=(8, 9), dtype=np.uint8)
+    return cv2.resize(small, (180, 160), interpolation=cv2.INTER_NEAREST)
+
+
+def _write_frames(tmp_path, seeds):
+    frames = []
+    for i, seed in enumerate(seeds):
+        path = tmp_path / f"frame_{i:05d}.jpg"
+        cv2.imwrite(str(path), cv2.cvtColor(_pattern(seed), cv2.COLOR_GRAY2BGR))
+        frames.append({"frame_id": f"f_{i:05d}", "ts_ms": i * 500.0, "path": str(path)})
+    return frames
+
+
+def test_dhash_stable_under_resize_and_jpeg(tmp_path):
+    image = _pattern(1)
+    path = tmp_path / "a.jpg"
+    cv2.imwrite(str(path), image, [cv2.IMWRITE_JPEG_QUALITY, 70])
+    
+    assert bin(dhash_image(image) ^ dhash_file(str(path))).count("1") <= 4
+    assert bin(dhash_image(image) ^ dhash_image(_pattern(2))).count("1") > 16
+
+
+def test_select_diverse_collapses_duplicates(tmp_path):
+    """重复画面只选一帧，预算内覆盖所有不同画面，并把哈希缓存到帧索引"""
+    frames = _write_frames(tmp_path, [1, 1, 1, 1, 2, 2, 2, 3, 3, 3])
+    
+    selected = select_diverse(frames, 5)
+    
+    assert len(selected) == 3
+    assert {cv2.imread(f["path"], 0).tobytes()[:64] for f in selected} == {
+        cv2.imread(frames[i]["path"], 0).tobytes()[:64] for i in (0, 4, 7)
+    }
+    assert [f["ts_ms"] for f in selected] == sorted(f["ts_ms"] for f in selected)
+    assert all(isinstance(f["dhash"], str) for f in frames)
+
+
+def test_select_diverse_respects_budget(tmp_path):
+    frames = _write_frames(tmp_path, range(10))
+    
+    assert len(select_diverse(frames, 4)) == 4
+    assert len(select_diverse(frames, 20)) == 10
+
+
+def test_select_diverse_uses_cached_hash():
+    """已缓存哈希的帧不再读取图片（路径不存在也可以采样）"""
+    frames = [
+        FrameInput(ts_ms=i * 100.0, image_path=f"missing_{i}.jpg", dhash=format_hash(h))
+        for i, h in enumerate([0, 0, 0xFFFF_FFFF_FFFF_FFFF, 0xFFFF_FFFF_FFFF_FFFE])
+    ]
+    
+    selected = select_diverse(frames, 4, threshold=2)
+    
+    assert len(selected) == 2
+    assert {int(f.dhash, 16) for f in selected} in (
+        {0, 0xFFFF_FFFF_FFFF_FFFF}, {0, 0xFFFF_FFFF_FFFF_FFFE}
+    )
+
+
+def test_shot_boundary_prompt_lists_frame_times(tmp_path):
+    """去重后的关键帧时间不均匀，提示词需逐帧给出时间戳"""
+    frames = [
+        FrameInput(f["ts_ms"], f["path"])
+        for f in _write_frames(tmp_path, [1, 1, 1, 1, 2, 2, 2, 3, 3, 3])
+    ]
+    client = MMHLLMClient(api_key="test", cache=None)
+    
+    sampled = client._sample_frames(frames, max_frames=20)
+    prompt = client._build_shot_boundary_prompt(frames, sampled)
+    
+    assert len(sampled) == 3
+    assert "视频总时长: 4500.0ms" in prompt
+    assert "提供的关键帧: 3帧" in prompt
+    for i, frame in enumerate(sampled, 1):
+        assert f"第{i}张: {frame.ts_ms:.0f}ms" in prompt
@@ -0,0 +1,59 @@
+"""帧索引测试：与线性扫描结果一致"""
+import random
+
+from app.integrations.mm_llm_client import FrameInput
+from app.pipeline.frame_index import FrameIndex
+
+
+def _frames(count: int, interval_ms: float = 500.0):
+    return [
+        {"frame_id": f"f_{i:05d}", "ts_ms": i * interval_ms, "path": f"frame_{i + 1:05d}.jpg"}
+        for i in range(count)
+    ]
+
+
+def test_nearest_matches_linear_scan():
+    frames = _frames(240)
+    index = FrameIndex(frames)
+    rng = random.Random(0)
+    
+    for target in [-100.0, 0.0, 250.0, 749.9, 750.0, 119_500.0, 200_000.0] + [
+        rng.uniform(0, 120_000) for _ in range(200)
+    ]:
+        expected = min(frames, key=lambda f: abs(f["ts_ms"] - target))
+        assert index.nearest(target) is expected
+    
+    assert FrameIndex([]).nearest(100.0) is None
+
+
+def test_range_and_sample():
+    frames = _frames(20)
+    index = FrameIndex(frames)
+    
+    assert index.range(1000, 2500) == [f for f in frames if 1000 <= f["ts_ms"] <= 2500]
+    assert index.range(2600, 2700) == []
+    assert index.range(3000, 1000) == []
+    
+    sampled = index.sample(5, 0, 9500)
+    assert [f["ts_ms"] for f in sampled] == [0, 2000, 4000, 6000, 8000]
+    assert index.sample(5, 1000, 2000) == frames[2:5]
+
+
+def test_sequence_compat_and_unsorted_input():
+    frames = _frames(6)
+    shuffled = frames[3:] + frames[:3]
+    index = FrameIndex(shuffled)
+    
+    assert len(index) == 6
+    assert list(index) == frames
+    assert index[0] is frames[0] and index[-1] is frames[-1]
+    assert index[:2] == frames[:2]
+    assert FrameIndex.of(index) is index
+
+
+def test_frame_inputs():
+    inputs = [FrameInput(ts_ms=i * 100.0, image_path=f"{i}.jpg") for i in range(10)]
+    index = FrameIndex(inputs)
+    
+    assert index.range(200, 400) == inputs[2:5]
+    assert index.nearest(449) is inputs[4]
@@ -0,0 +1,58 @@
+"""LLM图片载荷准备测试"""
+import base64
+
+import cv2
+import numpy as np
+
+from app.integrations.image_prep import ImageProfile, prepare_image_url, _encode_data_url
+
+
+def _decode_data_url(data_url: str):
+    header, payload = data_url.split(",", 1)
+    buffer = np.frombuffer(base64.b64decode(payload), dtype=np.uint8)
+    return header, cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+
+
+def _write_frame(path, width=1920, height=1080):
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 255, size=(height, width, 3), dtype=np.uint8)
+    cv2.imwrite(str(path), image, [cv2.IMWRITE_JPEG_QUALITY, 95])
+
+
+def test_downscales_to_max_edge(tmp_path):
+    """最长边被缩放到max_edge，载荷变小"""
+    frame = tmp_path / "frame.jpg"
+    _write_frame(frame)
+    
+    data_url = prepare_image_url(str(frame), ImageProfile(max_edge=640, quality=70, format="jpeg"))
+    header, image = _decode_data_url(data_url)
+    
+    assert header == "data:image/jpeg;base64"
+    assert image.shape[:2] == (360, 640)
+    assert len(data_url) < frame.stat().st_size
+
+
+def test_webp_output(tmp_path):
+    """可选转为WebP"""
+    frame = tmp_path / "frame.jpg"
+    _write_frame(frame)
+    
+    data_url = prepare_image_url(str(frame), ImageProfile(max_edge=512, quality=70, format="webp"))
+    assert data_url.startswith("data:image/webp;base64,")
+
+
+def test_memoized_per_file_version(tmp_path):
+    """同一文件版本只编码一次，文件变化后重新编码"""
+    frame = tmp_path / "frame.jpg"
+    _write_frame(frame, 800, 600)
+    profile = ImageProfile(max_edge=256, quality=70, format="jpeg")
+    
+    _encode_data_url.cache_clear()
+    first = prepare_image_url(str(frame), profile)
+    second = prepare_image_url(str(frame), profile)
+    assert first == second
+    assert _encode_data_url.cache_info().hits == 1
+    
+    _write_frame(frame, 400, 300)
+    prepare_image_url(str(frame), profile)
+    assert _encode_data_url.cache_info().misses == 2
@@ -0,0 +1,86 @@
+"""Job计数汇总表与仪表板缓存测试"""
+from datetime import datetime, timedelta
+
+from app.core.cache import TTLCache, dashboard_cache
+from app.db.models import Job, JobMode, JobStatus
+from app.db.repo import JobCounterRepository, JobRepository
+
+
+def test_counters_follow_create_transition_and_delete(db):
+    repo = JobRepository(db)
+    yesterday = datetime.utcnow() - timedelta(days=1)
+    
+    for i in range(3):
+        repo.create(Job(id=f"job_{i}", mode=JobMode.LEARN, status=JobStatus.QUEUED))
+    repo.create(Job(id="job_old", mode=JobMode.LEARN, status=JobStatus.QUEUED, created_at=yesterday))
+    
+    repo.update_status("job_0", JobStatus.RUNNING)
+    repo.update_status("job_0", JobStatus.SUCCEEDED)
+    repo.update_status("job_1", JobStatus.FAILED)
+    repo.update_status("job_1", JobStatus.FAILED)  # 状态未变化不重复计数
+    repo.delete("job_2")
+    
+    counters = JobCounterRepository(db)
+    assert counters.count_by_status() == {
+        JobStatus.QUEUED: 1,
+        JobStatus.RUNNING: 0,
+        JobStatus.SUCCEEDED: 1,
+        JobStatus.FAILED: 1
+    }
+    assert counters.count_by_day(yesterday.date()) == {
+        yesterday.date(): 1,
+        datetime.utcnow().date(): 2
+    }
+    assert counters.count_by_day(datetime.utcnow().date()) == {datetime.utcnow().date(): 2}
+    
+    # 从jobs表重建的结果与增量维护一致
+    expected = counters.count_by_status()
+    assert counters.rebuild() == 3
+    assert counters.count_by_status() == expected
+
+
+def test_rebuild_counts_jobs_written_without_repository(db):
+    db.add_all([
+        Job(id="job_a", mode=JobMode.LEARN, status=JobStatus.SUCCEEDED),
+        Job(id="job_b", mode=JobMode.LEARN, status=JobStatus.SUCCEEDED)
+    ])
+    db.flush()
+    
+    counters = JobCounterRepository(db)
+    assert counters.is_empty()
+    counters.rebuild()
+    assert not counters.is_empty()
+    assert JobRepository(db).count_by_status()[JobStatus.SUCCEEDED] == 2
+
+
+def test_status_change_invalidates_dashboard_cache(db):
+    repo = JobRepository(db)
+    repo.create(Job(id="job_a", mode=JobMode.LEARN, status=JobStatus.QUEUED))
+    
+    dashboard_cache.set("stats", {"cached": True})
+    if dashboard_cache.ttl > 0:
+        assert dashboard_cache.get("stats") == {"cached": True}
+    repo.update_status("job_a", JobStatus.RUNNING)
+    # 提交前并发请求缓存的仍是旧计数，提交后才失效
+    dashboard_cache.set("stats", {"cached": True})
+    db.commit()
+    assert dashboard_cache.get("stats") is None
+    
+    # 回滚的改动不影响缓存
+    dashboard_cache.set("stats", {"cached": True})
+    repo.update_status("job_a", JobStatus.FAILED)
+    db.rollback()
+    if dashboard_cache.ttl > 0:
+        assert dashboard_cache.get("stats") == {"cached": True}
+    db.commit()
+    assert dashboard_cache.get("stats") == ({"cached": True} if dashboard_cache.ttl > 0 else None)
+    dashboard_cache.clear()
+
+
+def test_ttl_cache_expires():
+    cache = TTLCache(ttl=0.01)
+    assert cache.get_or_set("key", lambda: 1) == 1
+    assert cache.get_or_set("key", lambda: 2) == 1
+    
+    cache._items["key"] = (0.0, 1)
+    assert cache.get_or_set("key", lambda: 2) == 2
@@ -0,0 +1,91 @@
+"""Job事件总线测试：单一上游扇出、增量片段、慢订阅者重新同步"""
+import asyncio
+
+from app.pipeline.events import JobEventBus
+
+
+def _segments(count, analyzed=()):
+    return [
+        {
+            "segment_id": f"seg_{i + 1:03d}",
+            "features": ["f"] if i in analyzed else [],
+            "analyzing": i not in analyzed
+        }
+        for i in range(count)
+    ]
+
+
+def _drain(queue):
+    events = []
+    while not queue.empty():
+        events.append(queue.get_nowait())
+    return events
+
+
+def test_one_publish_fans_out_to_all_subscribers():
+    """同一事件只发布一次，所有订阅者都能收到"""
+    async def main():
+        bus = JobEventBus()
+        with bus.subscribe("job_1") as first, bus.subscribe("job_1") as second:
+            bus.publish_progress("job_1", "scene_detection", 25, "检测中")
+            assert _drain(first) == _drain(second)
+            assert bus.subscriber_count("job_1") == 2
+        assert bus.subscriber_count("job_1") == 0
+    
+    asyncio.run(main())
+
+
+def test_segment_update_carries_only_that_segment():
+    """单个片段更新只推送该片段及其位置，快照随之更新"""
+    async def main():
+        bus = JobEventBus()
+        with bus.subscribe("job_1") as queue:
+            bus.publish_segments("job_1", _segments(4))
+            (full,) = _drain(queue)
+            assert full["type"] == "segments"
+            assert full["total"] == 4
+            
+            analyzed = _segments(4, analyzed={2})[2]
+            bus.publish_segment("job_1", 2, analyzed, 4)
+            (update,) = _drain(queue)
+            assert update["type"] == "segment_update"
+            assert update["total"] == 4
+            assert [(s["segment_id"], s["index"]) for s in update["segments"]] == [("seg_003", 2)]
+        
+        (snapshot,) = bus.snapshot("job_1")
+        assert snapshot["segments"][2] == analyzed
+    
+    asyncio.run(main())
+
+
+def test_snapshot_and_terminal_event():
+    """新订阅者可获取全量快照；终态事件发布后释放通道"""
+    async def main():
+        bus = JobEventBus()
+        bus.publish_progress("job_1", "feature_analysis", 60, "分析中")
+        bus.publish_segments("job_1", _segments(3, analyzed={0}))
+        
+        snapshot = bus.snapshot("job_1")
+        assert [e["type"] for e in snapshot] == ["progress", "segments"]
+        assert snapshot[1]["total"] == 3
+        
+        with bus.subscribe("job_1") as queue:
+            bus.publish_terminal("job_1", {"type": "complete", "status": "succeeded"})
+            assert [e["type"] for e in _drain(queue)] == ["complete"]
+        assert bus.snapshot("job_1") == []
+    
+    asyncio.run(main())
+
+
+def test_slow_subscriber_is_resynced():
+    """订阅者队列满时丢弃积压，改为通知重新同步"""
+    async def main():
+        bus = JobEventBus(queue_size=2)
+        with bus.subscribe("job_1") as queue:
+            for percent in range(5):
+                bus.publish_progress("job_1", "feature_analysis", percent, "")
+            events = _drain(queue)
+            assert events[0] == {"type": "resync"}
+            assert len(events) <= 2
+    
+    asyncio.run(main())
@@ -0,0 +1,109 @@
+"""创建Job接口测试：请求中的选项完整传到队列中的Job配置"""
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import routes_jobs
+from app.core.config import settings
+from app.db.models import JobQueueItem
+from app.integrations.mm_llm_client import SegmentBatching
+from app.pipeline import job_queue as job_queue_module
+from app.pipeline.adaptive_sampling import resolve_mode
+
+
+@pytest.fixture
+def client(get_db, monkeypatch):
+    monkeypatch.setattr(routes_jobs, "get_db", get_db)
+    monkeypatch.setattr(job_queue_module, "get_db", get_db)
+    app = FastAPI()
+    app.include_router(routes_jobs.router)
+    return TestClient(app)
+
+
+def _post(client, options=None):
+    body = {"mode": "learn", "target_video": {"source": {"type": "url", "url": "http://x/v.mp4"}}}
+    if options is not None:
+        body["options"] = options
+    return client.post("/v1/video-analysis/jobs", json=body)
+
+
+def _create_job(client, get_db, options=None):
+    """POST /jobs，返回写入队列、将交给编排器执行的Job配置"""
+    response = _post(client, options)
+    assert response.status_code == 200, response.text
+    job_id = response.json()["job_id"]
+    with get_db() as db:
+        item = db.query(JobQueueItem).filter(JobQueueItem.job_id == job_id).one()
+        return json.loads(item.config_json)
+
+
+def test_frame_extract_mode(client, get_db, monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.frame_sampling_mode", "fixed")
+    
+    config = _create_job(client, get_db, {"frame_extract": {"mode": "adaptive"}})
+    assert resolve_mode(config["options"]["frame_extract"].get("mode")) == "adaptive"
+    
+    config = _create_job(client, get_db)
+    assert resolve_mode(config["options"]["frame_extract"].get("mode")) == "fixed"
+    
+    assert _post(client, {"frame_extract": {"mode": "dense"}}).status_code == 422
+
+
+def test_llm_batching_options(client, get_db, monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.llm_contact_sheet", True)
+    monkeypatch.setattr("app.core.config.settings.llm_batch_segments", 1)
+    
+    config = _create_job(client, get_db, {"llm": {
+        "contact_sheet": False, "batch_segments": 4, "batch_max_segment_ms": 2500
+    }})
+    assert SegmentBatching.from_config(config["options"]["llm"]) == (False, 4, 2500.0)
+    
+    # 未指定时使用服务端默认
+    config = _create_job(client, get_db)
+    assert SegmentBatching.from_config(config["options"]["llm"]) == (
+        True, 1, settings.llm_batch_max_segment_ms
+    )
+    
+    assert _post(client, {"llm": {"batch_segments": 0}}).status_code == 422
+
+
+def test_scene_detection_options(client, get_db):
+    config = _create_job(client, get_db, {"scene_detection": {
+        "engine": "fast", "sample_rate": 3, "decode_width": 240, "hist_threshold": 0.4
+    }})
+    assert config["options"]["scene_detection"] == {
+        "engine": "fast", "sample_rate": 3, "decode_width": 240, "hist_threshold": 0.4
+    }
+    
+    # 未指定的项不写入，编排器取服务端默认
+    config = _create_job(client, get_db)
+    assert config["options"]["scene_detection"] == {}
+    
+    assert _post(client, {"scene_detection": {"engine": "pyscenedetect"}}).status_code == 422
+    assert _post(client, {"scene_detection": {"sample_rate": 0}}).status_code == 422
+
+
+def test_optical_flow_options(client, get_db):
+    flow = {
+        "engine": "flow", "flow_method": "dis_ultrafast", "flow_threshold": 12.5,
+        "decode_width": 0, "sample_rate": 4, "grid_step": 8
+    }
+    
+    config = _create_job(client, get_db, {"scene_detection": flow})
+    
+    assert config["options"]["scene_detection"] == flow
+    assert _post(client, {"scene_detection": {"flow_method": "lucas_kanade"}}).status_code == 422
+
+
+@pytest.mark.parametrize("field", ["local_camera_motion_confidence", "local_color_confidence"])
+def test_local_confidence_thresholds(client, get_db, field):
+    config = _create_job(client, get_db, {"llm": {field: 0.9}})
+    assert config["options"]["llm"][field] == 0.9
+    
+    # None 时编排器使用 settings 中的同名阈值
+    config = _create_job(client, get_db)
+    assert config["options"]["llm"][field] is None
+    
+    assert _post(client, {"llm": {field: 1.5}}).status_code == 422
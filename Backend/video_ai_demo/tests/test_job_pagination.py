@@ -0,0 +1,59 @@
+"""Job列表游标分页测试"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import inspect
+
+from app.core.errors import ValidationError
+from app.db.models import Job, JobMode, JobStatus
+from app.db.repo import JobRepository
+
+
+@pytest.fixture
+def job_repo(db):
+    repo = JobRepository(db)
+    
+    base = datetime(2024, 1, 1)
+    for i in range(7):
+        # job_3 与 job_4 创建时间相同，靠 id 区分顺序
+        created_at = base + timedelta(minutes=min(i, 3) if i < 5 else i)
+        repo.create(Job(
+            id=f"job_{i}",
+            mode=JobMode.LEARN,
+            status=JobStatus.SUCCEEDED if i % 2 else JobStatus.QUEUED,
+            result_json='{"target": {}}',
+            created_at=created_at
+        ))
+    db.commit()
+    db.expunge_all()
+    return repo
+
+
+def _walk(repo, **kwargs):
+    ids, cursor = [], None
+    while True:
+        jobs, cursor = repo.list_page(limit=2, cursor=cursor, **kwargs)
+        ids.extend(job.id for job in jobs)
+        if cursor is None:
+            return ids
+
+
+def test_cursor_pages_cover_all_jobs_in_order(job_repo):
+    expected = [job.id for job in job_repo.list_history(limit=100)]
+    assert _walk(job_repo) == expected
+    assert expected[:4] == ["job_6", "job_5", "job_4", "job_3"]
+
+
+def test_cursor_pages_with_status_filter(job_repo):
+    assert _walk(job_repo, status=JobStatus.SUCCEEDED) == ["job_5", "job_3", "job_1"]
+
+
+def test_list_does_not_load_result_blobs(job_repo):
+    jobs, _ = job_repo.list_page(limit=1)
+    assert "result_json" in inspect(jobs[0]).unloaded
+    assert "partial_result_json" in inspect(jobs[0]).unloaded
+
+
+def test_invalid_cursor(job_repo):
+    with pytest.raises(ValidationError):
+        job_repo.list_page(cursor="not-a-cursor")
@@ -0,0 +1,171 @@
+"""持久化Job队列测试：并发上限、优先级、背压与重启恢复"""
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from app.core.errors import QueueFullError
+from app.db.models import Job, JobMode, JobQueueItem, JobStatus
+from app.pipeline import job_queue as job_queue_module
+from app.pipeline.job_queue import JobQueue
+
+
+@pytest.fixture
+def session_factory(get_db, monkeypatch):
+    """每个测试使用独立的SQLite数据库"""
+    monkeypatch.setattr(job_queue_module, "get_db", get_db)
+    return get_db
+
+
+def _create_job(get_db, job_id: str, status: JobStatus = JobStatus.QUEUED):
+    with get_db() as db:
+        db.add(Job(id=job_id, mode=JobMode.LEARN, status=status))
+
+
+def _job_status(get_db, job_id: str) -> JobStatus:
+    with get_db() as db:
+        return db.query(Job).filter(Job.id == job_id).one().status
+
+
+async def _drain(queue: JobQueue, expected: int, done: list):
+    await queue.start()
+    try:
+        for _ in range(200):
+            if len(done) >= expected:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await queue.stop()
+
+
+def test_priority_ordering_and_bounded_concurrency(session_factory):
+    """高优先级先执行，同优先级FIFO，同时执行数不超过并发上限"""
+    running = 0
+    peak = 0
+    done = []
+    
+    async def runner(job_id, job_config):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+        done.append(job_id)
+    
+    queue = JobQueue(runner, concurrency=1, max_depth=10)
+    for job_id, priority in [("job_a", 0), ("job_b", 0), ("job_c", 5)]:
+        _create_job(session_factory, job_id)
+        queue.enqueue(job_id, {"mode": "learn"}, priority)
+    
+    asyncio.run(_drain(queue, 3, done))
+    
+    assert done == ["job_c", "job_a", "job_b"]
+    assert peak == 1
+    assert queue.depth() == 0
+
+
+def test_fifo_ordering_ignores_priority(session_factory):
+    done = []
+    
+    async def runner(job_id, job_config):
+        done.append(job_id)
+    
+    queue = JobQueue(runner, concurrency=2, max_depth=10, ordering="fifo")
+    for job_id, priority in [("job_a", 0), ("job_b", 9)]:
+        _create_job(session_factory, job_id)
+        queue.enqueue(job_id, {"mode": "learn"}, priority)
+    
+    asyncio.run(_drain(queue, 2, done))
+    
+    assert done == ["job_a", "job_b"]
+
+
+def test_check_capacity_raises_when_full(session_factory):
+    """排队数达到上限时拒绝入队"""
+    async def runner(job_id, job_config):
+        pass
+    
+    queue = JobQueue(runner, concurrency=1, max_depth=2)
+    for job_id in ["job_a", "job_b"]:
+        _create_job(session_factory, job_id)
+        queue.enqueue(job_id, {"mode": "learn"})
+    
+    with pytest.raises(QueueFullError) as exc_info:
+        queue.check_capacity()
+    assert exc_info.value.details["retry_after"] > 0
+
+
+def test_recover_requeues_interrupted_jobs(session_factory):
+    """重启时：已领取未完成的Job重新执行，无队列项的running Job置为失败"""
+    _create_job(session_factory, "job_interrupted", JobStatus.RUNNING)
+    _create_job(session_factory, "job_orphan", JobStatus.RUNNING)
+    with session_factory() as db:
+        db.add(JobQueueItem(
+            job_id="job_interrupted",
+            config_json='{"mode": "learn"}',
+            attempts=1,
+            claimed_at=datetime.utcnow()
+        ))
+    
+    done = []
+    
+    async def runner(job_id, job_config):
+        assert job_config == {"mode": "learn"}
+        done.append(job_id)
+    
+    queue = JobQueue(runner, concurrency=1, max_depth=10)
+    asyncio.run(_drain(queue, 1, done))
+    
+    assert done == ["job_interrupted"]
+    assert _job_status(session_factory, "job_orphan") == JobStatus.FAILED
+
+
+def test_deleted_job_does_not_stop_worker(session_factory):
+    """删除排队中的Job会移除队列项；遗留的孤立队列项被跳过，后续Job照常执行"""
+    from app.db.repo import JobRepository
+    
+    done = []
+    
+    async def runner(job_id, job_config):
+        done.append(job_id)
+    
+    queue = JobQueue(runner, concurrency=1, max_depth=10)
+    for job_id in ("job_deleted", "job_orphan_item", "job_next"):
+        _create_job(session_factory, job_id)
+        queue.enqueue(job_id, {"mode": "learn"})
+    
+    with session_factory() as db:
+        assert JobRepository(db).delete("job_deleted")
+        assert db.query(JobQueueItem).filter(JobQueueItem.job_id == "job_deleted").count() == 0
+        # 模拟旧版本删除Job后遗留的队列项
+        db.query(Job).filter(Job.id == "job_orphan_item").delete()
+    
+    asyncio.run(_drain(queue, 1, done))
+    
+    assert done == ["job_next"]
+    with session_factory() as db:
+        assert db.query(JobQueueItem).count() == 0
+
+
+def test_enqueue_during_empty_claim_wakes_worker(session_factory, monkeypatch):
+    """空领取与等待之间入队的Job立即执行，不必等到轮询超时"""
+    monkeypatch.setattr(job_queue_module.settings, "job_queue_poll_interval", 30.0)
+    done = []
+    
+    async def runner(job_id, job_config):
+        done.append(job_id)
+    
+    queue = JobQueue(runner, concurrency=1, max_depth=10)
+    _create_job(session_factory, "job_late")
+    claim_next = queue._claim_next
+    
+    def claim_then_enqueue():
+        claimed = claim_next()
+        if claimed is None and not done:
+            queue.enqueue("job_late", {"mode": "learn"})
+        return claimed
+    
+    monkeypatch.setattr(queue, "_claim_next", claim_then_enqueue)
+    asyncio.run(_drain(queue, 1, done))
+    
+    assert done == ["job_late"]
@@ -0,0 +1,26 @@
+"""片段表测试：逐行更新与按顺序组装"""
+from app.db.models import Job, JobMode, JobSegment
+from app.db.repo import JobRepository, JobSegmentRepository
+
+
+def test_upsert_updates_single_row_and_keeps_order(db):
+    db.add(Job(id="job_1", mode=JobMode.LEARN))
+    repo = JobSegmentRepository(db)
+    
+    repo.replace_all("job_1", [
+        {"segment_id": f"seg_{i:03d}", "features": [], "analyzing": True}
+        for i in range(1, 4)
+    ])
+    repo.upsert("job_1", 1, {"segment_id": "seg_002", "features": ["f"], "analyzing": False})
+    db.commit()
+    
+    segments = repo.list_segments("job_1")
+    assert [s["segment_id"] for s in segments] == ["seg_001", "seg_002", "seg_003"]
+    assert [s["analyzing"] for s in segments] == [True, False, True]
+    assert segments[1]["features"] == ["f"]
+    assert db.query(JobSegment).count() == 3
+    
+    # 删除Job时级联删除片段
+    JobRepository(db).delete("job_1")
+    db.commit()
+    assert db.query(JobSegment).count() == 0
@@ -0,0 +1,57 @@
+"""Job结果摘要列测试"""
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models import Base, Job, JobMode, JobStatus
+from app.db.repo import JobRepository, compute_result_summary
+
+
+def _result(*segment_categories, end_ms=3000.0):
+    return {
+        "target": {
+            "detection_method": "cv",
+            "segments": [
+                {
+                    "end_ms": end_ms * (i + 1) / len(segment_categories),
+                    "features": [{"category": c} for c in categories]
+                }
+                for i, categories in enumerate(segment_categories)
+            ]
+        }
+    }
+
+
+def test_compute_result_summary():
+    summary = compute_result_summary(
+        _result(["camera_motion", "lighting"], ["lighting"]),
+        {"hookScore": 82}
+    )
+    assert summary == {
+        "duration_ms": 3000.0,
+        "segment_count": 2,
+        "hook_score": 82,
+        "detection_method": "cv",
+        "camera_motion_count": 1,
+        "lighting_count": 2,
+        "color_grading_count": 0
+    }
+
+
+def test_summary_totals_aggregates_succeeded_jobs(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'summary.db'}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    repo = JobRepository(db)
+    
+    for job_id, status in [("job_1", JobStatus.SUCCEEDED), ("job_2", JobStatus.SUCCEEDED), ("job_3", JobStatus.FAILED)]:
+        db.add(Job(id=job_id, mode=JobMode.LEARN, status=status))
+    db.flush()
+    repo.save_result_summary("job_1", _result(["lighting"], end_ms=1000.0), {"hookScore": 70})
+    repo.save_result_summary("job_2", _result(["color_grading", "lighting"], end_ms=2000.0), {"hookScore": 90})
+    repo.save_result_summary("job_3", _result(["lighting"], end_ms=5000.0))
+    
+    assert repo.summary_totals(JobStatus.SUCCEEDED) == {
+        "total_duration_ms": 3000.0,
+        "total_features": 3,
+        "avg_hook_score": 80.0
+    }
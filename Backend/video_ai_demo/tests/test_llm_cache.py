@@ -0,0 +1,101 @@
+"""LLM响应缓存测试"""
+import asyncio
+import json
+import time
+
+import httpx
+
+from app.integrations.llm_cache import LLMResponseCache
+from app.integrations.mm_llm_client import MMHLLMClient
+
+
+def _make_cache(tmp_path, max_bytes=1024 * 1024, ttl_seconds=3600):
+    return LLMResponseCache(
+        tmp_path / "llm_cache.db",
+        max_bytes=max_bytes,
+        ttl_seconds=ttl_seconds
+    )
+
+
+def test_key_depends_on_frame_content(tmp_path):
+    """key由图片内容决定，而不是文件路径"""
+    frame_a = tmp_path / "a.jpg"
+    frame_b = tmp_path / "b.jpg"
+    frame_a.write_bytes(b"frame-bytes")
+    frame_b.write_bytes(b"frame-bytes")
+    
+    key_a = LLMResponseCache.make_key("model", "prompt", [str(frame_a)])
+    key_b = LLMResponseCache.make_key("model", "prompt", [str(frame_b)])
+    assert key_a == key_b
+    
+    frame_b.write_bytes(b"other-bytes")
+    assert LLMResponseCache.make_key("model", "prompt", [str(frame_b)]) != key_a
+    assert LLMResponseCache.make_key("other", "prompt", [str(frame_a)]) != key_a
+
+
+def test_hit_miss_counters(tmp_path):
+    """命中与未命中计数"""
+    cache = _make_cache(tmp_path)
+    
+    assert cache.get("k1") is None
+    cache.set("k1", "model", "response")
+    assert cache.get("k1") == "response"
+    
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_ttl_expiry(tmp_path):
+    """过期条目视为未命中"""
+    cache = _make_cache(tmp_path, ttl_seconds=0.01)
+    cache.set("k1", "model", "response")
+    time.sleep(0.05)
+    assert cache.get("k1") is None
+
+
+def test_lru_eviction_by_size(tmp_path):
+    """超出容量时淘汰最久未访问的条目"""
+    cache = _make_cache(tmp_path, max_bytes=25)
+    
+    cache.set("k1", "model", "x" * 10)
+    cache.set("k2", "model", "y" * 10)
+    # 访问k1，使k2成为最久未访问
+    assert cache.get("k1") is not None
+    cache.set("k3", "model", "z" * 10)
+    
+    assert cache.get("k2") is None
+    assert cache.get("k1") == "x" * 10
+    assert cache.get("k3") == "z" * 10
+    assert cache.stats()["evictions"] == 1
+
+
+def test_client_caches_only_parsed_replies(tmp_path):
+    """格式错误的回复不写入缓存，下次重新请求；解析成功的回复才会被重放"""
+    replies = iter([
+        '{"title": "截断',
+        json.dumps({"title": "标题", "learning_points": ["要点"]}, ensure_ascii=False),
+    ])
+    requests = []
+    
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={"choices": [{"message": {"content": next(replies)}}]})
+    
+    cache = _make_cache(tmp_path)
+    client = MMHLLMClient(
+        api_key="test",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        cache=cache
+    )
+    
+    first = asyncio.run(client.summarize_video_analysis([], 1000))
+    assert first["title"] == "视频分析 - 0个镜头"
+    assert len(requests) == 1
+    
+    second = asyncio.run(client.summarize_video_analysis([], 1000))
+    third = asyncio.run(client.summarize_video_analysis([], 1000))
+    
+    assert second == third == {"title": "标题", "learning_points": ["要点"]}
+    assert len(requests) == 2
+    assert cache.stats()["hits"] == 1
@@ -0,0 +1,86 @@
+"""文件落地测试：reflink/硬链接/软链接/复制的回退顺序与按内容哈希存放"""
+import errno
+import io
+import os
+
+import pytest
+
+from app.pipeline import materialize as materialize_module
+from app.pipeline.materialize import materialize, store_by_content_hash
+
+
+@pytest.fixture
+def src(tmp_path):
+    path = tmp_path / "src" / "video.mp4"
+    path.parent.mkdir()
+    path.write_bytes(b"video-bytes" * 1000)
+    return path
+
+
+def test_default_order_avoids_copy_on_same_filesystem(src, tmp_path):
+    dst = tmp_path / "job" / "input_video.mp4"
+    
+    method = materialize(src, dst)
+    
+    assert method in ("reflink", "hardlink")
+    assert dst.read_bytes() == src.read_bytes()
+    if method == "hardlink":
+        assert os.path.samefile(src, dst)
+    
+    # 再次落地到同一位置不做任何事
+    assert materialize(src, dst, ["hardlink"]) in ("existing", "hardlink")
+
+
+def test_falls_back_when_method_unsupported(src, tmp_path, monkeypatch):
+    def cross_device(*args):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+    
+    monkeypatch.setattr(materialize_module.os, "link", cross_device)
+    
+    assert materialize(src, tmp_path / "a.mp4", ["hardlink", "symlink"]) == "symlink"
+    assert (tmp_path / "a.mp4").is_symlink()
+    
+    assert materialize(src, tmp_path / "b.mp4", ["hardlink", "copy"]) == "copy"
+    assert not os.path.samefile(src, tmp_path / "b.mp4")
+    assert (tmp_path / "b.mp4").read_bytes() == src.read_bytes()
+    
+    with pytest.raises(OSError):
+        materialize(src, tmp_path / "c.mp4", ["hardlink"])
+
+
+def test_durable_skips_symlink(src, tmp_path, monkeypatch):
+    """src 可能被删除时不使用软链接，已有的软链接被替换"""
+    def cross_device(*args):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+    
+    monkeypatch.setattr(materialize_module.os, "link", cross_device)
+    dst = tmp_path / "input_video.mp4"
+    assert materialize(src, dst, ["hardlink", "symlink"]) == "symlink"
+    
+    assert materialize(src, dst, ["hardlink", "symlink"], durable=True) == "copy"
+    
+    src.unlink()
+    assert not dst.is_symlink() and dst.read_bytes() == b"video-bytes" * 1000
+
+
+def test_replaces_existing_destination(src, tmp_path):
+    dst = tmp_path / "key.jpg"
+    dst.write_bytes(b"old")
+    
+    materialize(src, dst, ["copy"])
+    
+    assert dst.read_bytes() == src.read_bytes()
+
+
+def test_store_by_content_hash_deduplicates(tmp_path):
+    store = tmp_path / "uploads"
+    
+    path_a, sha_a, new_a = store_by_content_hash(io.BytesIO(b"same"), store, ".mp4", chunk_size=2)
+    path_b, sha_b, new_b = store_by_content_hash(io.BytesIO(b"same"), store, ".mp4")
+    path_c, _, new_c = store_by_content_hash(io.BytesIO(b"other"), store, ".mp4")
+    
+    assert (new_a, new_b, new_c) == (True, False, True)
+    assert path_a == path_b == store / f"{sha_a}.mp4"
+    assert sha_a == sha_b
+    assert path_c != path_a
+    assert sorted(p.name for p in store.iterdir()) == sorted([path_a.name, path_c.name])
@@ -0,0 +1,29 @@
+"""单次解码媒体处理测试"""
+import cv2
+
+from app.pipeline.steps.media_pass import run_media_pass
+from app.pipeline.steps.scene_detect import detect_scenes
+from benchmarks.synthetic import make_synthetic_video
+
+
+def test_media_pass_matches_detect_scenes(tmp_path):
+    """单次解码的场景切分与detect_scenes一致，并产出抽帧和场景关键帧"""
+    video = tmp_path / "input.mp4"
+    make_synthetic_video(video, scene_frames=[45, 45, 45], size=(320, 180), motion="static")
+    
+    legacy = detect_scenes(str(video), tmp_path / "legacy")
+    result = run_media_pass(str(video), tmp_path / "single", tmp_path / "single", fps=2.0)
+    
+    assert [(s["start_frame"], s["end_frame"]) for s in result["segments"]] == [
+        (s["start_frame"], s["end_frame"]) for s in legacy
+    ]
+    assert len(result["segments"]) == 3
+    
+    # 4.5秒视频按2fps采样
+    assert len(result["frames_index"]) == 9
+    assert all(cv2.imread(f["path"]) is not None for f in result["frames_index"])
+    assert (tmp_path / "single" / "frames_index.json").exists()
+    
+    assert [p.split("/")[-1] for p in result["scene_keyframes"]] == [
+        "001-keyframe.jpg", "002-keyframe.jpg", "003-keyframe.jpg"
+    ]
@@ -0,0 +1,52 @@
+"""光流法场景检测测试"""
+import pytest
+
+from app.core.errors import VideoProcessingError
+from app.pipeline.steps.scene_detect import detect_scenes_with_optical_flow
+from benchmarks.synthetic import make_synthetic_video
+
+
+# 合成视频镜头内平移4像素/帧（各算法幅度不超过4.2），切点处幅度在6.5以上
+THRESHOLD = 5.0
+
+
+def _cuts(segments):
+    return [s["start_frame"] for s in segments[1:]]
+
+
+@pytest.fixture(scope="module")
+def video(tmp_path_factory):
+    path = tmp_path_factory.mktemp("flow") / "input.mp4"
+    make_synthetic_video(path, scene_frames=[45, 30, 36], size=(320, 180))
+    return str(path)
+
+
+@pytest.fixture(scope="module")
+def reference(video, tmp_path_factory):
+    """原始算法：原始分辨率逐帧 Farneback，全部像素统计幅度"""
+    return detect_scenes_with_optical_flow(
+        video, tmp_path_factory.mktemp("ref"), flow_threshold=THRESHOLD,
+        method="farneback", decode_width=0, sample_rate=1, grid_step=1
+    )
+
+
+@pytest.mark.parametrize("method,sample_rate", [
+    ("farneback", 3),
+    ("dis_ultrafast", 1),
+    ("dis_ultrafast", 4),
+    ("dis_fast", 2),
+])
+def test_fast_settings_keep_decisions(video, reference, tmp_path, method, sample_rate):
+    """缩小画面、跳帧粗查、网格统计和DIS光流下，切点与原始算法逐帧一致"""
+    segments = detect_scenes_with_optical_flow(
+        video, tmp_path, flow_threshold=THRESHOLD,
+        method=method, decode_width=160, sample_rate=sample_rate, grid_step=4
+    )
+    
+    assert _cuts(reference) == [45, 75]
+    assert segments == reference
+
+
+def test_unknown_method(video, tmp_path):
+    with pytest.raises(VideoProcessingError):
+        detect_scenes_with_optical_flow(video, tmp_path, method="lucas_kanade")
@@ -0,0 +1,93 @@
+"""Pipeline编排器测试：场景特征分析的并发与顺序"""
+import asyncio
+
+import app.pipeline.orchestrator as orchestrator_module
+from app.db.models import Artifact, ArtifactType, Asset, AssetRole, Job, JobMode, JobSegment
+from app.db.repo import JobSegmentRepository
+from app.pipeline.orchestrator import PipelineOrchestrator
+
+
+def _make_segments(count: int):
+    return [
+        {
+            "segment_id": f"seg_{i + 1:03d}",
+            "start_ms": i * 1000.0,
+            "end_ms": (i + 1) * 1000.0
+        }
+        for i in range(count)
+    ]
+
+
+def test_analyze_cv_segments_bounded_concurrency_keeps_order(monkeypatch):
+    """并发数受限，每个场景只写入一次，结果按场景顺序输出"""
+    
+    orchestrator = PipelineOrchestrator("job_test", {"mode": "learn"})
+    segments = _make_segments(6)
+    
+    running = 0
+    peak = 0
+    saved_segments = []
+    
+    async def fake_analyze(segment, frames_index, llm_config, client):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        # 后面的场景先完成，打乱完成顺序
+        await asyncio.sleep(0.01 * (6 - int(segment["segment_id"][-3:])))
+        running -= 1
+        return {**segment, "features": [], "analyzing": False}
+    
+    monkeypatch.setattr(orchestrator, "_analyze_single_cv_segment", fake_analyze)
+    monkeypatch.setattr(orchestrator, "_update_progress", lambda *args: None)
+    monkeypatch.setattr(
+        orchestrator,
+        "_save_segment",
+        lambda index, segment, total: saved_segments.append((index, segment["segment_id"], total))
+    )
+    
+    result = asyncio.run(
+        orchestrator._analyze_cv_segments(segments, [], {"max_concurrency": 2})
+    )
+    
+    assert peak == 2
+    assert [s["segment_id"] for s in result["segments"]] == [
+        s["segment_id"] for s in segments
+    ]
+    assert sorted(saved_segments) == [
+        (i, s["segment_id"], len(segments)) for i, s in enumerate(segments)
+    ]
+
+
+def test_ingest_asset_rerun_reuses_asset(get_db, monkeypatch):
+    """崩溃恢复后重跑：复用已有Asset，清掉上次的产物和片段"""
+    durations = iter([1000.0, 2000.0])
+    
+    async def fake_ingest(source_type, source_url, source_path, output_dir):
+        return {
+            "local_path": str(output_dir / "video.mp4"), "duration_ms": next(durations),
+            "width": 640, "height": 360, "fps": 25.0, "codec": "h264"
+        }
+    
+    monkeypatch.setattr(orchestrator_module, "get_db", get_db)
+    monkeypatch.setattr(orchestrator_module, "ingest_video", fake_ingest)
+    with get_db() as db:
+        db.add(Job(id="job_rerun", mode=JobMode.LEARN))
+    
+    orchestrator = PipelineOrchestrator("job_rerun", {"mode": "learn"})
+    video = {"source": {"type": "file", "path": "/tmp/video.mp4"}}
+    asyncio.run(orchestrator._ingest_asset(video, AssetRole.TARGET))
+    with get_db() as db:
+        JobSegmentRepository(db).replace_all("job_rerun", [{"segment_id": "seg_001"}])
+        db.add(Artifact(
+            id="art_1", job_id="job_rerun", artifact_type=ArtifactType.KEYFRAME,
+            asset_role="target"
+        ))
+    
+    result = asyncio.run(orchestrator._ingest_asset(video, AssetRole.TARGET))
+    
+    assert result["asset_id"] == "job_rerun_target"
+    with get_db() as db:
+        assets = db.query(Asset).all()
+        assert [(a.id, a.duration_ms) for a in assets] == [("job_rerun_target", 2000.0)]
+        assert db.query(Artifact).count() == 0
+        assert db.query(JobSegment).count() == 0
@@ -0,0 +1,53 @@
+"""分段并行场景检测测试"""
+import asyncio
+
+from app.core.config import settings
+from app.pipeline.steps.parallel_scene_detect import (
+    detect_scenes_parallel,
+    merge_chunk_candidates,
+    plan_chunks,
+)
+from app.pipeline.steps.scene_detect import detect_scenes
+from benchmarks.synthetic import make_synthetic_video
+
+
+def test_plan_chunks():
+    assert plan_chunks(205, 3, 10) == [(0, 68), (68, 136), (136, None)]
+    # 每段至少 min_chunk_frames 帧
+    assert plan_chunks(205, 8, 100) == [(0, 102), (102, None)]
+    assert plan_chunks(50, 4, 100) == [(0, None)]
+
+
+def test_merge_dedups_overlap_and_applies_min_scene_len():
+    chunk_results = [
+        {"start_frame": 0, "end_frame": 100, "candidates": [40, 98]},
+        # 重叠区内的98与前一段重复；103距98不足15帧
+        {"start_frame": 100, "end_frame": 200, "candidates": [98, 103, 150]},
+        {"start_frame": 200, "end_frame": 250, "candidates": [199, 240]},
+    ]
+    
+    cuts, total_frames = merge_chunk_candidates(chunk_results, 15)
+    
+    assert cuts == [40, 98, 150, 199, 240]
+    assert total_frames == 250
+
+
+def test_parallel_matches_detect_scenes_across_seams(tmp_path, monkeypatch):
+    """切点正好落在分段边界、以及跨边界的 min_scene_len 过滤都与整段检测一致"""
+    monkeypatch.setattr(settings, "cpu_pool_workers", 0)
+    monkeypatch.setattr(settings, "scene_chunk_min_seconds", 1.0)
+    video = tmp_path / "input.mp4"
+    # 205帧分3段：[0,68) [68,136) [136,205)；72距60不足15帧，136在分段边界上
+    make_synthetic_video(
+        video, scene_frames=[60, 12, 64, 40, 29], size=(320, 180), motion="static"
+    )
+    
+    reference = detect_scenes(str(video), tmp_path / "ref")
+    segments = asyncio.run(detect_scenes_parallel(str(video), tmp_path / "parallel", chunks=3))
+    
+    assert [(s["start_frame"], s["end_frame"]) for s in segments] == [
+        (s["start_frame"], s["end_frame"]) for s in reference
+    ]
+    assert [s["start_frame"] for s in segments[1:]] == [60, 136, 176]
+    assert segments[-1]["end_frame"] == 205
+    assert (tmp_path / "parallel" / "scene_keyframes" / "004-keyframe.jpg").exists()
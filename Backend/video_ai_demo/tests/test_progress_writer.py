@@ -0,0 +1,73 @@
+"""进度写入合并器测试"""
+import asyncio
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import progress_writer as progress_writer_module
+from app.db.models import Base, Job, JobMode
+from app.db.progress_writer import ProgressWriter
+
+
+@pytest.fixture
+def get_db(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'progress.db'}")
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    
+    @contextmanager
+    def _get_db():
+        db = factory()
+        try:
+            yield db
+            db.commit()
+        finally:
+            db.close()
+    
+    monkeypatch.setattr(progress_writer_module, "get_db", _get_db)
+    with _get_db() as db:
+        db.add_all([Job(id="job_1", mode=JobMode.LEARN), Job(id="job_2", mode=JobMode.LEARN)])
+    return _get_db
+
+
+def _progress(get_db, job_id):
+    with get_db() as db:
+        job = db.query(Job).filter(Job.id == job_id).one()
+        return job.progress_stage, job.progress_percent, job.progress_message
+
+
+def test_updates_are_coalesced_into_one_transaction(get_db):
+    """同一间隔内的多次更新合并为一次批量写入，保留每个Job的最后一次进度"""
+    writer = ProgressWriter(flush_interval=0.05)
+    
+    async def main():
+        for i in range(50):
+            writer.submit("job_1", "feature_analysis", 60 + i * 0.5, f"{i}/50")
+            writer.submit("job_2", "extract_frames", 35, "抽帧")
+        await asyncio.sleep(0.1)
+    
+    asyncio.run(main())
+    
+    assert writer.updates == 100
+    assert writer.flushes == 1
+    assert _progress(get_db, "job_1") == ("feature_analysis", 84.5, "49/50")
+    assert _progress(get_db, "job_2") == ("extract_frames", 35, "抽帧")
+
+
+def test_discard_and_missing_job(get_db):
+    """丢弃的进度不会落库；已删除的Job不影响其他Job写入"""
+    writer = ProgressWriter(flush_interval=10)
+    
+    async def main():
+        writer.submit("job_1", "finalize", 95, "完成...")
+        writer.submit("job_2", "ingest", 10, "下载视频...")
+        writer.submit("job_deleted", "ingest", 10, "下载视频...")
+        writer.discard("job_1")
+        writer.flush()
+    
+    asyncio.run(main())
+    
+    assert _progress(get_db, "job_1") == (None, 0.0, None)
+    assert _progress(get_db, "job_2") == ("ingest", 10, "下载视频...")
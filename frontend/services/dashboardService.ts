@@ -32,6 +32,7 @@ export async function getDashboardStats(): Promise<DashboardStat[]> {
 export interface GetProjectsParams {
   page?: number;
   limit?: number;
+  cursor?: string;
   status?: string;
   sortBy?: 'timestamp' | 'score';
 }
@@ -41,6 +42,7 @@ export interface ProjectsResponse {
   total: number;
   page: number;
   limit: number;
+  nextCursor?: string | null;
 }
 
 /**
@@ -51,6 +53,7 @@ export async function getProjects(params?: GetProjectsParams): Promise<ProjectsR
     params: {
       page: params?.page || 1,
       limit: params?.limit || 10,
+      ...(params?.cursor && { cursor: params.cursor }),
       ...(params?.status && { status: params.status }),
       ...(params?.sortBy && { sortBy: params.sortBy }),
     }
@@ -117,6 +117,8 @@ export const streamJobProgress = (
 ): { close: () => void } => {
   const url = `${SHOT_ANALYSIS_BASE_URL}${API_BASE_PATH}/jobs/${jobId}/stream`;
   const eventSource = new EventSource(url);
+  // 当前片段列表（全量快照 + 增量更新合并）
+  let segments: any[] = [];
 
   eventSource.onmessage = (event) => {
     try {
@@ -135,9 +137,25 @@ export const streamJobProgress = (
           break;
 
         case 'segments':
-          // 片段数据更新
-          if (callbacks.onSegments && data.segments) {
-            callbacks.onSegments(data.segments);
+          // 片段全量快照
+          if (data.segments) {
+            segments = data.segments;
+            if (callbacks.onSegments) {
+              callbacks.onSegments(segments);
+            }
+          }
+          break;
+
+        case 'segment_update':
+          // 片段增量更新：只包含发生变化的片段及其index
+          if (data.segments) {
+            segments = segments.slice(0, data.total ?? segments.length);
+            for (const { index, ...segment } of data.segments) {
+              segments[index] = segment;
+            }
+            if (callbacks.onSegments) {
+              callbacks.onSegments([...segments]);
+            }
           }
           break;
 